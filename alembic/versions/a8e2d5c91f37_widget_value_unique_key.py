@@ -0,0 +1,64 @@
+"""widget_value: unique index on (widget_id, widget_value_key)
+
+Revision ID: a8e2d5c91f37
+Revises: f7c3a9e1b54d
+Create Date: 2026-10-19 14:00:00.000000
+
+The widget refresh looked each value up with a `filter_by(widget_id,
+widget_value_key).first()` per key and inserted when it found none,
+with nothing in the schema stopping two rows for the same key (two
+overlapping refresh runs, or a restore over live data, were enough).
+The refresh now upserts on this pair, which needs the unique index.
+
+Existing duplicates are removed first: for each (widget_id,
+widget_value_key) the row with the newest `last_updated` is kept (the
+highest id among equals) — the one the old lookup would eventually
+have been updating.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e2d5c91f37'
+down_revision: Union[str, None] = 'f7c3a9e1b54d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = 'ix_widget_value_widget_id_key'
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    if INDEX_NAME in {ix['name'] for ix in insp.get_indexes('widget_value')}:
+        return
+
+    op.execute(
+        """
+        DELETE FROM widget_value
+        WHERE EXISTS (
+            SELECT 1 FROM widget_value newer
+            WHERE newer.widget_id = widget_value.widget_id
+              AND newer.widget_value_key = widget_value.widget_value_key
+              AND (newer.last_updated > widget_value.last_updated
+                   OR (newer.last_updated = widget_value.last_updated
+                       AND newer.id > widget_value.id))
+        )
+        """
+    )
+    op.create_index(
+        INDEX_NAME,
+        'widget_value',
+        ['widget_id', 'widget_value_key'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Drop the unique index. Removed duplicate rows are not restored."""
+    op.drop_index(INDEX_NAME, table_name='widget_value')
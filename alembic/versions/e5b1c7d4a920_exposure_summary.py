@@ -0,0 +1,64 @@
+"""exposure_summary: materialized (layer, host) observation counts
+
+Revision ID: e5b1c7d4a920
+Revises: d3f8b25e91ac
+Create Date: 2026-10-19 09:00:00.000000
+
+The settings page used to derive its discovered-layers and
+discovered-hosts lists from DISTINCT / JOIN scans over
+`service_exposure` on every load. `exposure_summary` keeps one row
+per (layer, host) with observation and service counts plus
+first/last seen timestamps; `synthesizer.replace_exposures` and the
+entry delete / host-edit paths maintain it incrementally.
+
+Backfilled from the existing `service_exposure` rows in the same
+migration so an upgraded install shows the same lists as before.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b1c7d4a920'
+down_revision: Union[str, None] = 'd3f8b25e91ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    if 'exposure_summary' in insp.get_table_names():
+        return
+
+    op.create_table(
+        'exposure_summary',
+        sa.Column('layer', sa.String(length=64), primary_key=True),
+        sa.Column('host', sa.String(length=100), primary_key=True),
+        sa.Column('observation_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('service_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('first_seen', sa.DateTime(), nullable=False),
+        sa.Column('last_seen', sa.DateTime(), nullable=False),
+    )
+    op.execute(
+        """
+        INSERT INTO exposure_summary
+            (layer, host, observation_count, service_count, first_seen, last_seen)
+        SELECT e.layer, s.host, COUNT(*), COUNT(DISTINCT s.id),
+               MIN(e.last_updated), MAX(e.last_updated)
+        FROM service_exposure e
+        JOIN service_entry s ON s.id = e.service_entry_id
+        GROUP BY e.layer, s.host
+        """
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+    if 'exposure_summary' in insp.get_table_names():
+        op.drop_table('exposure_summary')
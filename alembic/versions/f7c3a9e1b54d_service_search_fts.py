@@ -0,0 +1,123 @@
+"""service_search: FTS5 full-text index over services
+
+Revision ID: f7c3a9e1b54d
+Revises: e5b1c7d4a920
+Create Date: 2026-10-19 12:00:00.000000
+
+The dashboard filter box only hides rows the browser already
+downloaded. `service_search` is an FTS5 table (rowid =
+`service_entry.id`) over container name, host, stack, group name,
+image owner/name, both URLs and the exposure hostnames, backing
+`search_index.py`, `/api/v1/search` and the dashboards' `?q=`.
+
+Triggers keep it in step with every write, in the same transaction,
+whichever code path (or raw SQL) made it:
+
+- `service_entry` insert, delete, and updates of an indexed column;
+- `service_exposure` insert/delete/hostname update (the exposure
+  hostnames of the owning service);
+- `group` renames (every service in the group).
+
+Each trigger re-derives the affected service's row from the source
+tables rather than patching it, so the index can't drift.
+
+SQLite builds without FTS5 skip the table; `search_index` falls back
+to LIKE matching there.
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c3a9e1b54d'
+down_revision: Union[str, None] = 'e5b1c7d4a920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Reported alongside alembic's own "Running upgrade ..." lines.
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+INDEXED_COLUMNS = (
+    'container_name', 'host', 'stack_name', 'image_owner', 'image_name',
+    'internalurl', 'externalurl',
+)
+
+# Index row(s) for services matching `{where}` (an expression over
+# `e`, the service_entry row).
+_INSERT = """
+    INSERT INTO service_search
+        (rowid, container_name, host, stack_name, group_name, image_owner,
+         image_name, internalurl, externalurl, exposure_hosts)
+    SELECT e.id, e.container_name, e.host, e.stack_name, g.group_name, e.image_owner,
+           e.image_name, e.internalurl, e.externalurl,
+           (SELECT group_concat(x.hostname, ' ') FROM service_exposure x
+            WHERE x.service_entry_id = e.id)
+    FROM service_entry e LEFT JOIN "group" g ON g.id = e.group_id
+    WHERE {where}
+"""
+
+# Replace the index row(s) for services matching `{where}`.
+_REINDEX = """
+    DELETE FROM service_search WHERE rowid IN (SELECT e.id FROM service_entry e WHERE {where});
+""" + _INSERT + ";\n"
+
+TRIGGERS = {
+    'service_search_entry_ai':
+        'AFTER INSERT ON service_entry BEGIN'
+        + _REINDEX.format(where='e.id = NEW.id') + 'END',
+    'service_search_entry_au':
+        f'AFTER UPDATE OF {", ".join(INDEXED_COLUMNS)}, group_id ON service_entry BEGIN'
+        + _REINDEX.format(where='e.id = NEW.id') + 'END',
+    'service_search_entry_ad':
+        'AFTER DELETE ON service_entry BEGIN '
+        'DELETE FROM service_search WHERE rowid = OLD.id; END',
+    'service_search_exposure_ai':
+        'AFTER INSERT ON service_exposure BEGIN'
+        + _REINDEX.format(where='e.id = NEW.service_entry_id') + 'END',
+    'service_search_exposure_au':
+        'AFTER UPDATE OF hostname, service_entry_id ON service_exposure BEGIN'
+        + _REINDEX.format(where='e.id IN (OLD.service_entry_id, NEW.service_entry_id)') + 'END',
+    'service_search_exposure_ad':
+        'AFTER DELETE ON service_exposure BEGIN'
+        + _REINDEX.format(where='e.id = OLD.service_entry_id') + 'END',
+    'service_search_group_au':
+        'AFTER UPDATE OF group_name ON "group" BEGIN'
+        + _REINDEX.format(where='e.group_id = NEW.id') + 'END',
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    if 'service_search' in insp.get_table_names():
+        return
+
+    try:
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE service_search USING fts5(
+                container_name, host, stack_name, group_name, image_owner,
+                image_name, internalurl, externalurl, exposure_hosts,
+                tokenize = 'unicode61'
+            )
+            """
+        )
+    except sa.exc.OperationalError as e:
+        logger.warning(f"FTS5 unavailable in this SQLite build; skipping service_search ({e})")
+        return
+
+    for name, body in TRIGGERS.items():
+        op.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+    op.execute(_INSERT.format(where='1'))
+
+
+def downgrade() -> None:
+    for name in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    op.execute('DROP TABLE IF EXISTS service_search')
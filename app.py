@@ -17,11 +17,19 @@ import humanize
 from dateutil import parser
 from flask import Flask, render_template
 
+import event_broker
+import fragment_cache
+import icon_fetcher
+import icon_pack
+import icon_registry
+import static_assets
+import widget_refresh
+import widget_registry
 from extensions import db, login_manager
 from health import health_bp
-from jobs import start_background_workers, verify_and_fetch_missing_icons
+from jobs import start_background_workers, start_icon_verification
 from models import User
-from routes_api import api_bp
+from routes_api import api_bp, configure_rate_limits
 from routes_auth import auth_bp
 from routes_dashboard import dashboard_bp
 from routes_widgets import widgets_bp
@@ -115,11 +123,21 @@ def create_app():
         )
         app.config['register_field_ownership'] = "user_wins"
 
+    configure_rate_limits(app.config)
+    event_broker.configure(app.config)
+    fragment_cache.configure(app.config)
+    icon_pack.configure(app.config)
+    icon_fetcher.configure(app.config)
+    widget_refresh.configure(app.config)
+    static_assets.init_app(app)
+
     logger.info("⚙️ Flask config (from settings):")
     for k in settings:
         logger.info(f"    {k} = {app.config.get(k)}")
 
     os.makedirs(IMAGE_DIR, exist_ok=True)
+    icon_registry.init_app(app)
+    widget_registry.reload()
 
     @app.context_processor
     def inject_globals():
@@ -139,6 +157,17 @@ def create_app():
             dt = dt.replace(tzinfo=now.tzinfo)
         return humanize.naturaltime(now - dt)
 
+    @app.template_filter('reltime')
+    def reltime(dt):
+        """`time_since` deferred to the browser: a `[[ago:<epoch>]]`
+        token that dashboard.js rewrites (and keeps current) in title
+        attributes, so cached tile HTML doesn't age."""
+        if not dt:
+            return "never"
+        if isinstance(dt, str):
+            dt = parser.parse(dt)
+        return f"[[ago:{int(dt.timestamp())}]]"
+
     @app.errorhandler(403)
     def forbidden_error(error):
         return render_template("403.html"), 403
@@ -175,11 +204,13 @@ app = create_app()
 
 if __name__ == '__main__':
     create_default_admin(app)
-    verify_and_fetch_missing_icons(app)
 
     # In Werkzeug's debug reloader the script runs twice (supervisor + child).
     # Only the child (WERKZEUG_RUN_MAIN=true) should own the workers.
     if not app.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        # Missing icons are fetched in the background; the server
+        # starts serving right away (progress on Settings → Icons).
+        start_icon_verification(app)
         start_background_workers(app)
 
     logger.info(f"🚀 Starting app (debug={app.debug}) on port 8815")
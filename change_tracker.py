@@ -0,0 +1,294 @@
+"""Process-wide data generation counter and change log for the dashboards.
+
+`generation()` returns an integer that goes up whenever a transaction
+that touched dashboard-visible tables commits. Read-side caches
+(`dashboard_snapshot`) compare it against the generation they were
+built at, so there is no DB round trip to find out nothing changed.
+
+Each bump also appends a `Change` to a bounded in-memory log naming
+what the commit touched: service entry IDs written, service entry IDs
+deleted, widget IDs whose config or values changed, and a
+`structural` flag for anything that can't be pinned to rows (group
+edits, bulk statements we can't read a key from). `kinds` summarizes
+the change for push consumers (`KINDS`). `changes_since()` merges the
+log from a client's last-seen version, which is what the dashboard
+delta endpoint serves; listeners registered with `add_listener()` get
+each `Change` as it is committed (the SSE broker).
+
+Bumps come from SQLAlchemy session events, not from each write path
+calling in by hand, so a new route or job that commits through
+`db.session` is covered automatically:
+
+- `after_flush` records flushed objects of `TRACKED_MODELS`.
+- `do_orm_execute` records bulk `Query.update()` / `Query.delete()` /
+  `session.execute(insert(...))` statements against those models
+  (e.g. `replace_exposures`' delete, the widget_value prune).
+- `after_commit` bumps the generation and logs the change if anything
+  was recorded; `after_rollback` discards it.
+
+That covers register, edit/delete, the URL health sweep, widget
+refresh and exposure recomputes. Code that writes outside the ORM
+session (raw sqlite3, another process) should call `bump()` itself.
+
+State is per process, like `rate_limit`. The documented deployment
+(`python app.py`, one process) runs the scheduler, health thread and
+request handlers together, so every write is seen. Versions handed to
+clients carry `EPOCH` so a version from before a restart is never
+mistaken for one from this process.
+"""
+
+import logging
+import threading
+import uuid
+from collections import deque, namedtuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
+
+from models import Group, ServiceEntry, ServiceExposure, Widget, WidgetValue
+
+logger = logging.getLogger(__name__)
+
+# Models whose rows end up on a dashboard page.
+TRACKED_MODELS = (ServiceEntry, ServiceExposure, Group, Widget, WidgetValue)
+_TRACKED_TABLES = frozenset(m.__table__.name for m in TRACKED_MODELS)
+
+# Bulk statements against these tables are attributed to rows through
+# an equality filter on the named column (`filter_by(col=value)`).
+_BULK_KEYS = {
+    ServiceExposure.__table__.name: ("entry_ids", "service_entry_id"),
+    WidgetValue.__table__.name: ("widget_ids", "widget_id"),
+    Widget.__table__.name: ("widget_ids", "id"),
+}
+
+# Number of generations kept for `changes_since()`. A client further
+# behind than this gets `None` and reloads the page.
+CHANGE_LOG_SIZE = 256
+
+EPOCH = uuid.uuid4().hex[:8]
+
+Change = namedtuple("Change", "generation entry_ids removed_ids widget_ids structural kinds")
+
+# added / removed       — service entries created or deleted
+# health                — internal/external health-check status changed
+# docker                — docker_status changed
+# widget                — widget config or values changed
+# entry                 — any other service or exposure change (incl.
+#                         health-check timestamps)
+# structural            — groups, or rows we couldn't attribute
+KINDS = ("added", "removed", "health", "docker", "widget", "entry", "structural")
+
+_HEALTH_ATTRS = ("internal_health_check_status", "external_health_check_status")
+
+_PENDING_KEY = "change_tracker_pending"
+
+_lock = threading.Lock()
+_generation = 1
+_log = deque(maxlen=CHANGE_LOG_SIZE)
+_listeners = []
+
+
+def generation():
+    return _generation
+
+
+def version(gen=None):
+    """Client-facing version string `<epoch>-<generation>` for `gen`
+    (default: the current generation)."""
+    return f"{EPOCH}-{_generation if gen is None else gen}"
+
+
+def parse_version(value):
+    """Generation from a `version()` string, or None if it is malformed
+    or from another process."""
+    epoch, _, gen = (value or "").partition("-")
+    if epoch != EPOCH or not gen.isdigit():
+        return None
+    return int(gen)
+
+
+def add_listener(callback):
+    """Call `callback(change)` after every bump, outside the lock.
+    Runs on the committing thread, so it must be quick."""
+    _listeners.append(callback)
+
+
+def bump(entry_ids=(), removed_ids=(), widget_ids=(), structural=True, kinds=()):
+    """Advance the generation and log what changed. Returns the new
+    generation. Called without arguments it logs a structural change,
+    which sends every delta client back to a full reload."""
+    global _generation
+    kinds = set(kinds)
+    if structural:
+        kinds.add("structural")
+    with _lock:
+        _generation += 1
+        change = Change(
+            _generation,
+            frozenset(entry_ids),
+            frozenset(removed_ids),
+            frozenset(widget_ids),
+            bool(structural),
+            frozenset(kinds),
+        )
+        _log.append(change)
+    for callback in _listeners:
+        try:
+            callback(change)
+        except Exception:
+            logger.exception("Change listener %r failed", callback)
+    return change.generation
+
+
+def changes_since(since):
+    """Merge the changes after generation `since`.
+
+    Returns a `Change` whose `generation` is the newest generation
+    included, or None when the log no longer reaches back to `since`
+    (or `since` is from the future).
+    """
+    with _lock:
+        current = _generation
+        if since is None or since > current:
+            return None
+        if since == current:
+            return Change(current, frozenset(), frozenset(), frozenset(), False, frozenset())
+        if not _log or _log[0].generation > since + 1:
+            return None
+        entry_ids, removed_ids, widget_ids, kinds = set(), set(), set(), set()
+        structural = False
+        for change in _log:
+            if change.generation <= since:
+                continue
+            entry_ids |= change.entry_ids
+            removed_ids |= change.removed_ids
+            widget_ids |= change.widget_ids
+            kinds |= change.kinds
+            structural = structural or change.structural
+    return Change(
+        current,
+        frozenset(entry_ids),
+        frozenset(removed_ids),
+        frozenset(widget_ids),
+        structural,
+        frozenset(kinds),
+    )
+
+
+def _pending(session):
+    pending = session.info.get(_PENDING_KEY)
+    if pending is None:
+        pending = {
+            "entry_ids": set(),
+            "removed_ids": set(),
+            "widget_ids": set(),
+            "structural": False,
+            "kinds": set(),
+        }
+        session.info[_PENDING_KEY] = pending
+    return pending
+
+
+def _entry_kinds(obj, new, deleted):
+    if new:
+        return {"added"}
+    if deleted:
+        return {"removed"}
+    state = inspect(obj)
+    kinds = set()
+    if any(state.attrs[a].history.has_changes() for a in _HEALTH_ATTRS):
+        kinds.add("health")
+    if state.attrs.docker_status.history.has_changes():
+        kinds.add("docker")
+    return kinds or {"entry"}
+
+
+def _record(pending, obj, new=False, deleted=False):
+    if isinstance(obj, ServiceEntry):
+        if obj.id is not None:
+            pending["removed_ids" if deleted else "entry_ids"].add(obj.id)
+            pending["kinds"] |= _entry_kinds(obj, new, deleted)
+    elif isinstance(obj, ServiceExposure):
+        if obj.service_entry_id is not None:
+            pending["entry_ids"].add(obj.service_entry_id)
+            pending["kinds"].add("entry")
+    elif isinstance(obj, WidgetValue):
+        if obj.widget_id is not None:
+            pending["widget_ids"].add(obj.widget_id)
+            pending["kinds"].add("widget")
+    elif isinstance(obj, Widget):
+        if obj.id is not None:
+            pending["widget_ids"].add(obj.id)
+            pending["kinds"].add("widget")
+    else:  # Group: bucket labels/order may change
+        pending["structural"] = True
+
+
+def _equality_key(statement, column_name):
+    """`value` from a `WHERE column_name = value` clause, else None."""
+    where = getattr(statement, "whereclause", None)
+    clauses = []
+    if isinstance(where, BooleanClauseList) and where.operator is operators.and_:
+        clauses = list(where.clauses)
+    elif where is not None:
+        clauses = [where]
+    for clause in clauses:
+        if (
+            isinstance(clause, BinaryExpression)
+            and clause.operator is operators.eq
+            and getattr(clause.left, "name", None) == column_name
+            and isinstance(clause.right, BindParameter)
+        ):
+            return clause.right.value
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush(session, flush_context):
+    tracked_new = [o for o in session.new if isinstance(o, TRACKED_MODELS)]
+    tracked_deleted = [o for o in session.deleted if isinstance(o, TRACKED_MODELS)]
+    tracked_dirty = [
+        o for o in session.dirty
+        if isinstance(o, TRACKED_MODELS) and session.is_modified(o, include_collections=False)
+    ]
+    if not (tracked_new or tracked_deleted or tracked_dirty):
+        return
+    pending = _pending(session)
+    for obj in tracked_new:
+        _record(pending, obj, new=True)
+    for obj in tracked_dirty:
+        _record(pending, obj)
+    for obj in tracked_deleted:
+        _record(pending, obj, deleted=True)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    name = getattr(table, "name", None)
+    if name not in _TRACKED_TABLES:
+        return
+    pending = _pending(orm_execute_state.session)
+    bucket, column_name = _BULK_KEYS.get(name, (None, None))
+    key = _equality_key(orm_execute_state.statement, column_name) if column_name else None
+    if key is None:
+        pending["structural"] = True
+    else:
+        pending[bucket].add(key)
+        pending["kinds"].add("widget" if bucket == "widget_ids" else "entry")
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending is not None:
+        bump(**pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
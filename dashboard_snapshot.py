@@ -0,0 +1,170 @@
+"""Shared in-process snapshot of the dashboard view model.
+
+`/`, `/tiled_dash` and `/compact_dash` all render the same data: every
+service, grouped and sorted by `view_helpers.group_and_sort_services`,
+plus the widget values. With the JS auto-refresh, every open tab asks
+for that again once a minute.
+
+`get_view(axis, show_urlless, sort_in_group, projection)` returns a
+`DashboardView` for the current `change_tracker.generation()`. Entries
+are `view_rows` projections (`"list"` for the table and tile views,
+`"compact"` for /compact_dash), not ORM objects: each projection's rows
+are loaded once per generation on first use and shared by every view
+key; each `(projection, axis, show_urlless, sort_in_group)` combination
+is grouped once on first use. Between writes a render does no DB work
+at all.
+
+Widget values come from `widget_store`, limited to the widgets the
+view actually shows. A generation whose only changes are widget values
+or config (the refresh job commits every minute) keeps the previous
+generation's rows and groupings and only re-reads the widget data.
+
+`query` (the dashboards' `?q=`) narrows a view to the
+`search_index` matches. Searched views are grouped per request and not
+cached — the key space is unbounded — but still reuse the cached rows.
+
+`get_entry(id)` loads one full `ServiceEntry` (tile drawers need the
+columns the projections leave out) plus its widget values.
+
+A generation is read *before* loading. A write that commits while a
+load is in flight bumps past it, so the next request rebuilds rather
+than keeping a snapshot that might predate the write.
+"""
+
+import threading
+from collections import namedtuple
+
+from sqlalchemy.orm import selectinload
+
+import change_tracker
+import search_index
+import view_rows
+import widget_store
+from models import ServiceEntry
+from view_helpers import group_and_sort_services
+
+DashboardView = namedtuple(
+    "DashboardView",
+    "generation grouped_entries total_entries widget_values widget_fields",
+)
+EntryView = namedtuple("EntryView", "generation entry widget_values widget_fields")
+
+_lock = threading.Lock()
+# {"generation", "rows": {projection: [row]},
+#  "groupings": {key: grouped_entries}, "views": {key: DashboardView}}
+_snapshot = None
+
+
+def _sort_key(sort_in_group):
+    # group_and_sort_services only distinguishes "alphabetical" from
+    # everything else; collapsing the rest keeps the key space bounded
+    # whatever lands in the query string.
+    return "alphabetical" if sort_in_group == "alphabetical" else "priority"
+
+
+def _widget_only(changes):
+    return (
+        changes is not None
+        and not changes.structural
+        and not changes.entry_ids
+        and not changes.removed_ids
+    )
+
+
+def _current_snapshot():
+    global _snapshot
+    gen = change_tracker.generation()
+    snap = _snapshot
+    if snap is not None and snap["generation"] == gen:
+        return snap
+    with _lock:
+        snap = _snapshot
+        if snap is not None and snap["generation"] == gen:
+            return snap
+        rows, groupings = {}, {}
+        if snap is not None and _widget_only(change_tracker.changes_since(snap["generation"])):
+            rows, groupings = snap["rows"], snap["groupings"]
+        snap = {
+            "generation": gen,
+            "rows": rows,
+            "groupings": groupings,
+            "views": {},
+        }
+        _snapshot = snap
+        return snap
+
+
+def _rows(snap, projection):
+    rows = snap["rows"].get(projection)
+    if rows is None:
+        # Racing threads load the same rows; last write wins.
+        rows = view_rows.PROJECTIONS[projection]()
+        snap["rows"][projection] = rows
+    return rows
+
+
+def get_rows(projection="list"):
+    """Every service as `projection` rows, ungrouped."""
+    return _rows(_current_snapshot(), projection)
+
+
+def _build_view(generation, grouped):
+    widget_values, widget_fields = widget_store.values_for(
+        getattr(e, "widget_id", None) for _, es in grouped for e in es
+    )
+    return DashboardView(
+        generation=generation,
+        grouped_entries=grouped,
+        total_entries=sum(len(es) for _, es in grouped),
+        widget_values=widget_values,
+        widget_fields=widget_fields,
+    )
+
+
+def get_view(axis, show_urlless, sort_in_group, projection="list", query=None):
+    """Grouped, sorted dashboard rows for the given view controls.
+    `projection` names a `view_rows.PROJECTIONS` entry; a non-empty
+    `query` keeps only the services it matches."""
+    snap = _current_snapshot()
+    if query:
+        matches = set(search_index.match_ids(query, ranked=False))
+        grouped = group_and_sort_services(
+            [r for r in _rows(snap, projection) if r.id in matches],
+            axis=axis,
+            show_urlless=show_urlless,
+            sort_in_group=sort_in_group,
+        )
+        return _build_view(snap["generation"], grouped)
+
+    key = (projection, axis, bool(show_urlless), _sort_key(sort_in_group))
+    view = snap["views"].get(key)
+    if view is None:
+        grouped = snap["groupings"].get(key)
+        if grouped is None:
+            grouped = group_and_sort_services(
+                _rows(snap, projection),
+                axis=axis,
+                show_urlless=show_urlless,
+                sort_in_group=sort_in_group,
+            )
+            snap["groupings"][key] = grouped
+        view = _build_view(snap["generation"], grouped)
+        # Racing threads compute the same value; last write wins.
+        snap["views"][key] = view
+    return view
+
+
+def get_entry(entry_id):
+    """One full service plus the widget data, for per-entry fragments.
+    None if the service doesn't exist (any more)."""
+    snap = _current_snapshot()
+    entry = (
+        ServiceEntry.query
+        .options(selectinload(ServiceEntry.exposures))
+        .filter_by(id=entry_id)
+        .first()
+    )
+    if entry is None:
+        return None
+    widget_values, widget_fields = widget_store.values_for([entry.widget_id])
+    return EntryView(snap["generation"], entry, widget_values, widget_fields)
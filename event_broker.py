@@ -0,0 +1,174 @@
+"""Bounded fan-out of committed changes to Server-Sent Events clients.
+
+One event source — `change_tracker`, which calls `publish()` for every
+committed `Change` — feeds any number of `/api/v1/stream` subscribers.
+Each subscriber owns a small queue of pending events:
+
+- `publish()` appends to every queue and wakes the waiting streams. It
+  runs on the committing thread and never blocks on a client.
+- A subscriber whose queue is already `queue_size` deep is a slow
+  client. Its queue is dropped and replaced by a single `resync`
+  marker; the stream then sends one `resync` event carrying the
+  current version and the client catches up through the delta
+  endpoint (`/api/v1/dashboard/changes`) from whatever version it last
+  applied. Memory per subscriber is bounded no matter how far behind
+  it is.
+- At most `max_subscribers` streams are open at once; `subscribe()`
+  returns None past that and the route answers 503.
+
+Each stream holds one server thread for its lifetime (the Werkzeug
+server is threaded), which is what `max_subscribers` protects.
+
+Like `change_tracker`, state is per process.
+"""
+
+import json
+import threading
+from collections import deque
+
+import change_tracker
+
+DEFAULT_MAX_SUBSCRIBERS = 100
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_HEARTBEAT_SECONDS = 15
+
+_RESYNC = object()
+
+
+class Subscriber:
+    __slots__ = ("_events", "_cond", "_queue_size", "closed")
+
+    def __init__(self, queue_size):
+        self._events = deque()
+        self._cond = threading.Condition()
+        self._queue_size = queue_size
+        self.closed = False
+
+    def push(self, event):
+        with self._cond:
+            if self._events and self._events[0] is _RESYNC:
+                return  # already catching up; the resync covers this
+            if len(self._events) >= self._queue_size:
+                self._events.clear()
+                event = _RESYNC
+            self._events.append(event)
+            self._cond.notify()
+
+    def resync(self):
+        with self._cond:
+            self._events.clear()
+            self._events.append(_RESYNC)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+    def wait(self, timeout):
+        """Pending events (possibly empty after `timeout` seconds)."""
+        with self._cond:
+            if not self._events and not self.closed:
+                self._cond.wait(timeout)
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+
+class Broker:
+    def __init__(self, max_subscribers=DEFAULT_MAX_SUBSCRIBERS, queue_size=DEFAULT_QUEUE_SIZE,
+                 heartbeat_seconds=DEFAULT_HEARTBEAT_SECONDS):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.resyncs = 0
+        self.rejected = 0
+
+    def configure(self, max_subscribers, queue_size, heartbeat_seconds):
+        self.max_subscribers = max(0, int(max_subscribers))
+        self.queue_size = max(1, int(queue_size))
+        self.heartbeat_seconds = max(1, int(heartbeat_seconds))
+
+    def subscribe(self):
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                self.rejected += 1
+                return None
+            sub = Subscriber(self.queue_size)
+            self._subscribers.add(sub)
+            return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+        sub.close()
+
+    def publish(self, change):
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += 1
+        if not subscribers:
+            return
+        event = _event_payload(change)
+        for sub in subscribers:
+            sub.push(event)
+
+    def stream(self, sub, last_event_id=None):
+        """SSE body for `sub`. Sends `resync` straight away if the
+        client reconnected with an out-of-date Last-Event-ID."""
+        try:
+            yield f"retry: 5000\nevent: hello\nid: {change_tracker.version()}\ndata: {{}}\n\n"
+            if last_event_id and last_event_id != change_tracker.version():
+                sub.resync()
+            while True:
+                events = sub.wait(self.heartbeat_seconds)
+                if not events:
+                    yield ": keepalive\n\n"
+                    continue
+                for event in events:
+                    if event is _RESYNC:
+                        with self._lock:
+                            self.resyncs += 1
+                        version = change_tracker.version()
+                        yield f"event: resync\nid: {version}\ndata: {json.dumps({'version': version})}\n\n"
+                    else:
+                        yield f"event: change\nid: {event['version']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(sub)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "max_subscribers": self.max_subscribers,
+                "queue_size": self.queue_size,
+                "published": self.published,
+                "resyncs": self.resyncs,
+                "rejected": self.rejected,
+            }
+
+
+def _event_payload(change):
+    return {
+        "version": change_tracker.version(change.generation),
+        "kinds": sorted(change.kinds),
+        "entry_ids": sorted(change.entry_ids),
+        "removed_ids": sorted(change.removed_ids),
+        "widget_ids": sorted(change.widget_ids),
+    }
+
+
+broker = Broker()
+change_tracker.add_listener(broker.publish)
+
+
+def configure(config):
+    """Apply `stream_*` settings. Called once from create_app()."""
+    broker.configure(
+        config.get("stream_max_subscribers", DEFAULT_MAX_SUBSCRIBERS),
+        config.get("stream_queue_size", DEFAULT_QUEUE_SIZE),
+        config.get("stream_heartbeat_seconds", DEFAULT_HEARTBEAT_SECONDS),
+    )
@@ -0,0 +1,164 @@
+"""Incremental maintenance of the `exposure_summary` rollup.
+
+`exposure_summary` holds one row per (layer, host) with the number of
+`service_exposure` rows and distinct services behind it. Writers
+report deltas here in the same transaction as the exposure change:
+
+- `synthesizer.replace_exposures` — via `apply_replacement()`.
+- Entry deletes — via `remove_entry()`, before the row is deleted.
+- Host edits — via `move_entry()`, since the rollup is keyed by host.
+
+Deltas are applied with `INSERT ... ON CONFLICT DO UPDATE` so
+concurrent writers add to the counters rather than overwrite them.
+Counters are clamped at zero; rows are never deleted (readers filter
+on `observation_count > 0`).
+
+Readers: `settings_store.discovered_layers()` / `discovered_hosts()`
+and `service_counts()` for the settings page, plus
+`synthesizer.affected_entry_ids()` for its (host, layer) pair scan.
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from extensions import db
+from models import ExposureSummary, ServiceExposure
+
+
+def _apply_deltas(host: str, obs_deltas: Dict[str, int], svc_deltas: Dict[str, int], seen_layers: Iterable[str]) -> None:
+    """Add per-layer deltas to the (layer, host) rows, bumping
+    `last_seen` for `seen_layers`. Caller commits."""
+    now = datetime.utcnow()
+    seen = set(seen_layers)
+    table = ExposureSummary.__table__
+    for layer in set(obs_deltas) | set(svc_deltas) | seen:
+        obs = obs_deltas.get(layer, 0)
+        svc = svc_deltas.get(layer, 0)
+        if not obs and not svc and layer not in seen:
+            continue
+        stmt = sqlite_insert(table).values(
+            layer=layer,
+            host=host,
+            observation_count=max(0, obs),
+            service_count=max(0, svc),
+            first_seen=now,
+            last_seen=now,
+        )
+        update = {
+            "observation_count": func.max(0, table.c.observation_count + obs),
+            "service_count": func.max(0, table.c.service_count + svc),
+        }
+        if layer in seen:
+            update["last_seen"] = stmt.excluded.last_seen
+        db.session.execute(
+            stmt.on_conflict_do_update(index_elements=["layer", "host"], set_=update)
+        )
+
+
+def _layer_counts(entry_id: int) -> Counter:
+    rows = (
+        db.session.query(ServiceExposure.layer)
+        .filter(ServiceExposure.service_entry_id == entry_id)
+        .all()
+    )
+    return Counter(r[0] for r in rows)
+
+
+def apply_replacement(entry_id: int, host: str, new_layers: Iterable[str]) -> None:
+    """Record that `entry_id`'s exposure rows are about to be replaced
+    by rows with `new_layers` (one item per row). Must run before the
+    old rows are deleted. Caller commits."""
+    if entry_id is None:
+        return
+    old = _layer_counts(entry_id)
+    new = Counter(new_layers)
+    obs_deltas = {layer: new[layer] - old[layer] for layer in set(old) | set(new)}
+    svc_deltas = {
+        layer: (1 if new[layer] else 0) - (1 if old[layer] else 0)
+        for layer in set(old) | set(new)
+    }
+    _apply_deltas(host or "", obs_deltas, svc_deltas, seen_layers=new)
+
+
+def remove_entry(entry_id: int, host: str) -> None:
+    """Subtract a service's exposure rows ahead of deleting it."""
+    old = _layer_counts(entry_id)
+    if not old:
+        return
+    _apply_deltas(
+        host or "",
+        {layer: -n for layer, n in old.items()},
+        {layer: -1 for layer in old},
+        seen_layers=(),
+    )
+
+
+def move_entry(entry_id: int, old_host: str, new_host: str) -> None:
+    """Re-attribute a service's exposure rows after a host edit."""
+    if (old_host or "") == (new_host or ""):
+        return
+    old = _layer_counts(entry_id)
+    if not old:
+        return
+    _apply_deltas(
+        old_host or "",
+        {layer: -n for layer, n in old.items()},
+        {layer: -1 for layer in old},
+        seen_layers=(),
+    )
+    _apply_deltas(
+        new_host or "",
+        dict(old),
+        {layer: 1 for layer in old},
+        seen_layers=old,
+    )
+
+
+def discovered_layers() -> List[str]:
+    rows = (
+        db.session.query(ExposureSummary.layer)
+        .filter(ExposureSummary.observation_count > 0)
+        .distinct()
+        .order_by(ExposureSummary.layer.asc())
+        .all()
+    )
+    return [r[0] for r in rows]
+
+
+def discovered_hosts() -> List[str]:
+    rows = (
+        db.session.query(ExposureSummary.host)
+        .filter(ExposureSummary.observation_count > 0)
+        .distinct()
+        .order_by(ExposureSummary.host.asc())
+        .all()
+    )
+    return [r[0] for r in rows]
+
+
+def host_layer_pairs(layers: Iterable[str]) -> List[Tuple[str, str]]:
+    """(host, layer) pairs with live observations, restricted to `layers`."""
+    layers = list(layers)
+    if not layers:
+        return []
+    rows = (
+        db.session.query(ExposureSummary.host, ExposureSummary.layer)
+        .filter(ExposureSummary.observation_count > 0)
+        .filter(ExposureSummary.layer.in_(layers))
+        .all()
+    )
+    return [(r[0], r[1]) for r in rows]
+
+
+def service_counts() -> Dict[Tuple[str, str], int]:
+    """{(layer, host): number of services} for live rows."""
+    rows = (
+        db.session.query(ExposureSummary.layer, ExposureSummary.host, ExposureSummary.service_count)
+        .filter(ExposureSummary.observation_count > 0)
+        .all()
+    )
+    return {(r[0], r[1]): r[2] for r in rows}
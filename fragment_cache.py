@@ -0,0 +1,82 @@
+"""LRU cache of rendered Tiled-view tiles.
+
+A tile (`templates/partials/tile.html`) is a lot of Jinja per entry —
+health and docker tooltips, status classes, exposure badges — and most
+tiles are identical from one refresh to the next. `render_tile()`
+keeps the rendered HTML in a `rate_limit.BoundedLRU` keyed by
+everything the markup depends on:
+
+- the entry ID and its row version (`view_rows.ListRow.version`, a
+  hash of every projected column and exposure, so any change to the
+  row re-renders it);
+- the docker staleness flags, the only time-dependent parts of the
+  markup. Relative times ("5 minutes ago") are rendered in the browser
+  from timestamps (`reltime` filter), so they don't age the HTML;
+- the page the edit link returns to and the Dozzle base URL;
+- the icon's `<use href>` in the view's sprite (`icon_sprite`), which
+  moves when the view's set of icons does.
+
+Widget values are not part of the key: the tile face shows only
+whether a widget is attached (from `widget_id`, part of the row); the
+values render in the drawer.
+
+Rendering a large tiled dashboard after a change therefore re-runs
+the template only for tiles whose key moved. `tile_cache_size` bounds
+the entries (default 2000, enough for several views of a large fleet);
+0 disables caching.
+
+Like `change_tracker`, state is per process.
+"""
+
+from datetime import datetime, timedelta
+
+from flask import render_template
+from markupsafe import Markup
+
+from rate_limit import BoundedLRU
+
+DEFAULT_CACHE_SIZE = 2000
+
+TILE_TEMPLATE = "partials/tile.html"
+
+# A "good" docker status older than this is flagged stale on the tile
+# even when recent API updates would say otherwise (see tile.html).
+_LONG_STALE = timedelta(minutes=120)
+
+_cache = BoundedLRU(DEFAULT_CACHE_SIZE)
+_enabled = True
+
+
+def configure(config):
+    """Apply `tile_cache_size`. Called once from create_app()."""
+    global _cache, _enabled
+    size = int(config.get("tile_cache_size", DEFAULT_CACHE_SIZE))
+    _enabled = size > 0
+    _cache = BoundedLRU(max(1, size))
+
+
+def _staleness(entry):
+    age = datetime.now() - entry.last_api_update if entry.last_api_update else None
+    return bool(entry.is_docker_status_stale), bool(age and age > _LONG_STALE)
+
+
+def _render(entry, page_ref, dozzle_url, sprite):
+    return Markup(render_template(
+        TILE_TEMPLATE, entry=entry, page_ref=page_ref, STD_DOZZLE_URL=dozzle_url,
+        icon_sprite=sprite,
+    ))
+
+
+def render_tile(entry, page_ref, dozzle_url, sprite=None):
+    """Rendered tile for `entry` (a `view_rows.ListRow`) as Markup,
+    from the cache when nothing it shows has changed. `sprite` is the
+    view's `icon_sprite.Sprite`, if any."""
+    if not _enabled:
+        return _render(entry, page_ref, dozzle_url, sprite)
+    icon_href = sprite.href(entry.image_icon) if sprite is not None else None
+    key = (entry.id, entry.version, _staleness(entry), page_ref, dozzle_url, icon_href)
+    html = _cache.get(key)
+    if html is None:
+        html = _render(entry, page_ref, dozzle_url, sprite)
+        _cache.set(key, html)
+    return html
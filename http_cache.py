@@ -0,0 +1,101 @@
+"""Conditional GET helpers (strong ETags + If-None-Match → 304).
+
+Views compute an ETag from whatever their output depends on *before*
+doing the expensive part, and bail out with `not_modified()` when the
+client already has that version:
+
+    etag = http_cache.etag_for("tiled", change_tracker.generation(), ...)
+    if http_cache.is_fresh(etag):
+        return http_cache.not_modified(etag)
+    return http_cache.with_etag(render_template(...), etag)
+
+Every tag is salted with `PROCESS_TOKEN`, a random value picked at
+import time. Templates, settings.yml values and the changelog are all
+fixed for the life of the process, so a restart (or upgrade) is the
+only other thing that can change output for the same inputs, and it
+invalidates every tag the browsers hold.
+
+Responses are sent with `Cache-Control: private, no-cache`: browsers
+may keep a copy but must revalidate it, which is exactly the cheap
+304 round trip these helpers exist for.
+
+Pages polled for changes use `short_circuit()` instead, which also
+answers a `HEAD` probe with the current tag and no body, without
+rendering: the dashboard's auto-refresh asks that way and only reloads
+(one render) when the tag moved.
+
+`static_assets` compresses large responses after the fact and appends
+the encoding to the tag (`<etag>-gzip`); `is_fresh` accepts those
+variants of the same tag.
+"""
+
+import hashlib
+import json
+import uuid
+
+from flask import current_app, make_response, request
+
+PROCESS_TOKEN = uuid.uuid4().hex
+
+CACHE_CONTROL = "private, no-cache"
+
+# Suffixes static_assets adds to the ETag of a compressed response.
+ENCODING_SUFFIXES = ("", "-gzip", "-br")
+
+
+def etag_for(*parts):
+    """Strong ETag value (unquoted) for the given parts."""
+    h = hashlib.sha1(PROCESS_TOKEN.encode())
+    for part in parts:
+        h.update(b"\x1f")
+        h.update(repr(part).encode())
+    return h.hexdigest()[:32]
+
+
+def is_fresh(etag):
+    """True when the request's If-None-Match already names `etag` (in
+    any content encoding)."""
+    return any(request.if_none_match.contains(etag + s) for s in ENCODING_SUFFIXES)
+
+
+def not_modified(etag):
+    response = make_response("", 304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def short_circuit(etag):
+    """Response that needs no render: a 304 when the client already has
+    `etag`, or an empty 200 carrying it for a HEAD request. None when
+    the view should render."""
+    if is_fresh(etag):
+        return not_modified(etag)
+    if request.method == "HEAD":
+        return with_etag("", etag)
+    return None
+
+
+def with_etag(rv, etag):
+    response = make_response(rv)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def conditional_json(payload, etag=None):
+    """JSON response honouring If-None-Match.
+
+    Without an explicit `etag` the tag is derived from the serialized
+    body, which still saves the transfer for small, frequently polled
+    payloads. Pass `etag` when it is cheaper than building `payload`.
+    """
+    if etag is not None and is_fresh(etag):
+        return not_modified(etag)
+    body = json.dumps(payload, sort_keys=True, default=str)
+    if etag is None:
+        etag = etag_for(body)
+        if is_fresh(etag):
+            return not_modified(etag)
+    response = current_app.response_class(body, mimetype="application/json")
+    return with_etag(response, etag)
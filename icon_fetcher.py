@@ -0,0 +1,142 @@
+"""The one way icons get fetched.
+
+Icon downloads used to happen in four places with three behaviours:
+`image_utils.fetch_icon_if_missing` (register, add, edit, startup
+verification) retried both CDNs on every call for icons that don't
+exist and ran `inspect.stack()` each time just to log its caller; the
+explicit-`image_icon` branch of `resolve_image_metadata` had its own
+failure throttle (`routes_api.failed_icon_cache`); the add/edit forms
+downloaded with no throttle at all.
+
+`ensure(filename)` is now the only path. For a missing icon it:
+
+1. installs it from the local icon pack (`icon_pack`), if present;
+2. otherwise downloads it from jsDelivr, then GitHub raw
+   (`icon_registry.store` sanitizes and indexes it).
+
+A name every source failed for goes into a negative cache for
+`icon_fetch_retry_minutes` (default 60; a `BoundedLRU`, so unknown
+names can't grow it without limit) and costs nothing until then.
+Concurrent calls for the same name share one fetch (single flight):
+the first caller downloads, the others wait for its result.
+"""
+
+import logging
+import threading
+import time
+
+import requests
+
+import icon_pack
+import icon_registry
+from rate_limit import BoundedLRU
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_MINUTES = 60
+NEGATIVE_CACHE_SIZE = 4096
+REQUEST_TIMEOUT_SECONDS = 5
+
+SOURCES = (
+    ("https://cdn.jsdelivr.net/gh/homarr-labs/dashboard-icons/svg/{}", "jsDelivr CDN"),
+    ("https://raw.githubusercontent.com/homarr-labs/dashboard-icons/main/svg/{}", "GitHub Raw"),
+)
+
+_retry_seconds = DEFAULT_RETRY_MINUTES * 60
+_failed = BoundedLRU(NEGATIVE_CACHE_SIZE)  # filename -> monotonic retry-after
+
+_inflight_lock = threading.Lock()
+_inflight = {}  # filename -> _Flight
+
+
+class _Flight:
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+def configure(config):
+    """Apply `icon_fetch_retry_minutes`. Called once from create_app()."""
+    global _retry_seconds
+    _retry_seconds = max(0, int(config.get("icon_fetch_retry_minutes", DEFAULT_RETRY_MINUTES))) * 60
+    _failed.clear()
+
+
+def normalize(name):
+    """`Grafana`, `grafana.svg` → `grafana.svg`."""
+    name = (name or "").strip().lower()
+    if name.endswith(".svg"):
+        name = name[:-4]
+    return f"{name}.svg" if name else None
+
+
+def recently_failed(filename):
+    """True while `filename` is in the negative cache."""
+    retry_after = _failed.get(filename)
+    return retry_after is not None and time.monotonic() < retry_after
+
+
+def _download(filename, hint):
+    for template, label in SOURCES:
+        url = template.format(filename)
+        try:
+            logger.info(f"🌐 Trying {label} for icon: {filename}{hint}")
+            response = requests.get(url, timeout=REQUEST_TIMEOUT_SECONDS)
+            if response.status_code != 200:
+                logger.warning(f"⚠️ {label} failed for {filename}{hint} — HTTP {response.status_code}")
+                continue
+            icon_registry.store(filename, response.content)
+            logger.info(f"✅ Downloaded icon '{filename}' from {label}{hint}")
+            return True
+        except ValueError as e:
+            logger.warning(f"⚠️ {label} returned an unusable icon for {filename}{hint}: {e}")
+        except Exception as e:
+            logger.warning(f"⚠️ Exception while downloading {filename}{hint} from {label}: {e}")
+    return False
+
+
+def _fetch(filename, hint):
+    if icon_pack.install(filename):
+        logger.info(f"📦 Installed icon '{filename}' from the icon pack{hint}")
+        return True
+    if _download(filename, hint):
+        return True
+    logger.error(f"🛑 All sources failed for icon: {filename}{hint}")
+    return False
+
+
+def ensure(filename, source_hint=None):
+    """Make icon file `filename` available locally. Returns `filename`,
+    or None when it can't be had (now, or within the retry window of
+    an earlier failure)."""
+    if not filename:
+        return None
+    if icon_registry.has(filename):
+        return filename
+    if recently_failed(filename):
+        logger.debug(f"Skipping icon {filename}: failed recently.")
+        return None
+
+    with _inflight_lock:
+        flight = _inflight.get(filename)
+        leader = flight is None
+        if leader:
+            flight = _inflight[filename] = _Flight()
+    if not leader:
+        flight.done.wait()
+        return flight.result
+
+    try:
+        hint = f" - {source_hint}" if source_hint else ""
+        if _fetch(filename, hint):
+            _failed.pop(filename)
+            flight.result = filename
+        else:
+            _failed.set(filename, time.monotonic() + _retry_seconds)
+    finally:
+        with _inflight_lock:
+            del _inflight[filename]
+        flight.done.set()
+    return flight.result
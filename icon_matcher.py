@@ -0,0 +1,187 @@
+"""Map container image names to the closest known icon.
+
+`image_utils.resolve_image_metadata` used to try only `<img_name>.svg`
+or `<container_name>.svg`, so `linuxserver/sonarr-develop` or
+`ghcr.io/foo/jellyfin-server` missed the `sonarr` / `jellyfin` icons,
+and every miss cost two failed downloads.
+
+`best_icon(*names)` matches against the known icon catalog — the local
+icon pack (`icon_pack`) plus the icons already cached
+(`icon_registry`) — in this order, for each name in turn:
+
+1. the normalized name (lower-cased, last path component, tag removed,
+   separators collapsed, so `Home_Assistant` finds `home-assistant`);
+2. the name with version tokens and common suffixes/prefixes
+   (`-server`, `-develop`, `-nightly`, `docker-`, ...) stripped one at
+   a time from the end, then the front;
+3. character trigrams: the catalog entry with the highest Dice
+   similarity, accepted at `MIN_CONFIDENCE` or above.
+
+Steps 1–2 are dict probes and step 3 only scores catalog entries that
+share a trigram (from an inverted index), so a lookup is microseconds.
+Results, misses included, are cached per name until the catalog
+changes (an icon download, a pack import).
+
+Returns a `Match(icon, confidence)` — `icon` is the catalog file name,
+`confidence` 1.0 for an exact hit, 0.9 after stripping, else the Dice
+score — or None.
+
+Without an icon pack the catalog is only the icons cached so far, so
+`sonar` would match `sonarr.svg`. Callers go through
+`image_utils.fetch_best_icon`, which fetches the exact name first and
+uses a match only when that name exists nowhere.
+"""
+
+import re
+import threading
+from collections import defaultdict, namedtuple
+
+import icon_pack
+import icon_registry
+from rate_limit import BoundedLRU
+
+MIN_CONFIDENCE = 0.75
+
+# Confidence reported for a hit after stripping suffixes/prefixes.
+STRIPPED_CONFIDENCE = 0.9
+
+CACHE_SIZE = 4096
+
+# Tokens that qualify an image rather than name the application.
+NOISE_TOKENS = frozenset({
+    "alpha", "alpine", "amd64", "app", "arm", "arm64", "armhf", "beta", "ce",
+    "community", "debian", "dev", "develop", "development", "docker", "edge",
+    "ee", "full", "latest", "lite", "ls", "lts", "nightly", "official", "oss",
+    "preview", "rc", "release", "server", "slim", "stable", "ubuntu", "web",
+    "webui",
+})
+
+Match = namedtuple("Match", "icon confidence")
+
+_VERSION_TOKEN_RE = re.compile(r"^v?\d[\d.]*$")
+
+_lock = threading.Lock()
+_catalog_key = None
+_exact = {}  # compact stem -> icon file name
+_grams = {}  # trigram -> set of compact stems
+_cache = BoundedLRU(CACHE_SIZE)
+_MISS = object()
+
+
+def tokens(name):
+    """Normalized tokens of an image or container name."""
+    name = (name or "").lower().strip()
+    name = name.rsplit("/", 1)[-1].split("@", 1)[0].split(":", 1)[0]
+    if name.endswith(".svg"):
+        name = name[:-4]
+    return [t for t in re.split(r"[^a-z0-9]+", name) if t]
+
+
+def _compact(words):
+    return "".join(words)
+
+
+def _trigrams(text):
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _catalog():
+    return {n for n in icon_pack.names() + icon_registry.names() if n.lower().endswith(".svg")}
+
+
+def _ensure_index():
+    global _catalog_key, _exact, _grams
+    key = (icon_pack.generation(), icon_registry.generation())
+    if key == _catalog_key:
+        return
+    with _lock:
+        if key == _catalog_key:
+            return
+        exact, grams = {}, defaultdict(set)
+        # Shortest file name first, so `sonarr.svg` beats `sonarr-4k.svg`
+        # when both compact to the same stem.
+        for icon in sorted(_catalog(), key=lambda n: (len(n), n)):
+            stem = _compact(tokens(icon))
+            if not stem or stem in exact:
+                continue
+            exact[stem] = icon
+            for gram in _trigrams(stem):
+                grams[gram].add(stem)
+        _exact, _grams = exact, dict(grams)
+        _cache.clear()
+        _catalog_key = key
+
+
+def _stripped_forms(words):
+    """Progressively shorter token lists: version tokens dropped, then
+    noise tokens stripped from the end, then from the front."""
+    kept = [w for w in words if not _VERSION_TOKEN_RE.match(w)] or words
+    if len(kept) != len(words):
+        yield kept
+    end = len(kept)
+    while end > 1 and kept[end - 1] in NOISE_TOKENS:
+        end -= 1
+        yield kept[:end]
+    start = 0
+    while start < end - 1 and kept[start] in NOISE_TOKENS:
+        start += 1
+        yield kept[start:end]
+
+
+def _fuzzy(stem):
+    grams = _trigrams(stem)
+    if not grams:
+        return None
+    shared = defaultdict(int)
+    for gram in grams:
+        for candidate in _grams.get(gram, ()):
+            shared[candidate] += 1
+    best = None
+    for candidate, count in shared.items():
+        score = 2 * count / (len(grams) + len(_trigrams(candidate)))
+        if best is None or (score, -len(candidate)) > (best[1], -len(best[0])):
+            best = (candidate, score)
+    if best is None or best[1] < MIN_CONFIDENCE:
+        return None
+    return Match(_exact[best[0]], round(best[1], 3))
+
+
+def _match(name):
+    words = tokens(name)
+    if not words:
+        return None
+    icon = _exact.get(_compact(words))
+    if icon:
+        return Match(icon, 1.0)
+    for form in _stripped_forms(words):
+        icon = _exact.get(_compact(form))
+        if icon:
+            return Match(icon, STRIPPED_CONFIDENCE)
+    return _fuzzy(_compact(words))
+
+
+def match(name):
+    """Best catalog icon for one name, or None (cached)."""
+    if not name:
+        return None
+    _ensure_index()
+    key = name.lower()
+    cached = _cache.get(key, _MISS)
+    if cached is not _MISS:
+        return cached
+    result = _match(name)
+    _cache.set(key, result)
+    return result
+
+
+def best_icon(*names):
+    """The first confident match among `names` (e.g. image name, then
+    container name), or None."""
+    for name in names:
+        result = match(name)
+        if result is not None:
+            return result
+    return None
+
@@ -0,0 +1,260 @@
+"""Local icon pack: dashboard-icons without the network.
+
+Icon resolution used to mean a jsDelivr / GitHub download per icon,
+which blocks startup verification and registers on slow links and
+never succeeds on air-gapped installs. A pack is a compiled copy of
+the dashboard-icons SVGs that resolution checks first.
+
+On disk (`icon_pack_path`, default `/config/icon-pack`):
+
+- `icons-<hash>.bin` — every distinct icon's sanitized SVG bytes
+  (`svg_ingest.clean`), concatenated.
+- `index.json` — `{"version": 1, "data": "icons-<hash>.bin",
+  "source": ..., "built_at": ..., "icons": {name: [offset, length]}}`.
+
+The index is read on first lookup and kept as a dict, so a lookup is
+one hash probe whatever the pack size; the data file is memory-mapped,
+so only the icons actually installed are paged in.
+
+`import_pack(source)` compiles a pack from a dashboard-icons tarball
+(`.tar`, `.tar.gz`, ...; a path or an uploaded file) or a directory
+(a repository checkout or an extracted archive): every `*.svg`, keyed
+by lower-cased file name, the first of duplicate names winning. The
+new data file is written under a new name and `index.json` replaced
+last, so a running lookup never sees a half-written pack. The admin
+Icons settings section calls it.
+
+`install(name)` copies icon `name` from the pack into the icon folder
+(`icon_registry.store`) and reports whether it could.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import tarfile
+import threading
+from datetime import datetime
+
+import icon_registry
+import svg_ingest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PACK_PATH = "/config/icon-pack"
+INDEX_FILENAME = "index.json"
+INDEX_VERSION = 1
+
+# Archive members larger than this are skipped (no icon is close).
+MAX_ICON_BYTES = 1024 * 1024
+
+_lock = threading.Lock()
+# One import at a time; lookups keep using the old pack meanwhile.
+_import_lock = threading.Lock()
+_pack_path = DEFAULT_PACK_PATH
+_loaded = False
+_index = None  # parsed index.json, or None when there's no pack
+_data = None  # mmap of the data file
+_data_file = None
+_generation = 0  # moves whenever a (re)load sees a different pack
+
+
+def configure(config):
+    """Apply `icon_pack_path`. Called once from create_app()."""
+    global _pack_path
+    with _lock:
+        _pack_path = config.get("icon_pack_path") or DEFAULT_PACK_PATH
+        _unload_locked()
+
+
+def _unload_locked():
+    global _loaded, _index, _data, _data_file
+    if _data is not None:
+        _data.close()
+    if _data_file is not None:
+        _data_file.close()
+    _loaded, _index, _data, _data_file = False, None, None, None
+
+
+def _load_locked():
+    global _loaded, _index, _data, _data_file, _generation
+    _loaded = True
+    _generation += 1
+    index_path = os.path.join(_pack_path, INDEX_FILENAME)
+    if not os.path.exists(index_path):
+        return
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"unsupported index version {index.get('version')!r}")
+        data_file = open(os.path.join(_pack_path, index["data"]), "rb")
+        size = os.fstat(data_file.fileno()).st_size
+        data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"⚠️ Ignoring icon pack at {_pack_path}: {e}")
+        return
+    _index, _data, _data_file = index, data, data_file
+    logger.info(f"📦 Icon pack loaded: {len(index['icons'])} icon(s) from {index.get('source')}.")
+
+
+def _ensure_loaded():
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                _load_locked()
+
+
+def status():
+    """`{"icons", "source", "built_at", "path"}` for the settings page;
+    `icons` is 0 when there's no pack."""
+    _ensure_loaded()
+    index = _index or {}
+    return {
+        "icons": len(index.get("icons", {})),
+        "source": index.get("source"),
+        "built_at": index.get("built_at"),
+        "path": _pack_path,
+    }
+
+
+def names():
+    """Icon file names in the pack (empty without one)."""
+    _ensure_loaded()
+    index = _index
+    return list(index["icons"]) if index else []
+
+
+def generation():
+    """Counter that moves whenever the pack is (re)loaded."""
+    _ensure_loaded()
+    return _generation
+
+
+def get(name):
+    """SVG bytes for icon file `name` from the pack, or None."""
+    if not name:
+        return None
+    _ensure_loaded()
+    with _lock:
+        if _index is None:
+            return None
+        location = _index["icons"].get(name.lower())
+        if location is None or _data is None:
+            return None
+        offset, length = location
+        return _data[offset:offset + length]
+
+
+def install(name):
+    """Copy icon `name` from the pack into the icon folder. True when
+    the pack had it."""
+    content = get(name)
+    if content is None:
+        return False
+    try:
+        icon_registry.store(name, content)
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Could not install icon '{name}' from the icon pack: {e}")
+        return False
+    return True
+
+
+def _iter_directory(path):
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            full = os.path.join(dirpath, filename)
+            if filename.lower().endswith(".svg") and os.path.getsize(full) <= MAX_ICON_BYTES:
+                with open(full, "rb") as f:
+                    yield filename, f.read()
+
+
+def _iter_tar(archive):
+    for member in archive:
+        if not member.isfile() or not member.name.lower().endswith(".svg"):
+            continue
+        if member.size > MAX_ICON_BYTES:
+            continue
+        f = archive.extractfile(member)
+        if f is not None:
+            yield os.path.basename(member.name), f.read()
+
+
+def _compile(files, source):
+    """Write a pack from `(filename, bytes)` pairs; returns
+    `(icons, skipped)`."""
+    os.makedirs(_pack_path, exist_ok=True)
+    icons, skipped, offset = {}, 0, 0
+    locations = {}  # body -> [offset, length]; identical icons share bytes
+    digest = hashlib.sha256()
+    tmp_data = os.path.join(_pack_path, ".icons.bin.tmp")
+    with open(tmp_data, "wb") as out:
+        for filename, raw in files:
+            name = filename.lower()
+            if name in icons:
+                continue
+            try:
+                body = svg_ingest.clean(raw)
+            except ValueError:
+                skipped += 1
+                continue
+            if body not in locations:
+                out.write(body)
+                digest.update(body)
+                locations[body] = [offset, len(body)]
+                offset += len(body)
+            icons[name] = locations[body]
+
+    data_name = f"icons-{digest.hexdigest()[:12]}.bin"
+    os.replace(tmp_data, os.path.join(_pack_path, data_name))
+    index = {
+        "version": INDEX_VERSION,
+        "data": data_name,
+        "source": source,
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "icons": icons,
+    }
+    tmp_index = os.path.join(_pack_path, f".{INDEX_FILENAME}.tmp")
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp_index, os.path.join(_pack_path, INDEX_FILENAME))
+
+    for filename in os.listdir(_pack_path):
+        if filename.startswith("icons-") and filename.endswith(".bin") and filename != data_name:
+            try:
+                os.remove(os.path.join(_pack_path, filename))
+            except OSError:
+                pass
+    return len(icons), skipped
+
+
+def import_pack(source, fileobj=None):
+    """Build the pack from `source` — a directory or tarball path, or
+    with `fileobj` an uploaded tarball (`source` is then its name).
+    Returns `(icons, skipped)`. Raises ValueError for an unreadable
+    source."""
+    try:
+        if fileobj is not None:
+            with tarfile.open(fileobj=fileobj, mode="r:*") as archive:
+                result = _build(_iter_tar(archive), source)
+        elif os.path.isdir(source):
+            result = _build(_iter_directory(source), source)
+        elif os.path.isfile(source):
+            with tarfile.open(source, mode="r:*") as archive:
+                result = _build(_iter_tar(archive), source)
+        else:
+            raise ValueError(f"{source} is not a directory or file")
+    except tarfile.TarError as e:
+        raise ValueError(f"{source} is not a readable tar archive: {e}") from None
+    logger.info(f"📦 Icon pack imported from {source}: {result[0]} icon(s), {result[1]} skipped.")
+    return result
+
+
+def _build(files, source):
+    with _import_lock:
+        result = _compile(files, source)
+    with _lock:
+        _unload_locked()  # next lookup loads the new index
+    return result
@@ -0,0 +1,313 @@
+"""In-memory index of the cached service icons in `IMAGE_DIR`.
+
+Icon presence used to be an `os.path.exists` per entry wherever it
+mattered — startup verification, the `/settings` missing-icon list,
+`image_utils.resolve_image_metadata`, the add/edit routes — and
+`/images/<file>` read the file from disk on every request.
+
+`init_app(app)` indexes the folder once at startup: every top-level
+file's size, modification time and content hash (SHA-256, 16 hex
+chars), plus the bytes of SVGs up to `MEMORY_MAX_BYTES`. After that:
+
+- `has(name)` / `missing(names)` are set lookups.
+- `store(name, content)` is how downloads write icons: SVGs are
+  sanitized and minified (`svg_ingest.clean`), the bytes are stored
+  once under `.by-hash/<digest>.<ext>`, and `<name>` is written as a
+  hard link to that blob (a copy where the filesystem can't link) and
+  indexed in the same step. Identical icons under different names
+  share one file on disk and one body in memory; the name → digest
+  alias is what `lookup(name).digest` returns.
+- `lookup(name)` returns the indexed `IconFile`; `serve_image` answers
+  from its in-memory body with the content hash as a strong ETag, and
+  falls back to the disk for larger or non-indexed files.
+- `generation()` moves on every change, for caches built from icon
+  contents (`icon_sprite`).
+
+At startup, SVGs whose bytes aren't in the store yet (downloaded by
+an older version, or copied in by hand) are ingested the same way,
+and blobs no indexed icon has the digest of are removed. Both go by
+content digest, not link counts, so they behave the same where the
+filesystem only allows copies. Files that fail sanitizing are left
+as they are.
+
+Icons copied into the folder by hand are picked up too: lookups stat
+the folder at most every `RESCAN_INTERVAL_SECONDS`, and a changed
+modification time triggers an incremental rescan (only new or changed
+files are re-read).
+
+Like `change_tracker`, the index is per process.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import namedtuple
+
+import svg_ingest
+
+logger = logging.getLogger(__name__)
+
+# SVGs up to this size are kept in memory and served from there.
+MEMORY_MAX_BYTES = 64 * 1024
+
+RESCAN_INTERVAL_SECONDS = 10
+
+STORE_DIRNAME = ".by-hash"
+
+IconFile = namedtuple("IconFile", "digest size mtime_ns body")
+
+_lock = threading.Lock()
+_icons = {}  # file name -> IconFile
+_bodies = {}  # digest -> in-memory body, shared by aliases
+_image_dir = None
+_dir_mtime_ns = None
+_last_check = 0.0
+_generation = 0
+
+
+def _digest(body):
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+def _index_file(name, body, stat, digest=None):
+    digest = digest or _digest(body)
+    keep = name.lower().endswith(".svg") and len(body) <= MEMORY_MAX_BYTES
+    if keep:
+        body = _bodies.setdefault(digest, body)
+    return IconFile(digest, stat.st_size, stat.st_mtime_ns, body if keep else None)
+
+
+def _store_dir():
+    return os.path.join(_image_dir, STORE_DIRNAME)
+
+
+def _write_blob(content, ext):
+    """Store `content` under its digest; returns (digest, blob path)."""
+    digest = _digest(content)
+    store_dir = _store_dir()
+    blob = os.path.join(store_dir, f"{digest}{ext}")
+    if not os.path.exists(blob):
+        os.makedirs(store_dir, exist_ok=True)
+        tmp = f"{blob}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, blob)
+    return digest, blob
+
+
+def _link(blob, name):
+    """Point `<name>` at `blob` atomically (hard link, else a copy)."""
+    path = os.path.join(_image_dir, name)
+    try:
+        if os.path.samefile(blob, path):
+            return path  # already linked (renaming onto it would be a no-op)
+    except OSError:
+        pass
+    tmp = os.path.join(_image_dir, f".{name}.tmp")
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        shutil.copyfile(blob, tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def _ingest(name, content):
+    """Clean `content` for `name` if it's an SVG, store it by hash and
+    link `name` to it. Returns (digest, stored bytes, path)."""
+    ext = os.path.splitext(name)[1].lower()
+    if ext == ".svg":
+        content = svg_ingest.clean(content)
+    digest, blob = _write_blob(content, ext)
+    return digest, content, _link(blob, name)
+
+
+def _adopt_locked():
+    """Ingest SVGs whose bytes aren't in the store yet. Caller holds
+    `_lock`.
+
+    Whether a name is a hard link or a copy of its blob doesn't matter
+    (filesystems without hard links get copies): a file is ingested
+    when a blob with its digest exists."""
+    adopted = saved = 0
+    try:
+        entries = list(os.scandir(_image_dir))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name.startswith(".") or not entry.name.lower().endswith(".svg"):
+            continue
+        try:
+            if not entry.is_file():
+                continue
+            with open(entry.path, "rb") as f:
+                raw = f.read()
+            if os.path.exists(os.path.join(_store_dir(), f"{_digest(raw)}.svg")):
+                continue
+            _, content, _ = _ingest(entry.name, raw)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Left icon '{entry.name}' as is: {e}")
+            continue
+        adopted += 1
+        saved += len(raw) - len(content)
+    if adopted:
+        logger.info(f"🗜️ Ingested {adopted} icon(s) into the hash store ({saved} bytes saved).")
+
+
+def _collect_garbage_locked():
+    """Remove blobs no indexed icon has the digest of. Caller holds
+    `_lock`, after `_scan_locked`."""
+    store_dir = _store_dir()
+    if not os.path.isdir(store_dir):
+        return
+    live = {icon.digest for icon in _icons.values()}
+    removed = 0
+    for entry in os.scandir(store_dir):
+        digest = os.path.splitext(entry.name)[0]
+        if digest in live or entry.name.endswith(".tmp"):
+            continue
+        try:
+            if entry.is_file():
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        logger.info(f"🗜️ Removed {removed} unused icon blob(s).")
+
+
+def _dir_stamp():
+    try:
+        return os.stat(_image_dir).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scan_locked():
+    """Bring `_icons` in line with the folder. Caller holds `_lock`."""
+    global _dir_mtime_ns, _generation
+    _dir_mtime_ns = _dir_stamp()
+    seen, changed = set(), False
+    try:
+        entries = list(os.scandir(_image_dir))
+    except OSError as e:
+        logger.warning(f"⚠️ Could not index icon folder {_image_dir}: {e}")
+        entries = []
+    for entry in entries:
+        if entry.name.startswith(".") or not entry.is_file():
+            continue
+        seen.add(entry.name)
+        try:
+            stat = entry.stat()
+            known = _icons.get(entry.name)
+            if known and (known.size, known.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            with open(entry.path, "rb") as f:
+                body = f.read()
+        except OSError:
+            continue
+        _icons[entry.name] = _index_file(entry.name, body, stat)
+        changed = True
+    for name in set(_icons) - seen:
+        del _icons[name]
+        changed = True
+    if changed:
+        _generation += 1
+        live = {icon.digest for icon in _icons.values()}
+        for digest in set(_bodies) - live:
+            del _bodies[digest]
+
+
+def _maybe_rescan():
+    global _last_check
+    now = time.monotonic()
+    if _image_dir is None or now - _last_check < RESCAN_INTERVAL_SECONDS:
+        return
+    with _lock:
+        _last_check = now
+        if _dir_stamp() != _dir_mtime_ns:
+            _scan_locked()
+
+
+def init_app(app):
+    """Index `app.config['IMAGE_DIR']`. Called once from create_app()."""
+    global _image_dir, _last_check
+    with _lock:
+        _image_dir = app.config["IMAGE_DIR"]
+        _icons.clear()
+        _bodies.clear()
+        _adopt_locked()
+        _scan_locked()
+        _collect_garbage_locked()
+        _last_check = time.monotonic()
+        count = len(_icons)
+        in_memory = sum(1 for icon in _icons.values() if icon.body is not None)
+    logger.info(f"🖼️ Indexed {count} icon file(s) ({in_memory} served from memory).")
+
+
+def has(name):
+    """True when icon file `name` is in the folder."""
+    if not name:
+        return False
+    _maybe_rescan()
+    return name in _icons
+
+
+def missing(names):
+    """The names in `names` that aren't in the folder (order kept)."""
+    _maybe_rescan()
+    return [name for name in names if name and name not in _icons]
+
+
+def lookup(name):
+    """The `IconFile` for `name`, or None."""
+    if not name:
+        return None
+    _maybe_rescan()
+    return _icons.get(name)
+
+
+def names():
+    """Names of every indexed icon file."""
+    _maybe_rescan()
+    return list(_icons)
+
+
+def read(name):
+    """Contents of icon file `name` (from memory when indexed there),
+    or None."""
+    icon = lookup(name)
+    if icon is None:
+        return None
+    if icon.body is not None:
+        return icon.body
+    try:
+        with open(os.path.join(_image_dir, name), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def store(name, content):
+    """Ingest downloaded icon `content` as file `name` and index it.
+    Returns `name`. Raises ValueError for an invalid name or an SVG
+    that fails sanitizing."""
+    global _dir_mtime_ns, _generation
+    if not name or os.sep in name or name.startswith("."):
+        raise ValueError(f"Invalid icon file name: {name!r}")
+    with _lock:
+        digest, content, path = _ingest(name, content)
+        _icons[name] = _index_file(name, content, os.stat(path), digest)
+        _dir_mtime_ns = _dir_stamp()
+        _generation += 1
+    return name
+
+
+def generation():
+    """Counter that moves whenever an indexed icon is added, changed or
+    removed."""
+    _maybe_rescan()
+    return _generation
@@ -0,0 +1,284 @@
+"""SVG sprites of the service icons a dashboard view shows.
+
+Every tile and row used to load its icon from `/images/<file>` on its
+own: a cold load of a 300-service dashboard was 300 authenticated
+requests, each through `login_required` and `send_from_directory`.
+
+`for_icons(names)` builds one sprite per distinct set of icons: an SVG
+document with a `<symbol id="icon-<name>">` per SVG icon, content
+hashed (SHA-256) and written to `<IMAGE_DIR>/.sprites/<hash>.svg`.
+Templates reference symbols with `<svg><use href="…/<hash>.svg#icon-x">`,
+so the browser fetches the whole view's icons in a single response
+that `/images/sprite/<hash>.svg` serves as immutable.
+
+- Each icon's root `<svg>` becomes a `<symbol>` with its `viewBox`
+  (or one derived from `width`/`height`); root presentation attributes
+  (`fill="none"`, stroke settings, ...) move to a wrapping `<g>`.
+  Internal IDs (gradients, clip paths) get the symbol ID as a prefix
+  so icons can't capture each other's references.
+- A `<style>` block applies to the whole sprite document, not just
+  its symbol, and exported icons commonly all use `.cls-1`. Class
+  names (in `class` attributes and selectors) and `#id` selectors get
+  the same prefix; an icon with a rule that can't be scoped that way
+  (a bare element selector, an at-rule) is left out of the sprite.
+- Icons that aren't SVG, are missing, or can't be parsed are left out;
+  templates fall back to `<img>` for them (`Sprite.href()` is None).
+- Built sprites are memoized in memory by the set of names and
+  `icon_registry.generation()`, which moves whenever an icon is
+  downloaded, added, changed or removed, so new icons yield a new
+  sprite (and a new URL) on the next render. A sprite whose hash is already on
+  disk isn't rewritten; the oldest files beyond `MAX_SPRITE_FILES` are
+  pruned.
+
+Sprite URLs stay valid across restarts since they're served from disk.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+
+from flask import current_app, url_for
+
+import icon_registry
+from rate_limit import BoundedLRU
+
+logger = logging.getLogger(__name__)
+
+SPRITE_DIRNAME = ".sprites"
+MAX_SPRITE_FILES = 64
+
+_MEMO_SIZE = 64
+
+_memo = BoundedLRU(_MEMO_SIZE)
+# Serializes builds so concurrent renders of a new view build once.
+_build_lock = threading.Lock()
+
+_ROOT_RE = re.compile(r"<svg\b([^>]*)>(.*)</svg\s*>", re.S | re.I)
+_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+_STRIP_RE = re.compile(
+    r"<!--.*?-->|<\?xml.*?\?>|<!DOCTYPE[^>]*>|<script\b.*?</script\s*>|<metadata\b.*?</metadata\s*>",
+    re.S | re.I,
+)
+_ID_RE = re.compile(r'\bid\s*=\s*["\']([^"\']+)["\']')
+_NUMBER_RE = re.compile(r"^\s*([\d.]+)(?:px)?\s*$")
+_STYLE_RE = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.S | re.I)
+_CLASS_ATTR_RE = re.compile(r'(\bclass\s*=\s*)(["\'])([^"\']*)\2')
+_CSS_RULE_RE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+_CSS_CLASS_RE = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+_CSS_ID_RE = re.compile(r"#(-?[_a-zA-Z][\w-]*)")
+
+# Root attributes that style the icon's contents; carried over onto a
+# `<g>` inside the symbol.
+_INHERITED_ATTRS = (
+    "fill", "fill-rule", "fill-opacity", "clip-rule", "stroke", "stroke-width",
+    "stroke-linecap", "stroke-linejoin", "stroke-miterlimit", "stroke-opacity",
+    "opacity", "color", "style",
+)
+
+
+def symbol_id(name):
+    """Symbol ID for icon file `name` (`grafana.svg` → `icon-grafana`)."""
+    stem = name[:-4] if name.lower().endswith(".svg") else name
+    return "icon-" + re.sub(r"[^a-z0-9_-]", "_", stem.lower())
+
+
+class Sprite:
+    """A built sprite: its content `digest` and the icon names it has a
+    symbol for."""
+
+    __slots__ = ("digest", "names", "_url")
+
+    def __init__(self, digest, names):
+        self.digest = digest
+        self.names = frozenset(names)
+        self._url = None
+
+    @property
+    def url(self):
+        if self._url is None:
+            self._url = url_for("dashboard.serve_icon_sprite", digest=self.digest)
+        return self._url
+
+    def href(self, name):
+        """`<use href>` for icon `name`, or None when the sprite has no
+        symbol for it (render an `<img>` instead)."""
+        if not name or name not in self.names:
+            return None
+        return f"{self.url}#{symbol_id(name)}"
+
+
+def sprite_dir():
+    return os.path.join(current_app.config["IMAGE_DIR"], SPRITE_DIRNAME)
+
+
+def _view_box(attrs):
+    if "viewBox" in attrs:
+        return attrs["viewBox"]
+    width = _NUMBER_RE.match(attrs.get("width", ""))
+    height = _NUMBER_RE.match(attrs.get("height", ""))
+    if width and height:
+        return f"0 0 {width.group(1)} {height.group(1)}"
+    return None
+
+
+def _prefix_ids(body, prefix):
+    ids = set(_ID_RE.findall(body))
+    if not ids:
+        return body
+
+    def local(ref):
+        return f"{prefix}-{ref}" if ref in ids else ref
+
+    body = _ID_RE.sub(lambda m: f'id="{local(m.group(1))}"', body)
+    body = re.sub(
+        r"url\(\s*['\"]?#([^)'\"]+)['\"]?\s*\)", lambda m: f"url(#{local(m.group(1))})", body
+    )
+    return re.sub(
+        r'(href\s*=\s*["\'])#([^"\']+)', lambda m: f"{m.group(1)}#{local(m.group(2))}", body
+    )
+
+
+def _scope_css(css, prefix):
+    """`css` with class and ID selectors prefixed, or None when a rule
+    would still match outside this icon."""
+    css = re.sub(r"/\*.*?\*/", "", css.replace("<![CDATA[", "").replace("]]>", ""), flags=re.S)
+    rules = []
+    for match in _CSS_RULE_RE.finditer(css):
+        selectors = []
+        for selector in match.group(1).split(","):
+            if not _CSS_CLASS_RE.search(selector) and not _CSS_ID_RE.search(selector):
+                return None
+            selector = _CSS_CLASS_RE.sub(lambda m: f".{prefix}-{m.group(1)}", selector)
+            selector = _CSS_ID_RE.sub(lambda m: f"#{prefix}-{m.group(1)}", selector)
+            selectors.append(selector.strip())
+        rules.append(f"{','.join(selectors)}{{{match.group(2).strip()}}}")
+    if _CSS_RULE_RE.sub("", css).strip():
+        return None  # at-rules, nesting or stray text
+    return "".join(rules)
+
+
+def _scope_styles(body, prefix):
+    """`body` with its class names and `<style>` selectors prefixed, or
+    None if a stylesheet can't be confined to the icon."""
+    body = _CLASS_ATTR_RE.sub(
+        lambda m: m.group(1) + m.group(2)
+        + " ".join(f"{prefix}-{c}" for c in m.group(3).split()) + m.group(2),
+        body,
+    )
+    unscoped = False
+
+    def scope(match):
+        nonlocal unscoped
+        css = _scope_css(match.group(2), prefix)
+        if css is None:
+            unscoped = True
+            return match.group(0)
+        return match.group(1) + css + match.group(3)
+
+    body = _STYLE_RE.sub(scope, body)
+    return None if unscoped else body
+
+
+def to_symbol(name, svg_text):
+    """`<symbol>` markup for one icon's SVG source, or None if it has
+    no usable root element or dimensions, or a stylesheet that can't be
+    scoped to it."""
+    match = _ROOT_RE.search(_STRIP_RE.sub("", svg_text))
+    if match is None:
+        return None
+    attrs = {m.group(1): m.group(2) if m.group(2) is not None else m.group(3)
+             for m in _ATTR_RE.finditer(match.group(1))}
+    view_box = _view_box(attrs)
+    if view_box is None:
+        return None
+    sid = symbol_id(name)
+    body = _scope_styles(_prefix_ids(match.group(2).strip(), sid), sid)
+    if body is None:
+        return None
+    inherited = " ".join(
+        f'{key}="{attrs[key]}"' for key in _INHERITED_ATTRS if key in attrs
+    )
+    if inherited:
+        body = f"<g {inherited}>{body}</g>"
+    return f'<symbol id="{sid}" viewBox="{view_box}">{body}</symbol>'
+
+
+def build(names):
+    """Sprite document bytes for `names` and the names it covers."""
+    symbols, covered = [], []
+    for name in sorted(names):
+        if not name.lower().endswith(".svg"):
+            continue
+        body = icon_registry.read(name)
+        if body is None:
+            continue
+        try:
+            symbol = to_symbol(name, body.decode("utf-8"))
+        except UnicodeDecodeError:
+            continue
+        if symbol is None:
+            logger.debug(f"Icon '{name}' has no usable <svg> root or an unscopable <style>; left out of the sprite.")
+            continue
+        symbols.append(symbol)
+        covered.append(name)
+    document = (
+        '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
+        + "".join(symbols)
+        + "</svg>"
+    )
+    return document.encode("utf-8"), covered
+
+
+def _write(directory, digest, body):
+    path = os.path.join(directory, f"{digest}.svg")
+    if os.path.exists(path):
+        return
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)
+
+    files = sorted(
+        (os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".svg")),
+        key=os.path.getmtime,
+    )
+    for old in files[:-MAX_SPRITE_FILES]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+
+def for_icons(names):
+    """The `Sprite` covering icon file `names` (built on first use)."""
+    names = frozenset(n for n in names if n)
+    key = (names, icon_registry.generation())
+
+    sprite = _memo.get(key)
+    if sprite is not None:
+        return sprite
+
+    with _build_lock:
+        sprite = _memo.get(key)
+        if sprite is not None:
+            return sprite
+        body, covered = build(names)
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        try:
+            _write(sprite_dir(), digest, body)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write icon sprite {digest}: {e}")
+            covered = []
+        sprite = Sprite(digest, covered)
+        _memo.set(key, sprite)
+    if covered:
+        logger.debug(f"🧩 Built icon sprite {digest} ({len(covered)} symbol(s)).")
+    return sprite
+
+
+def for_view(view):
+    """The `Sprite` for every icon in a `dashboard_snapshot` view."""
+    return for_icons({e.image_icon for _, bucket in view.grouped_entries for e in bucket})
@@ -1,58 +1,29 @@
-import os
-import requests
-from datetime import datetime
-import inspect
+import icon_fetcher
+import icon_matcher
 
 
+def fetch_icon_if_missing(name, source_hint=None):
+    """`<name>.svg` (lower-cased) once it's available locally, or None.
+    See `icon_fetcher.ensure`."""
+    return icon_fetcher.ensure(icon_fetcher.normalize(name), source_hint=source_hint)
 
-def fetch_icon_if_missing(name, image_dir, logger, debug=False, source_hint=None):
-    if not name:
-        return None
-
-    # Get calling function or route
-    stack = inspect.stack()
-    caller_function = stack[1].function if len(stack) > 1 else "unknown"
-
-    if name.lower().endswith(".svg"):
-        name = name[:-4]  # remove exactly 4 characters: ".svg"
-    name = name.lower()
-    filename = f"{name}.svg"
-    local_path = os.path.join(image_dir, filename)
-
-    if os.path.exists(local_path):
-        return filename
-
-    sources = [
-        (f"https://cdn.jsdelivr.net/gh/homarr-labs/dashboard-icons/svg/{filename}", "jsDelivr CDN"),
-        (f"https://raw.githubusercontent.com/homarr-labs/dashboard-icons/main/svg/{filename}", "GitHub Raw")
-    ]
 
-    label_hint = f" - {source_hint}" if source_hint else ""
-    caller_hint = f" [caller: {caller_function}]"
-
-    for url, label in sources:
-        try:
-            logger.info(f"🌐 Trying {label} for icon: {filename}{label_hint}{caller_hint}")
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                with open(local_path, 'wb') as f:
-                    f.write(response.content)
-                logger.info(f"✅ Downloaded icon '{filename}' from {label}{label_hint}{caller_hint}")
-                return filename
-            else:
-                msg = f"{label} failed for {filename}{label_hint} — HTTP {response.status_code}{caller_hint}"
-                if debug:
-                    logger.debug(f"❌ {msg} | URL: {url}")
-                else:
-                    logger.warning(f"⚠️ {msg}")
-        except Exception as e:
-            msg = f"Exception while downloading {filename}{label_hint} from {label}: {e}{caller_hint}"
-            if debug:
-                logger.debug(f"❌ {msg} | URL: {url}")
-            else:
-                logger.error(f"❌ {msg}")
-
-    logger.error(f"🛑 All sources failed for icon: {filename}{label_hint}{caller_hint}")
+def fetch_best_icon(*names, source_hint=None):
+    """The icon for the first of `names`, fetched under its exact name;
+    only when that isn't available anywhere, the closest known icon
+    (`icon_matcher`) for any of them. Returns the icon file name, or
+    None."""
+    names = [name for name in names if name]
+    if not names:
+        return None
+    icon = fetch_icon_if_missing(names[0], source_hint=source_hint)
+    if icon:
+        return icon
+    # `linuxserver/sonarr-develop` → sonarr.svg. The catalog may be just
+    # the icons cached so far, so this never overrides an exact name.
+    match = icon_matcher.best_icon(*names)
+    if match:
+        return fetch_icon_if_missing(match.icon, source_hint=source_hint)
     return None
 
 
@@ -68,11 +39,6 @@ def resolve_image_metadata(
     image_raw=None,
     image_icon_override=None,
     fallback_name=None,
-    image_dir=None,
-    failed_icon_cache=None,
-    retry_interval=None,
-    logger=None,
-    debug=False
 ):
     registry = owner = img_name = tag = None
 
@@ -94,41 +60,9 @@ def resolve_image_metadata(
     image_icon = image_icon_override
 
     if not image_icon and icon_source_name:
-        image_icon = fetch_icon_if_missing(
-            icon_source_name,
-            image_dir,
-            logger,
-            debug=debug,
-            source_hint=fallback_name
-        )
+        image_icon = fetch_best_icon(icon_source_name, fallback_name, source_hint=fallback_name)
     elif image_icon:
-        icon_path = os.path.join(image_dir, image_icon)
-        now = datetime.now()
-        last_fail = failed_icon_cache.get(image_icon)
-
-        if not os.path.exists(icon_path) and (not last_fail or now - last_fail > retry_interval):
-            try:
-                icon_url = f"https://raw.githubusercontent.com/homarr-labs/dashboard-icons/main/svg/{image_icon}"
-                response = requests.get(icon_url, timeout=5)
-                if response.status_code == 200:
-                    with open(icon_path, 'wb') as f:
-                        f.write(response.content)
-                    logger.info(f"⬇️ Downloaded explicitly provided icon: {image_icon}")
-                    failed_icon_cache.pop(image_icon, None)
-                else:
-                    failed_icon_cache[image_icon] = now
-                    msg = f"Could not download image_icon '{image_icon}' — status {response.status_code}"
-                    if debug:
-                        logger.debug(f"❌ {msg} | URL: {icon_url}")
-                    else:
-                        logger.warning(f"⚠️ {msg}")
-            except Exception as e:
-                failed_icon_cache[image_icon] = now
-                msg = f"Failed to fetch image_icon '{image_icon}': {e}"
-                if debug:
-                    logger.debug(f"❌ {msg} | URL: {icon_url}")
-                else:
-                    logger.warning(f"⚠️ {msg}")
+        icon_fetcher.ensure(image_icon)
 
     return {
         "registry": registry,
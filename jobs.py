@@ -9,18 +9,27 @@ reference here.
 Public entry points:
 - `start_background_workers(app)` — registers the APScheduler jobs
   (widget refresh, daily backup, widget_value retention prune) and
-  starts the URL health-check thread. Called once from the __main__
-  block after migrations.
-- `verify_and_fetch_missing_icons(app)` — one-shot icon sweep run
-  at startup.
+  starts the URL health-check thread. The widget refresh fetches
+  concurrently (`widget_refresh`), writes once per run and never
+  overlaps itself. Called once from the __main__ block after
+  migrations.
+- `start_icon_verification(app)` — one-shot icon sweep run at
+  startup on a daemon thread: the distinct icons no service has
+  cached are fetched by a small worker pool
+  (`icon_verify_workers`), with progress and failures reported by
+  `icon_sweep_status()` (shown on the settings page).
+- `start_exposure_recompute(app, entry_ids)` — re-synthesizes URLs
+  for the services affected by an exposure settings save, in
+  short per-chunk transactions. Small batches run inline; larger
+  ones on a daemon thread whose progress is reported by
+  `exposure_recompute_status()`.
 """
 
-import importlib
-import json
 import logging
 import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from functools import partial
 
@@ -29,69 +38,172 @@ import yaml
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
-
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import change_tracker
+import icon_fetcher
+import icon_registry
+import synthesizer
+import widget_refresh
+import widget_store
 from extensions import db
 from image_utils import fetch_icon_if_missing
 from models import ServiceEntry, Widget, WidgetValue
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_RECOMPUTE_CHUNK_SIZE = 200
+DEFAULT_ICON_SWEEP_WORKERS = 4
+# Unchanged widget values are rewritten (just `last_updated`) once
+# they are this old, or a quarter of `widget_value_retention_days` when
+# that is shorter (see `_widget_value_touch_after`).
+WIDGET_VALUE_TOUCH_AFTER = timedelta(days=1)
+# Failed icon names kept for the settings page (the count is exact).
+ICON_SWEEP_FAILED_LIMIT = 100
+
+# Progress of the startup icon sweep. Guarded by `_icon_sweep_lock`.
+_icon_sweep_lock = threading.Lock()
+_icon_sweep_state = {
+    "status": "idle",  # idle | running | done | failed
+    "total": 0,
+    "done": 0,
+    "fetched": 0,
+    "failed_count": 0,
+    "failed": [],
+    "started_at": None,
+    "finished_at": None,
+    "error": None,
+}
+
+# Progress of the exposure recompute worker. Guarded by
+# `_recompute_lock`; `_recompute_pending` collects IDs from saves
+# that arrive while a run is in flight so the worker picks them up
+# before it exits rather than starting a second thread.
+_recompute_lock = threading.Lock()
+_recompute_pending = set()
+_recompute_state = {
+    "status": "idle",  # idle | running | done | failed
+    "total": 0,
+    "done": 0,
+    "started_at": None,
+    "finished_at": None,
+    "error": None,
+}
+
 
 def update_widget_data_periodically(app):
+    """Fetch every widget concurrently (`widget_refresh.fetch_all`),
+    then write all the results in one transaction."""
     with app.app_context():
-        widgets = Widget.query.all()
-
-        for widget in widgets:  # ✅ Now inside context
-            print(f"🔄 Running widget fetch for: {widget.widget_name} ({widget.id})")
-            try:
-                widget_key = widget.widget_name  # 💡 Use widget_name, not widget_key
-                widget_dir = os.path.join('widgets', widget_key)
-                settings_path = os.path.join(widget_dir, 'settings.json')
-
-                if not os.path.exists(settings_path):
-                    print(f"⚠️ Missing settings.json for widget '{widget_key}'")
-                    continue
-
-                with open(settings_path, 'r') as f:
-                    settings = json.load(f)
-
-                available_fields = settings.get("available_fields", [])
-                requested_fields = widget.widget_fields
-                api_url = widget.widget_url
-                api_key = widget.widget_api_key
-
-                try:
-                    module = importlib.import_module(f"widgets.{widget_key}.fetch_data")
-                    fetch_func = getattr(module, "fetch_widget_data")
-                    data = fetch_func(api_url, api_key, requested_fields, available_fields)
-                except Exception as e:
-                    print(f"❌ Failed to load widget fetcher for '{widget_key}': {e}")
-                    continue
-
-                if isinstance(data, dict) and "error" in data:
-                    print(f"❌ Error fetching data for widget {widget.id}: {data['error']}")
-                    continue
-
-                for key, value in data.items():
-                    widget_value = WidgetValue.query.filter_by(widget_id=widget.id, widget_value_key=key).first()
-
-                    if not widget_value:
-                        widget_value = WidgetValue(
-                            widget_id=widget.id,
-                            widget_value_key=key,
-                            widget_value=str(value),
-                            last_updated=datetime.utcnow()
-                        )
-                        db.session.add(widget_value)
-                    else:
-                        widget_value.widget_value = str(value)
-                        widget_value.last_updated = datetime.utcnow()
-
-                db.session.commit()
-                print(f"✅ Updated values for widget {widget_key} (ID: {widget.id})")
+        tasks = [
+            widget_refresh.WidgetTask(
+                widget.id, widget.widget_name, widget.widget_url, widget.widget_api_key,
+                list(widget.widget_fields or []),
+            )
+            for widget in Widget.query.all()
+        ]
+        # Nothing is held open while the fetches run.
+        db.session.rollback()
+        if not tasks:
+            return
+
+        results = widget_refresh.fetch_all(tasks)
+        fetched = {}
+        for result in results:
+            task = result.task
+            if result.status == "ok":
+                fetched[task.widget_id] = {key: str(value) for key, value in result.values.items()}
+                logger.debug(f"✅ Fetched widget {task.name} (ID: {task.widget_id}) in {result.duration_ms} ms")
+            else:
+                logger.warning(
+                    f"❌ Widget {task.name} (ID: {task.widget_id}) {result.status} after "
+                    f"{result.duration_ms} ms: {result.error}"
+                )
+        if not fetched:
+            return
 
-            except Exception as e:
-                print(f"🔥 Exception while processing widget {widget.id}: {str(e)}")
+        try:
+            changed = _write_widget_values(fetched, _widget_value_touch_after(app))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Writing widget values failed")
+            return
+
+        if changed:
+            # The upsert runs on the session's connection, outside the
+            # ORM events change_tracker listens to.
+            change_tracker.bump(widget_ids=changed, structural=False, kinds=("widget",))
+            for widget_id, values in changed.items():
+                widget_store.put(widget_id, values)
+        failed = len(results) - len(fetched)
+        logger.info(
+            f"🔄 Refreshed {len(fetched)} widget(s), {len(changed)} with new values"
+            + (f", {failed} failed or timed out" if failed else "")
+        )
+
+
+def _widget_value_touch_after(app):
+    """How old an unchanged widget value may get before the refresh
+    rewrites its `last_updated`: `WIDGET_VALUE_TOUCH_AFTER`, capped at a
+    quarter of the retention window so `prune_widget_values` never
+    reaches a value that is still being fetched."""
+    try:
+        retention_days = max(0, int(app.config.get("widget_value_retention_days", 30)))
+    except (TypeError, ValueError):
+        retention_days = 30
+    return min(WIDGET_VALUE_TOUCH_AFTER, timedelta(days=retention_days) / 4)
+
+
+def _write_widget_values(fetched, touch_after=WIDGET_VALUE_TOUCH_AFTER):
+    """Upsert `{widget_id: {key: value}}` into widget_value, one
+    executemany per widget, skipping keys whose value is unchanged
+    unless their `last_updated` is older than `touch_after` (so the
+    retention prune never takes a live value). Returns
+    `{widget_id: {key: value}}` of the values that changed. Caller
+    commits."""
+    now = datetime.utcnow()
+    touch_before = now - touch_after
+    current = {}
+    # Widgets deleted while their fetch ran have nothing to update.
+    live = {
+        widget_id for (widget_id,) in
+        db.session.query(Widget.id).filter(Widget.id.in_(list(fetched)))
+    }
+    for widget_id, key, value, last_updated in db.session.query(
+        WidgetValue.widget_id, WidgetValue.widget_value_key,
+        WidgetValue.widget_value, WidgetValue.last_updated,
+    ).filter(WidgetValue.widget_id.in_(list(live))):
+        current[(widget_id, key)] = (value, last_updated)
+
+    table = WidgetValue.__table__
+    insert = sqlite_insert(table)
+    upsert = insert.on_conflict_do_update(
+        index_elements=[table.c.widget_id, table.c.widget_value_key],
+        set_={
+            "widget_value": insert.excluded.widget_value,
+            "last_updated": insert.excluded.last_updated,
+        },
+    )
+    connection = db.session.connection()
+    changed = {}
+    for widget_id in sorted(live):
+        rows = []
+        for key, value in fetched[widget_id].items():
+            existing = current.get((widget_id, key))
+            if existing is not None and existing[0] == value and existing[1] >= touch_before:
+                continue
+            if existing is None or existing[0] != value:
+                changed.setdefault(widget_id, {})[key] = value
+            rows.append({
+                "widget_id": widget_id,
+                "widget_value_key": key,
+                "widget_value": value,
+                "last_updated": now,
+            })
+        if rows:
+            connection.execute(upsert, rows)
+    return changed
 
 
 # Background health check loop
@@ -197,9 +309,11 @@ def prune_widget_values(app):
     configured retention window.
 
     The widget refresh loop upserts in place — one row per
-    (widget_id, widget_value_key) — so old `last_updated` timestamps
-    mean the key has been abandoned (widget configuration removed the
-    field). Pruning keeps the table from growing unbounded.
+    (widget_id, widget_value_key) — and touches unchanged values at
+    least daily, and at least four times per retention window
+    (`_widget_value_touch_after`), so old `last_updated`
+    timestamps mean the key has been abandoned (widget configuration
+    removed the field). Pruning keeps the table from growing unbounded.
 
     Wrapped in try/except so a transient DB error never kills the
     scheduler. Follows the same pattern Phase 7a applied to the URL
@@ -227,26 +341,176 @@ def prune_widget_values(app):
                 logger.exception("Failed to roll back session after prune error")
 
 
+def _icon_sweep_workers(app):
+    workers = app.config.get("icon_verify_workers")
+    if not isinstance(workers, int) or workers <= 0:
+        return DEFAULT_ICON_SWEEP_WORKERS
+    return workers
+
+
+def _fetch_for_sweep(icon):
+    fetched = fetch_icon_if_missing(icon)
+    with _icon_sweep_lock:
+        _icon_sweep_state["done"] += 1
+        if fetched:
+            _icon_sweep_state["fetched"] += 1
+        else:
+            _icon_sweep_state["failed_count"] += 1
+            if len(_icon_sweep_state["failed"]) < ICON_SWEEP_FAILED_LIMIT:
+                _icon_sweep_state["failed"].append(icon)
+    return fetched
+
+
 # Check images at startup
 def verify_and_fetch_missing_icons(app):
-    image_dir = app.config['IMAGE_DIR']
+    """Fetch every service icon that isn't cached, `icon_verify_workers`
+    at a time. Progress goes to `icon_sweep_status()`."""
     logger.info("🔍 Verifying icon files for all ServiceEntry records...")
-    with app.app_context():
-        entries = ServiceEntry.query.all()
-        missing_count = 0
-        for entry in entries:
-            icon = entry.image_icon
-            if icon:
-                icon_path = os.path.join(image_dir, icon)
-                if not os.path.exists(icon_path):
-                    logger.warning(f"🚫 Missing icon: {icon} — attempting download...")
-                    fetched = fetch_icon_if_missing(icon, image_dir, logger, debug=app.debug)
-                    if fetched:
-                        logger.info(f"✅ Successfully fetched missing icon: {fetched}")
-                    else:
-                        logger.error(f"❌ Failed to download icon: {icon}")
-                        missing_count += 1
-        logger.info(f"🔁 Icon verification complete. Missing count: {missing_count}")
+    try:
+        with app.app_context():
+            icons = {icon for (icon,) in db.session.query(ServiceEntry.image_icon).distinct() if icon}
+            db.session.remove()
+        # Entries differing only in case / the .svg suffix fetch once.
+        missing = sorted({icon_fetcher.normalize(icon) for icon in icon_registry.missing(icons)})
+        with _icon_sweep_lock:
+            _icon_sweep_state["total"] = len(missing)
+        with ThreadPoolExecutor(
+            max_workers=_icon_sweep_workers(app), thread_name_prefix="icon-sweep"
+        ) as pool:
+            list(pool.map(_fetch_for_sweep, missing))
+    except Exception as e:
+        logger.exception("Icon verification failed")
+        with _icon_sweep_lock:
+            _icon_sweep_state["status"] = "failed"
+            _icon_sweep_state["error"] = str(e)
+            _icon_sweep_state["finished_at"] = datetime.utcnow().isoformat()
+        return
+    with _icon_sweep_lock:
+        _icon_sweep_state["status"] = "done"
+        _icon_sweep_state["finished_at"] = datetime.utcnow().isoformat()
+        state = dict(_icon_sweep_state)
+    logger.info(
+        f"🔁 Icon verification complete. Checked {len(icons)} icon(s), fetched "
+        f"{state['fetched']}, missing count: {state['failed_count']}"
+    )
+
+
+def start_icon_verification(app):
+    """Run `verify_and_fetch_missing_icons` on a daemon thread so the
+    server starts serving immediately. Returns False if a sweep is
+    already running."""
+    with _icon_sweep_lock:
+        if _icon_sweep_state["status"] == "running":
+            return False
+        _icon_sweep_state.update({
+            "status": "running",
+            "total": 0,
+            "done": 0,
+            "fetched": 0,
+            "failed_count": 0,
+            "failed": [],
+            "started_at": datetime.utcnow().isoformat(),
+            "finished_at": None,
+            "error": None,
+        })
+    threading.Thread(
+        target=partial(verify_and_fetch_missing_icons, app), name="icon-sweep", daemon=True
+    ).start()
+    return True
+
+
+def icon_sweep_status():
+    with _icon_sweep_lock:
+        state = dict(_icon_sweep_state)
+        state["failed"] = list(state["failed"])
+        return state
+
+
+def _recompute_chunk_size(app):
+    size = app.config.get("exposure_recompute_chunk_size")
+    if not isinstance(size, int) or size <= 0:
+        return DEFAULT_RECOMPUTE_CHUNK_SIZE
+    return size
+
+
+def _recompute_chunks(app, entry_ids):
+    """Recompute `entry_ids` one chunk per transaction. Each chunk
+    gets its own app context, so the session (and the settings
+    resolver's per-context version stamp) is fresh every time."""
+    chunk_size = _recompute_chunk_size(app)
+    ids = sorted(entry_ids)
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        with app.app_context():
+            try:
+                synthesizer.recompute_entries(chunk)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        with _recompute_lock:
+            _recompute_state["done"] += len(chunk)
+
+
+def run_exposure_recompute(app):
+    """Worker loop: drain `_recompute_pending` until it stays empty."""
+    try:
+        while True:
+            with _recompute_lock:
+                batch = set(_recompute_pending)
+                _recompute_pending.clear()
+                if not batch:
+                    _recompute_state["status"] = "done"
+                    _recompute_state["finished_at"] = datetime.utcnow().isoformat()
+                    return
+            _recompute_chunks(app, batch)
+    except Exception as e:
+        logger.exception("Exposure recompute failed")
+        with _recompute_lock:
+            _recompute_pending.clear()
+            _recompute_state["status"] = "failed"
+            _recompute_state["error"] = str(e)
+            _recompute_state["finished_at"] = datetime.utcnow().isoformat()
+
+
+def start_exposure_recompute(app, entry_ids):
+    """Queue a recompute of `entry_ids`. Returns "running" if the work
+    was handed to the background thread; otherwise it ran inline
+    (batches no larger than one chunk) and the result is its final
+    status, "done" or "failed" (details in
+    `exposure_recompute_status()`)."""
+    entry_ids = set(entry_ids)
+    if not entry_ids:
+        return "done"
+
+    with _recompute_lock:
+        running = _recompute_state["status"] == "running"
+        if running:
+            _recompute_pending.update(entry_ids)
+            _recompute_state["total"] += len(entry_ids)
+            return "running"
+        _recompute_pending.update(entry_ids)
+        _recompute_state.update({
+            "status": "running",
+            "total": len(entry_ids),
+            "done": 0,
+            "started_at": datetime.utcnow().isoformat(),
+            "finished_at": None,
+            "error": None,
+        })
+
+    if len(entry_ids) <= _recompute_chunk_size(app):
+        run_exposure_recompute(app)
+        with _recompute_lock:
+            return _recompute_state["status"]
+
+    threading.Thread(target=partial(run_exposure_recompute, app), daemon=True).start()
+    return "running"
+
+
+def exposure_recompute_status():
+    with _recompute_lock:
+        return dict(_recompute_state)
 
 
 def start_background_workers(app):
@@ -259,6 +523,10 @@ def start_background_workers(app):
         IntervalTrigger(seconds=reload_seconds),
         id='widget_data_update_job',
         name='Update widget values periodically',
+        # A run that overruns the interval is never doubled up; missed
+        # ticks collapse into one.
+        max_instances=1,
+        coalesce=True,
         replace_existing=True
     )
     scheduler.add_job(
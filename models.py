@@ -162,6 +162,11 @@ class WidgetValue(db.Model):
 
     widget = db.relationship('Widget', backref=db.backref('widget_values', lazy=True))
 
+    # One row per key; the widget refresh upserts on it.
+    __table_args__ = (
+        db.Index('ix_widget_value_widget_id_key', 'widget_id', 'widget_value_key', unique=True),
+    )
+
     def __repr__(self):
         return f'<WidgetValue {self.widget_id}, {self.widget_value_key}>'
 
@@ -198,6 +203,28 @@ class ServiceExposure(db.Model):
         return f'<ServiceExposure {self.layer} svc={self.service_entry_id} host={self.hostname}>'
 
 
+class ExposureSummary(db.Model):
+    """Materialized rollup of `service_exposure` per (layer, host).
+
+    Lets the settings page list discovered layers / hosts and show
+    how many services an override would affect without scanning
+    `service_exposure`. Maintained incrementally by
+    `exposure_summary.py`; rows whose counts drop to zero are kept so
+    `first_seen` survives a container being recreated.
+    """
+    __tablename__ = 'exposure_summary'
+
+    layer = db.Column(db.String(64), primary_key=True)
+    host = db.Column(db.String(100), primary_key=True)
+    observation_count = db.Column(db.Integer, nullable=False, default=0)
+    service_count = db.Column(db.Integer, nullable=False, default=0)
+    first_seen = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_seen = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ExposureSummary {self.layer}@{self.host} obs={self.observation_count}>'
+
+
 class Setting(db.Model):
     """KV-style store for operator-editable runtime settings.
 
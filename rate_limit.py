@@ -0,0 +1,132 @@
+"""Bounded in-process rate limiting for the register API.
+
+Two building blocks:
+
+- `BoundedLRU` — a thread-safe, size-capped mapping. Least recently
+  touched keys are evicted once `max_keys` is reached, so per-key
+  state (buckets, last-log timestamps) can't grow without limit no
+  matter how many distinct hosts or IPs show up.
+- `TokenBucketLimiter` — classic token bucket keyed by an arbitrary
+  string, stored in a `BoundedLRU`. `rate_per_minute` tokens refill
+  continuously up to `burst`; each call spends one. A rejected call
+  gets the number of seconds until the next token is available,
+  which the register handler surfaces as `Retry-After`.
+
+State is per process, like `_UPSERT_LOCK` in routes_api.py. Under
+multiple Gunicorn workers each worker enforces its own budget; the
+documented single-process deployment gets exact limits.
+
+An evicted bucket comes back full. With `max_keys` well above the
+number of real notifier hosts that only matters for an attacker
+cycling through fake keys, who then spends from the IP bucket
+instead.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class BoundedLRU:
+    """Size-capped mapping with LRU eviction. Thread-safe."""
+
+    def __init__(self, max_keys=1024):
+        self.max_keys = max(1, int(max_keys))
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._set_locked(key, value)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _set_locked(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_keys:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+
+class TokenBucketLimiter:
+    """Token bucket per key. `rate_per_minute <= 0` disables the limiter."""
+
+    def __init__(self, name, rate_per_minute, burst, max_keys=1024, clock=time.monotonic):
+        self.name = name
+        self.rate_per_second = max(0.0, float(rate_per_minute)) / 60.0
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._buckets = BoundedLRU(max_keys)
+        # Guards bucket arithmetic; BoundedLRU's own lock only covers
+        # the mapping, not the read-modify-write on a bucket.
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self):
+        return self.rate_per_second > 0
+
+    def check(self, key):
+        """Spend one token for `key`.
+
+        Returns `(allowed, retry_after_seconds)`. `retry_after_seconds`
+        is 0 when allowed, otherwise a whole number >= 1.
+        """
+        if not self.enabled or not key:
+            return True, 0
+
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(self.burst)
+            else:
+                tokens, last = bucket
+                tokens = min(float(self.burst), tokens + (now - last) * self.rate_per_second)
+
+            if tokens >= 1.0:
+                self._buckets.set(key, (tokens - 1.0, now))
+                self.allowed += 1
+                return True, 0
+
+            self._buckets.set(key, (tokens, now))
+            self.rejected += 1
+            retry_after = math.ceil((1.0 - tokens) / self.rate_per_second)
+            return False, max(1, retry_after)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "rate_per_minute": round(self.rate_per_second * 60.0, 3),
+            "burst": self.burst,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "tracked_keys": len(self._buckets),
+            "max_keys": self._buckets.max_keys,
+            "evictions": self._buckets.evictions,
+        }
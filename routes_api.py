@@ -10,10 +10,14 @@ v0.3.0 or later.
 
 Module-level state local to this surface:
 - `unauthorized_log_tracker` — rate-limits the unauthorized-access
-  WARNING log line to once per IP every 2 minutes.
-- `failed_icon_cache` / `RETRY_INTERVAL` — passed through to
-  `image_utils.resolve_image_metadata` to throttle repeated icon
-  download attempts.
+  WARNING log line to once per IP every 2 minutes. A `BoundedLRU`,
+  so a scan from many source addresses can't grow it without limit.
+- `_host_limiter` / `_ip_limiter` — token buckets guarding
+  `/api/v1/register`, keyed by payload `host` and client IP. Built
+  from settings by `configure_rate_limits()` at app creation. A
+  notifier stuck in a restart loop gets 429 + Retry-After instead of
+  monopolizing the SQLite writer. Counters are served by
+  `/api/v1/register/limits`.
 - `_UPSERT_LOCK` — single `threading.Lock` serializing the
   find-or-create + merge + commit critical section in
   `upsert_service`. Coarse (one lock for all keys) and that's
@@ -27,27 +31,86 @@ from datetime import datetime, timedelta
 from flask import Blueprint, current_app, jsonify, request
 from pydantic import ValidationError
 
+import http_cache
 import synthesizer
 from extensions import db
 from image_utils import parse_bool, resolve_image_metadata
 from models import Group, ServiceEntry
+from rate_limit import BoundedLRU, TokenBucketLimiter
 from schemas import RegisterPayload
 
 logger = logging.getLogger(__name__)
 
 api_bp = Blueprint("api", __name__)
 
-unauthorized_log_tracker = {}
-
-# Throttle for repeated icon-download failures. Used by resolve_image_metadata.
-failed_icon_cache = {}  # image_icon -> last_failed_time
-RETRY_INTERVAL = timedelta(minutes=60)
+# Replaced by configure_rate_limits() with the configured key cap.
+unauthorized_log_tracker = BoundedLRU(4096)
+# Same once-per-2-minutes throttle for the 429 WARNING line.
+_rate_limited_log_tracker = BoundedLRU(4096)
+_host_limiter = TokenBucketLimiter("host", 0, 1)
+_ip_limiter = TokenBucketLimiter("ip", 0, 1)
 
 # Serializes the upsert critical section across all register calls.
 # See upsert_service docstring for the rationale.
 _UPSERT_LOCK = threading.Lock()
 
 
+def configure_rate_limits(config):
+    """(Re)build the register limiters from app config. Called once
+    from create_app(); a rate of 0 disables that limiter."""
+    global unauthorized_log_tracker, _rate_limited_log_tracker, _host_limiter, _ip_limiter
+
+    max_keys = int(config.get("register_rate_limit_max_keys") or 4096)
+    unauthorized_log_tracker = BoundedLRU(max_keys)
+    _rate_limited_log_tracker = BoundedLRU(max_keys)
+    _host_limiter = TokenBucketLimiter(
+        "host",
+        rate_per_minute=config.get("register_rate_limit_per_host") or 0,
+        burst=config.get("register_rate_burst_per_host") or 1,
+        max_keys=max_keys,
+    )
+    _ip_limiter = TokenBucketLimiter(
+        "ip",
+        rate_per_minute=config.get("register_rate_limit_per_ip") or 0,
+        burst=config.get("register_rate_burst_per_ip") or 1,
+        max_keys=max_keys,
+    )
+
+
+def _should_log(tracker, key, now, interval=timedelta(minutes=2)):
+    last_log_time = tracker.get(key)
+    if not last_log_time or (now - last_log_time) > interval:
+        tracker.set(key, now)
+        return True
+    return False
+
+
+def _check_rate_limit(limiter, key):
+    """Spend one token from `limiter` for `key`.
+
+    Returns None when allowed, or a 429 Flask Response carrying
+    `Retry-After` when the bucket is empty.
+    """
+    allowed, retry_after = limiter.check(key)
+    if allowed:
+        return None
+
+    if _should_log(_rate_limited_log_tracker, f"{limiter.name}:{key}", datetime.utcnow()):
+        logger.warning(
+            f"⚠️ Rate limiting /api/v1/register for {limiter.name} {key!r} "
+            f"(retry after {retry_after}s)"
+        )
+
+    response = jsonify({
+        "error": "Too Many Requests",
+        "limit": limiter.name,
+        "retry_after": retry_after,
+    })
+    response.status_code = 429
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
 def _check_bearer_auth(endpoint_label):
     """Validate the Authorization header against `api_token`.
 
@@ -62,10 +125,8 @@ def _check_bearer_auth(endpoint_label):
     now = datetime.utcnow()
     logger.info(f"401 - Unauthorized API access from {client_ip} to {endpoint_label}")
 
-    last_log_time = unauthorized_log_tracker.get(client_ip)
-    if not last_log_time or (now - last_log_time) > timedelta(minutes=2):
+    if _should_log(unauthorized_log_tracker, client_ip, now):
         logger.warning(f"⚠️ Repeated unauthorized access from {client_ip}")
-        unauthorized_log_tracker[client_ip] = now
 
     response = jsonify({"error": "Unauthorized"})
     response.status_code = 401
@@ -145,11 +206,6 @@ def upsert_service(canonical, app):
         image_raw=canonical.get("image_name"),
         image_icon_override=canonical.get("image_icon"),
         fallback_name=canonical.get("container_name"),
-        image_dir=app.config['IMAGE_DIR'],
-        failed_icon_cache=failed_icon_cache,
-        retry_interval=RETRY_INTERVAL,
-        logger=logger,
-        debug=app.debug,
     )
 
     # `register_field_ownership` is validated once at startup in
@@ -308,7 +364,15 @@ def api_v1_register():
     in `RegisterPayload` triggers a 400 with the list of offending
     keys. `host` and `container_name` are required; everything else
     is optional.
+
+    Rate limited twice: by client IP before the body is parsed, and by
+    payload `host` once it validates. Either bucket running dry
+    answers 429 with `Retry-After`.
     """
+    limited = _check_rate_limit(_ip_limiter, request.remote_addr)
+    if limited is not None:
+        return limited
+
     auth_failure = _check_bearer_auth("/api/v1/register")
     if auth_failure is not None:
         return auth_failure
@@ -330,6 +394,10 @@ def api_v1_register():
             body["unknown_keys"] = unknown_keys
         return jsonify(body), 400
 
+    limited = _check_rate_limit(_host_limiter, payload.host)
+    if limited is not None:
+        return limited
+
     if current_app.debug:
         logger.info("🔍 Received /api/v1/register payload:")
         for k, v in payload.model_dump(exclude_none=True).items():
@@ -338,3 +406,21 @@ def api_v1_register():
     canonical = payload.model_dump()
     body, status = upsert_service(canonical, current_app._get_current_object())
     return jsonify(body), status
+
+
+@api_bp.route('/api/v1/register/limits', methods=['GET'])
+def api_v1_register_limits():
+    """Register rate-limit counters. Same bearer auth as register."""
+    auth_failure = _check_bearer_auth("/api/v1/register/limits")
+    if auth_failure is not None:
+        return auth_failure
+
+    return http_cache.conditional_json({
+        "host": _host_limiter.stats(),
+        "ip": _ip_limiter.stats(),
+        "unauthorized_log_tracker": {
+            "tracked_keys": len(unauthorized_log_tracker),
+            "max_keys": unauthorized_log_tracker.max_keys,
+            "evictions": unauthorized_log_tracker.evictions,
+        },
+    })
@@ -1,14 +1,21 @@
 """Dashboard, settings, and CRUD routes.
 
 Owns the `dashboard` blueprint:
-- Read-only dashboard views: /, /tiled_dash, /compact_dash
-- Settings page: /settings (backup/restore, users list, groups, version)
+- Read-only dashboard views: /, /tiled_dash, /compact_dash, plus the
+  /api/v1/dashboard/changes delta feed their auto-refresh applies,
+  the /api/v1/stream SSE channel that says when to apply it, and the
+  /api/v1/search service search behind their `?q=`
+- Settings page: /settings (backup/restore, users list, groups, version,
+  icons), /settings/icon-pack (icon pack import)
 - Group CRUD: /update_group, /add_group, /delete_group
 - Service CRUD: /add, /edit/<id>, /dbdump
-- Static assets: /images/<filename>
+- Static assets: /images/<filename>, and /images/sprite/<hash>.svg
+  (the icon sprite the dashboard views reference)
 
 Grouping/sorting for the three dashboard views lives in
-`view_helpers.group_and_sort_services`. The view controls
+`view_helpers.group_and_sort_services`; the grouped result is cached
+per view-control combination by `dashboard_snapshot` until the next
+write. The view controls
 (`group_by` axis selector, `show_urlless` filter) are URL-driven
 (`?group_by=stack&show_urlless=false`); each route here just parses
 the query params and hands them to the helper.
@@ -17,16 +24,18 @@ the query params and hands them to the helper.
 import logging
 import os
 import re
+import time
 from datetime import datetime
 from urllib.parse import urlparse
 
 import markdown as _md
-import requests
 import yaml
 from flask import (
     Blueprint,
+    Response,
     current_app,
     flash,
+    g,
     jsonify,
     make_response,
     redirect,
@@ -34,20 +43,36 @@ from flask import (
     request,
     send_file,
     send_from_directory,
+    session,
     url_for,
 )
-from flask_login import login_required
-from sqlalchemy.orm import joinedload, selectinload
-
+from flask_login import current_user, login_required
+
+import change_tracker
+import dashboard_snapshot
+import event_broker
+import exposure_summary
+import fragment_cache
+import http_cache
+import icon_fetcher
+import icon_pack
+import icon_registry
+import icon_sprite
+import jobs
+import search_index
 import settings_store
 import synthesizer
+import widget_refresh
+import widget_registry
 from extensions import db
-from image_utils import fetch_icon_if_missing
+from image_utils import fetch_best_icon
 from models import Group, ServiceEntry, ServiceExposure, User, Widget, WidgetValue
 from routes_auth import is_admin_required
 from view_helpers import (
     DEFAULT_SORT_IN_GROUP,
-    group_and_sort_services,
+    decode_cursor,
+    first_pages,
+    next_page,
     normalize_axis,
     normalize_show_urlless,
 )
@@ -115,14 +140,6 @@ def flash_is_present(req):
     return '_flashes' in req.environ.get('flask._flashes', [])
 
 
-def _load_widget_values():
-    widget_values = {}
-    for wv in WidgetValue.query.all():
-        widget_values.setdefault(wv.widget_id, {})[wv.widget_value_key] = wv.widget_value
-    widget_fields = {w.id: w.widget_fields for w in Widget.query.all()}
-    return widget_values, widget_fields
-
-
 def _read_view_controls(default_sort_in_group=DEFAULT_SORT_IN_GROUP):
     axis = normalize_axis(request.args.get("group_by"), logger=logger)
     show_urlless = normalize_show_urlless(request.args.get("show_urlless"))
@@ -130,124 +147,442 @@ def _read_view_controls(default_sort_in_group=DEFAULT_SORT_IN_GROUP):
     return axis, show_urlless, sort_in_group
 
 
+def _read_search_query():
+    return (request.args.get("q") or "").strip()
+
+
+# Rendered pages contain relative times ("5 minutes ago"), which drift
+# without any write. Folding a coarse time bucket into the ETag bounds
+# how stale that text can get on an otherwise idle dashboard.
+RELATIVE_TIME_BUCKET_SECONDS = 300
+
+
+def _dashboard_etag(view_name):
+    """ETag for a dashboard page: data generation, icon generation,
+    view, query string, viewer identity/role, and the relative-time
+    bucket.
+
+    A page rendered with pending flash messages gets a one-off tag, so
+    it is never answered with a 304 and its tag never revalidates a
+    later, flash-free render.
+    """
+    return http_cache.etag_for(
+        view_name,
+        change_tracker.generation(),
+        icon_registry.generation(),
+        sorted(request.args.items(multi=True)),
+        current_user.get_id(),
+        bool(getattr(current_user, "is_admin", False)),
+        int(time.time() // RELATIVE_TIME_BUCKET_SECONDS),
+        os.urandom(8).hex() if session.get('_flashes') else None,
+    )
+
+
+DEFAULT_PAGE_SIZE = 200
+
+
+def _page_size():
+    """Entries rendered per bucket before the rest loads on scroll
+    (`dashboard_page_size`; 0 renders everything)."""
+    try:
+        return max(0, int(current_app.config.get("dashboard_page_size", DEFAULT_PAGE_SIZE)))
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+
+
+def _compact_show_host(grouped_entries):
+    unique_hosts = {e.host for _, bucket in grouped_entries for e in bucket if e.host}
+    return len(unique_hosts) > 1
+
+
 @dashboard_bp.route('/')
 @login_required
 def dashboard():
+    etag = _dashboard_etag("dashboard")
+    early = http_cache.short_circuit(etag)
+    if early is not None:
+        return early
+    g.page_etag = etag
+
     axis, show_urlless, sort_in_group = _read_view_controls()
+    q = _read_search_query()
     msg = request.args.get('msg')
 
-    entries = (
-        ServiceEntry.query
-        .options(joinedload(ServiceEntry.group))
-        .options(selectinload(ServiceEntry.exposures))
-        .all()
-    )
+    view = dashboard_snapshot.get_view(axis, show_urlless, sort_in_group, query=q)
+    g.dashboard_version = change_tracker.version(view.generation)
 
-    grouped_entries = group_and_sort_services(
-        entries,
-        axis=axis,
-        show_urlless=show_urlless,
-        sort_in_group=sort_in_group,
-    )
-
-    visible_total = sum(len(es) for _, es in grouped_entries)
-    widget_values, widget_fields = _load_widget_values()
-
-    return render_template(
+    return http_cache.with_etag(render_template(
         "dashboard.html",
-        grouped_entries=grouped_entries,
-        total_entries=visible_total,
+        grouped_pages=first_pages(view.grouped_entries, _page_size(), sort_in_group),
+        total_entries=view.total_entries,
         group_by=axis,
         show_urlless=show_urlless,
         sort_in_group=sort_in_group,
+        q=q,
         msg=msg,
         STD_DOZZLE_URL=current_app.config.get("std_dozzle_url"),
         display_tools=current_app.config.get("display_tools", False),
-        widget_values=widget_values,
-        widget_fields=widget_fields,
+        widget_values=view.widget_values,
+        widget_fields=view.widget_fields,
+        icon_sprite=icon_sprite.for_view(view),
         active_tab='dashboard',
-    )
+    ), etag)
 
 
 @dashboard_bp.route('/tiled_dash')
 @login_required
 def tiled_dashboard():
+    etag = _dashboard_etag("tiled")
+    early = http_cache.short_circuit(etag)
+    if early is not None:
+        return early
+    g.page_etag = etag
+
     axis, show_urlless, sort_in_group = _read_view_controls()
+    q = _read_search_query()
 
-    entries = (
-        ServiceEntry.query
-        .options(joinedload(ServiceEntry.group))
-        .options(selectinload(ServiceEntry.exposures))
-        .all()
-    )
+    view = dashboard_snapshot.get_view(axis, show_urlless, sort_in_group, query=q)
+    g.dashboard_version = change_tracker.version(view.generation)
 
-    grouped_entries = group_and_sort_services(
-        entries,
-        axis=axis,
-        show_urlless=show_urlless,
-        sort_in_group=sort_in_group,
-    )
+    page_ref = request.full_path.rstrip('?')
+    dozzle_url = current_app.config.get("std_dozzle_url")
+    sprite = icon_sprite.for_view(view)
 
-    visible_total = sum(len(es) for _, es in grouped_entries)
-    widget_values, widget_fields = _load_widget_values()
+    def render_tile(entry):
+        return fragment_cache.render_tile(entry, page_ref, dozzle_url, sprite)
 
-    return render_template(
+    return http_cache.with_etag(render_template(
         "tiled_dash.html",
-        grouped_entries=grouped_entries,
+        grouped_entries=view.grouped_entries,
+        render_tile=render_tile,
         group_by=axis,
         show_urlless=show_urlless,
         sort_in_group=sort_in_group,
-        STD_DOZZLE_URL=current_app.config['std_dozzle_url'],
-        total_entries=visible_total,
-        widget_values=widget_values,
-        widget_fields=widget_fields,
-    )
+        q=q,
+        total_entries=view.total_entries,
+    ), etag)
 
 
 @dashboard_bp.route('/compact_dash')
 @login_required
 def compact_dash():
+    etag = _dashboard_etag("compact")
+    early = http_cache.short_circuit(etag)
+    if early is not None:
+        return early
+    g.page_etag = etag
+
     axis, show_urlless, sort_in_group = _read_view_controls(
         default_sort_in_group="alphabetical"
     )
+    q = _read_search_query()
 
-    entries = (
-        ServiceEntry.query
-        .options(joinedload(ServiceEntry.group))
-        .options(selectinload(ServiceEntry.exposures))
-        .all()
-    )
-
-    grouped_entries = group_and_sort_services(
-        entries,
-        axis=axis,
-        show_urlless=show_urlless,
-        sort_in_group=sort_in_group,
+    view = dashboard_snapshot.get_view(
+        axis, show_urlless, sort_in_group, projection="compact", query=q
     )
+    g.dashboard_version = change_tracker.version(view.generation)
 
     flattened_entries = []
-    visible_total = 0
-    for label, bucket_entries in grouped_entries:
-        flattened_entries.append({'is_group_header': True, 'group': label})
-        for entry in bucket_entries:
+    for page in first_pages(view.grouped_entries, _page_size(), sort_in_group):
+        flattened_entries.append({'is_group_header': True, 'group': page.label})
+        for entry in page.entries:
             flattened_entries.append({'is_group_header': False, 'entry': entry})
-            visible_total += 1
+        if page.next_cursor:
+            flattened_entries.append({
+                'is_group_header': False,
+                'group': page.label,
+                'next_cursor': page.next_cursor,
+            })
 
-    unique_hosts = {e.host for _, bucket in grouped_entries for e in bucket if e.host}
-    show_host = len(unique_hosts) > 1
+    show_host = _compact_show_host(view.grouped_entries)
 
-    return render_template(
+    return http_cache.with_etag(render_template(
         "compact_dash.html",
         flattened_entries=flattened_entries,
-        total_entries=visible_total,
+        total_entries=view.total_entries,
         show_host=show_host,
+        icon_sprite=icon_sprite.for_view(view),
         group_by=axis,
         show_urlless=show_urlless,
         sort_in_group=sort_in_group,
+        q=q,
         active_tab="compact"
+    ), etag)
+
+
+@dashboard_bp.route('/tiled_dash/drawer/<int:id>')
+@login_required
+def tile_drawer(id):
+    """Rendered contents of one Tiled-view drawer.
+
+    Tiles ship with an empty drawer; dashboard.js fetches this on first
+    open and caches it until the tile itself is patched. `?ref=` is the
+    page URL for the edit link's return path.
+    """
+    etag = _dashboard_etag(f"drawer:{id}")
+    if http_cache.is_fresh(etag):
+        return http_cache.not_modified(etag)
+
+    item = dashboard_snapshot.get_entry(id)
+    if item is None:
+        return jsonify({'error': 'Not found'}), 404
+
+    return http_cache.with_etag(render_template(
+        "partials/tile_drawer.html",
+        entry=item.entry,
+        widget_values=item.widget_values,
+        widget_fields=item.widget_fields,
+        STD_DOZZLE_URL=current_app.config.get("std_dozzle_url"),
+        page_ref=request.args.get('ref') or None,
+    ), etag)
+
+
+# (fragment template rendered per changed entry, row projection) by
+# dashboard view.
+DELTA_FRAGMENTS = {
+    "dashboard": ("partials/dashboard_row.html", "list"),
+    "tiled": ("partials/tile.html", "list"),
+    "compact": ("partials/compact_tile.html", "compact"),
+}
+
+
+def _fragment_context(view):
+    """Template context for rendering single-entry fragments of `view`
+    outside their page (delta upserts, lazy-loaded pages)."""
+    return {
+        'widget_values': view.widget_values,
+        'widget_fields': view.widget_fields,
+        'STD_DOZZLE_URL': current_app.config.get("std_dozzle_url"),
+        'display_tools': current_app.config.get("display_tools", False),
+        'page_ref': request.args.get('ref') or None,
+        'show_host': _compact_show_host(view.grouped_entries),
+        'icon_sprite': icon_sprite.for_view(view),
+    }
+
+
+def _render_fragment(fragment, entry, bucket_index, context):
+    if fragment == fragment_cache.TILE_TEMPLATE:
+        return fragment_cache.render_tile(
+            entry, context['page_ref'], context['STD_DOZZLE_URL'], context['icon_sprite']
+        )
+    return render_template(fragment, entry=entry, group_index=bucket_index, **context)
+
+
+def _read_fragment_view():
+    """`(fragment, sort_in_group, view)` for a fragment request's
+    `?view=` (a `DELTA_FRAGMENTS` key) and view controls."""
+    view_name = request.args.get('view')
+    fragment, projection = DELTA_FRAGMENTS[view_name]
+    axis, show_urlless, sort_in_group = _read_view_controls(
+        default_sort_in_group="alphabetical" if view_name == "compact" else DEFAULT_SORT_IN_GROUP
+    )
+    view = dashboard_snapshot.get_view(
+        axis, show_urlless, sort_in_group, projection=projection, query=_read_search_query()
+    )
+    return fragment, sort_in_group, view
+
+
+@dashboard_bp.route('/api/v1/dashboard/changes')
+@login_required
+def dashboard_changes():
+    """Changes to one dashboard view since `?since=<version>`, as JSON.
+
+    Takes the page's view controls and search (`q`) plus `view`
+    (dashboard | tiled | compact) and `ref` (the page URL, for edit
+    links). Returns:
+
+    - `version` — pass back as `since` next time.
+    - `reload` — true when the change log can't describe the delta
+      (too far behind, restarted process, group edits); the client
+      should reload the page.
+    - `buckets` — `[label, count]` in render order. If the labels
+      differ from the page's, the client reloads.
+    - `removed` — entry IDs no longer in this view.
+    - `upserts` — `{id, bucket, after, html}` in render order: the
+      entry's rendered fragment and the entry ID it follows within
+      its bucket (null = first).
+
+    Work and payload scale with the number of changed entries; the
+    rest of the view comes from the shared snapshot.
+    """
+    if request.args.get('view') not in DELTA_FRAGMENTS:
+        return jsonify({'error': 'Unknown view'}), 400
+
+    etag = _dashboard_etag("changes")
+    if http_cache.is_fresh(etag):
+        return http_cache.not_modified(etag)
+
+    changes = change_tracker.changes_since(
+        change_tracker.parse_version(request.args.get('since'))
+    )
+    if changes is None or changes.structural:
+        return http_cache.conditional_json(
+            {'version': change_tracker.version(), 'reload': True}, etag=etag
+        )
+
+    fragment, _, view = _read_fragment_view()
+
+    positions = {}
+    for bucket_index, (_, bucket) in enumerate(view.grouped_entries):
+        previous_id = None
+        for position, entry in enumerate(bucket):
+            positions[entry.id] = (bucket_index, position, previous_id, entry)
+            previous_id = entry.id
+
+    touched = set(changes.entry_ids) | set(changes.removed_ids)
+    if changes.widget_ids:
+        touched.update(
+            entry_id for entry_id, (_, _, _, entry) in positions.items()
+            if entry.widget_id in changes.widget_ids
+        )
+
+    context = _fragment_context(view)
+    upserts = []
+    for entry_id in sorted((i for i in touched if i in positions), key=lambda i: positions[i][:2]):
+        bucket_index, _, previous_id, entry = positions[entry_id]
+        upserts.append({
+            'id': entry_id,
+            'bucket': view.grouped_entries[bucket_index][0],
+            'after': previous_id,
+            'html': _render_fragment(fragment, entry, bucket_index, context),
+        })
+
+    return http_cache.conditional_json({
+        'version': change_tracker.version(changes.generation),
+        'reload': False,
+        'total': view.total_entries,
+        'show_host': context['show_host'],
+        'buckets': [[label, len(bucket)] for label, bucket in view.grouped_entries],
+        'removed': sorted(i for i in touched if i not in positions),
+        'upserts': upserts,
+    }, etag=etag)
+
+
+@dashboard_bp.route('/api/v1/dashboard/page')
+@login_required
+def dashboard_page():
+    """The next page of one bucket, for views rendered with
+    `dashboard_page_size` set.
+
+    Takes the page's view controls and `q`, `view`, `ref`, and the
+    `cursor` the bucket's placeholder carries. Returns `html` (the
+    rendered fragments, in order), their `ids`, and `next_cursor`
+    (null once the bucket is complete). `reload` is true when the
+    bucket no longer exists at that position; the client reloads.
+    """
+    if request.args.get('view') not in DELTA_FRAGMENTS:
+        return jsonify({'error': 'Unknown view'}), 400
+    try:
+        bucket_index, label, after_id, after_key = decode_cursor(request.args.get('cursor') or '')
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    etag = _dashboard_etag("page")
+    if http_cache.is_fresh(etag):
+        return http_cache.not_modified(etag)
+
+    fragment, sort_in_group, view = _read_fragment_view()
+    if bucket_index >= len(view.grouped_entries) or view.grouped_entries[bucket_index][0] != label:
+        return http_cache.conditional_json(
+            {'version': change_tracker.version(view.generation), 'reload': True}, etag=etag
+        )
+
+    entries, next_cursor = next_page(
+        view.grouped_entries[bucket_index][1], bucket_index, label,
+        after_id, after_key, _page_size(), sort_in_group,
+    )
+    context = _fragment_context(view)
+    return http_cache.conditional_json({
+        'version': change_tracker.version(view.generation),
+        'reload': False,
+        'ids': [e.id for e in entries],
+        'html': ''.join(
+            _render_fragment(fragment, e, bucket_index, context) for e in entries
+        ),
+        'next_cursor': next_cursor,
+    }, etag=etag)
+
+
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_MAX_LIMIT = 500
+
+
+@dashboard_bp.route('/api/v1/search')
+@login_required
+def search_api():
+    """Services matching `?q=`, best match first, as JSON.
+
+    Matches container name, host, stack, group, image owner/name, URLs
+    and exposure hostnames by word prefix (see `search_index`).
+    `?limit=` caps the results (default 50, max 500); `total` counts
+    every match.
+    """
+    q = _read_search_query()
+    try:
+        limit = min(max(int(request.args.get('limit', SEARCH_DEFAULT_LIMIT)), 1), SEARCH_MAX_LIMIT)
+    except ValueError:
+        limit = SEARCH_DEFAULT_LIMIT
+
+    etag = _dashboard_etag("search")
+    if http_cache.is_fresh(etag):
+        return http_cache.not_modified(etag)
+
+    ids = search_index.match_ids(q)
+    rows = {r.id: r for r in dashboard_snapshot.get_rows("list")}
+    results = [
+        {
+            'id': row.id,
+            'container_name': row.container_name,
+            'host': row.host,
+            'stack_name': row.stack_name,
+            'group_name': row.group_name,
+            'internalurl': row.internalurl,
+            'externalurl': row.externalurl,
+            'image_icon': row.image_icon,
+            'edit_url': url_for('dashboard.edit_entry', id=row.id),
+        }
+        for row in (rows.get(i) for i in ids[:limit]) if row is not None
+    ]
+    return http_cache.conditional_json(
+        {'query': q, 'total': len(ids), 'results': results}, etag=etag
+    )
+
+
+@dashboard_bp.route('/api/v1/stream')
+@login_required
+def event_stream():
+    """Server-Sent Events feed of committed changes.
+
+    Sends a `change` event (version, kinds, entry/widget IDs) per commit
+    and `resync` when this client fell too far behind; either way the
+    dashboard then pulls fragments from /api/v1/dashboard/changes.
+    See `event_broker`.
+    """
+    sub = event_broker.broker.subscribe()
+    if sub is None:
+        response = jsonify({'error': 'Too many open streams'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+
+    last_event_id = request.headers.get('Last-Event-ID')
+    # The stream can stay open for hours; don't pin a DB connection
+    # (and an open WAL read snapshot) to it.
+    db.session.close()
+    return Response(
+        event_broker.broker.stream(sub, last_event_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
     )
 
 
+@dashboard_bp.route('/api/v1/stream/stats')
+@login_required
+@is_admin_required
+def event_stream_stats():
+    return jsonify(event_broker.broker.stats())
+
+
 @dashboard_bp.route("/dbdump")
 @login_required
 @is_admin_required
@@ -262,7 +597,6 @@ def db_dump():
 def settings():
     BACKUP_DIR = current_app.config.get("backup_path", "/config/backups")
     BACKUP_PATH = os.path.join(BACKUP_DIR, "backup.yml")
-    image_dir = current_app.config['IMAGE_DIR']
     os.makedirs(BACKUP_DIR, exist_ok=True)
     groups = Group.query.order_by(Group.group_sort_priority.asc().nulls_last(), Group.group_name.asc()).all()
 
@@ -499,12 +833,13 @@ def settings():
             flash(f"Could not list server backup files: {str(e)}", "warning")
 
 # Check which icon files are missing
-        missing_icons = []
-        all_entries = ServiceEntry.query.all()
-        for entry in all_entries:
-            icon = entry.image_icon
-            if icon and not os.path.exists(os.path.join(image_dir, icon)):
-                missing_icons.append(f"{entry.container_name} → {icon}")
+        missing_icons = [
+            f"{container_name} → {icon}"
+            for container_name, icon in db.session.query(
+                ServiceEntry.container_name, ServiceEntry.image_icon
+            )
+            if icon and not icon_registry.has(icon)
+        ]
     widgets = Widget.query.all()
     users = User.query.order_by(User.username.asc()).all()
 
@@ -515,9 +850,16 @@ def settings():
     exposure_layer_directions = settings_store.get_layer_directions()
     exposure_hosts = settings_store.discovered_hosts()
     exposure_host_overrides = settings_store.get_host_layer_overrides()
+    # Services behind each (layer, host) — shown next to every
+    # dropdown so the operator sees the blast radius before saving.
+    exposure_service_counts = exposure_summary.service_counts()
+    exposure_layer_service_totals = {}
+    for (layer, _host), count in exposure_service_counts.items():
+        exposure_layer_service_totals[layer] = exposure_layer_service_totals.get(layer, 0) + count
 
     return render_template(
         'settings.html',
+         exposure_recompute=jobs.exposure_recompute_status(),
          current_config=current_app.config['LOADED_SETTINGS'],
          config_from_env=current_app.config['CONFIG_FROM_ENV'],
          config_from_file=current_app.config['CONFIG_FROM_FILE'],
@@ -525,12 +867,19 @@ def settings():
          version_info=current_app.config['VERSION_INFO'],
          widgets=widgets,
          missing_icons=missing_icons,
+         icon_pack=icon_pack.status(),
+         icon_sweep=jobs.icon_sweep_status(),
+         widget_plugins=[widget_registry.get(name) for name in widget_registry.names()],
+         widget_plugin_errors=widget_registry.errors(),
+         widget_metrics=widget_refresh.metrics(),
          groups=groups,
          users=users,
          exposure_layers=exposure_layers,
          exposure_layer_directions=exposure_layer_directions,
          exposure_hosts=exposure_hosts,
          exposure_host_overrides=exposure_host_overrides,
+         exposure_service_counts=exposure_service_counts,
+         exposure_layer_service_totals=exposure_layer_service_totals,
     )
 
 
@@ -538,14 +887,19 @@ def settings():
 @login_required
 @is_admin_required
 def save_exposure_settings():
-    """Save per-interpreter direction mappings and trigger
-    synthesizer recompute for all services.
+    """Save per-interpreter direction mappings and trigger a
+    synthesizer recompute for the services they affect.
 
     Form shape: for each discovered layer L, a field named
     `layer:<L>` with value "internal"/"external"/"neither".
     For each per-host override, fields named `override:<host>:<L>`
     with the same values. Empty / missing fields default to
     "neither" (no override).
+
+    Only services with exposure rows on a `(host, layer)` pair whose
+    direction actually changed are recomputed. Batches larger than
+    one chunk run on a background thread; the settings page polls
+    `/settings/exposure/recompute` for progress.
     """
     layer_directions = {}
     host_overrides = {}
@@ -563,16 +917,90 @@ def save_exposure_settings():
                 if host and layer:
                     host_overrides.setdefault(host, {})[layer] = value
 
+    old_resolver = settings_store.direction_resolver()
     settings_store.save_exposure_settings(layer_directions, host_overrides)
-    touched = synthesizer.recompute_all()
     db.session.commit()
-    flash(
-        f"✅ Exposure settings saved. Recomputed URLs for {touched} service(s).",
-        "success",
-    )
+    new_resolver = settings_store.direction_resolver()
+
+    affected = synthesizer.affected_entry_ids(old_resolver, new_resolver)
+    if not affected:
+        flash("✅ Exposure settings saved. No service URLs affected.", "success")
+        return redirect(url_for('dashboard.settings', section='exposure'))
+
+    status = jobs.start_exposure_recompute(current_app._get_current_object(), affected)
+    if status == "running":
+        flash(
+            f"✅ Exposure settings saved. Recomputing URLs for {len(affected)} "
+            f"service(s) in the background.",
+            "success",
+        )
+    elif status == "failed":
+        error = jobs.exposure_recompute_status().get("error") or "see the log"
+        flash(
+            f"Exposure settings saved, but recomputing URLs for {len(affected)} "
+            f"service(s) failed: {error}",
+            "danger",
+        )
+    else:
+        flash(
+            f"✅ Exposure settings saved. Recomputed URLs for {len(affected)} service(s).",
+            "success",
+        )
     return redirect(url_for('dashboard.settings', section='exposure'))
 
 
+@dashboard_bp.route('/settings/exposure/recompute')
+@login_required
+@is_admin_required
+def exposure_recompute_status():
+    """Progress of the most recent exposure recompute, as JSON."""
+    return http_cache.conditional_json(jobs.exposure_recompute_status())
+
+
+@dashboard_bp.route('/settings/icons/verify', methods=['GET', 'POST'])
+@login_required
+@is_admin_required
+def icon_sweep():
+    """GET: progress of the icon sweep (run at startup), as JSON.
+    POST: start a new sweep in the background."""
+    if request.method == 'GET':
+        return http_cache.conditional_json(jobs.icon_sweep_status())
+    if jobs.start_icon_verification(current_app._get_current_object()):
+        flash("🔍 Checking for missing icons in the background.", "success")
+    else:
+        flash("An icon check is already running.", "warning")
+    return redirect(url_for('dashboard.settings', section='icons'))
+
+
+@dashboard_bp.route('/settings/icon-pack', methods=['POST'])
+@login_required
+@is_admin_required
+def import_icon_pack():
+    """Import or update the local icon pack (see `icon_pack`) from an
+    uploaded dashboard-icons tarball (`pack_file`) or a directory or
+    tarball path on the server (`pack_path`)."""
+    upload = request.files.get('pack_file')
+    server_path = request.form.get('pack_path', '').strip()
+    try:
+        if upload and upload.filename:
+            icons, skipped = icon_pack.import_pack(upload.filename, fileobj=upload.stream)
+        elif server_path:
+            icons, skipped = icon_pack.import_pack(server_path)
+        else:
+            flash("Choose a tarball to upload or enter a server path.", "warning")
+            return redirect(url_for('dashboard.settings', section='icons'))
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Icon pack import failed: {e}")
+        flash(f"Icon pack import failed: {e}", "danger")
+        return redirect(url_for('dashboard.settings', section='icons'))
+
+    message = f"✅ Icon pack imported: {icons} icon(s)."
+    if skipped:
+        message += f" Skipped {skipped} invalid SVG file(s)."
+    flash(message, "success")
+    return redirect(url_for('dashboard.settings', section='icons'))
+
+
 @dashboard_bp.route('/update_group', methods=['POST'])
 @login_required
 @is_admin_required
@@ -646,16 +1074,35 @@ def delete_group():
 @dashboard_bp.route('/images/<path:filename>')
 @login_required
 def serve_image(filename):
-    response = make_response(send_from_directory(current_app.config['IMAGE_DIR'], filename))
+    icon = icon_registry.lookup(filename)
+    if icon is not None and icon.body is not None:
+        response = current_app.response_class(icon.body, mimetype='image/svg+xml')
+        response.set_etag(icon.digest)
+        response.make_conditional(request)
+    else:
+        response = make_response(send_from_directory(current_app.config['IMAGE_DIR'], filename))
     response.headers['Cache-Control'] = 'public, max-age=86400'  # cache for 1 day
     return response
 
 
+@dashboard_bp.route('/images/sprite/<digest>.svg')
+@login_required
+def serve_icon_sprite(digest):
+    """One view's icons as `<symbol>`s (see `icon_sprite`). The name is
+    the content hash, so it never changes once served."""
+    if not re.fullmatch(r'[0-9a-f]{16}', digest):
+        return jsonify({'error': 'Not found'}), 404
+    response = make_response(send_from_directory(
+        icon_sprite.sprite_dir(), f"{digest}.svg", mimetype='image/svg+xml'
+    ))
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
 @dashboard_bp.route('/add', methods=['GET', 'POST'])
 @login_required
 @is_admin_required
 def add_entry():
-    image_dir = current_app.config['IMAGE_DIR']
     raw_referrer = request.args.get('ref', '/')
     parsed = urlparse(raw_referrer)
     referrer = parsed.path
@@ -704,22 +1151,13 @@ def add_entry():
 
         # === ICON RESOLUTION LOGIC ===
         if image_icon:
-            icon_path = os.path.join(image_dir, image_icon)
-            if not os.path.exists(icon_path):
-                try:
-                    icon_url = f"https://raw.githubusercontent.com/homarr-labs/dashboard-icons/main/svg/{image_icon}"
-                    response = requests.get(icon_url, timeout=5)
-                    if response.status_code == 200:
-                        with open(icon_path, 'wb') as f:
-                            f.write(response.content)
-                        logger.info(f"⬇️ Downloaded user-supplied icon '{image_icon}' for '{container_name}'")
-                    else:
-                        logger.warning(f"⚠️ Icon '{image_icon}' not found (HTTP {response.status_code})")
-                except Exception as e:
-                    logger.warning(f"⚠️ Failed to fetch icon '{image_icon}': {e}")
+            if icon_fetcher.ensure(image_icon):
+                logger.info(f"🖼️ Icon '{image_icon}' available for '{container_name}'")
+            else:
+                logger.warning(f"⚠️ Icon '{image_icon}' could not be fetched for '{container_name}'")
         else:
             derived_icon_name = container_name.lower().replace(" ", "-")
-            image_icon = fetch_icon_if_missing(derived_icon_name, image_dir, logger, debug=current_app.debug)
+            image_icon = fetch_best_icon(derived_icon_name)
             if image_icon:
                 logger.info(f"💡 Automatically fetched icon '{image_icon}' for new entry '{container_name}'.")
             else:
@@ -776,7 +1214,6 @@ def add_entry():
 @login_required
 @is_admin_required
 def edit_entry(id):
-    image_dir = current_app.config['IMAGE_DIR']
     entry = ServiceEntry.query.get_or_404(id)
 
     # Track the referrer for redirecting after save
@@ -788,17 +1225,7 @@ def edit_entry(id):
     if not referrer.startswith('/'):
         referrer = '/'
 
-    # Discover available widgets
-    widgets_dir = '/app/widgets'
-    available_widgets = []
-    if os.path.exists(widgets_dir):
-        available_widgets = [
-            d for d in os.listdir(widgets_dir)
-            if os.path.isdir(os.path.join(widgets_dir, d)) and d != '__pycache__'
-        ]
-        logger.debug(f"Widgets found: {', '.join(available_widgets)}") if available_widgets else logger.debug("No widgets found.")
-    else:
-        logger.warning(f"Widgets directory not found: {widgets_dir}")
+    available_widgets = widget_registry.names()
 
     # Fetch current widget association
     selected_widget = None
@@ -827,6 +1254,7 @@ def edit_entry(id):
                         WidgetValue.query.filter_by(widget_id=entry.widget_id).delete()
                         Widget.query.filter_by(id=entry.widget_id).delete()
 
+                exposure_summary.remove_entry(entry.id, entry.host)
                 db.session.delete(entry)
                 db.session.commit()
                 flash(f"Deleted entry: {entry.container_name}", 'success')
@@ -836,6 +1264,7 @@ def edit_entry(id):
                 return redirect(url_for('dashboard.edit_entry', id=id, ref=referrer))
 
         # === BASIC FIELDS ===
+        old_host = entry.host
         entry.host = request.form.get('host', '').strip()
         entry.container_name = request.form.get('container_name', '').strip()
 
@@ -897,22 +1326,11 @@ def edit_entry(id):
         # === ICON ===
         raw_icon = request.form.get('image_icon', '').strip().lower()
         entry.image_icon = f"{raw_icon}.svg" if raw_icon and not raw_icon.endswith('.svg') else raw_icon
-        icon_path = os.path.join(image_dir, entry.image_icon) if entry.image_icon else ''
-        if entry.image_icon and not os.path.exists(icon_path):
-            try:
-                icon_url = f"https://raw.githubusercontent.com/homarr-labs/dashboard-icons/main/svg/{entry.image_icon}"
-                response = requests.get(icon_url, timeout=5)
-                if response.status_code == 200:
-                    with open(icon_path, 'wb') as f:
-                        f.write(response.content)
-                    logger.info(f"Downloaded icon: {entry.image_icon}")
-                else:
-                    logger.warning(f"Icon not found at {icon_url}")
-            except Exception as e:
-                logger.warning(f"Error fetching icon: {e}")
+        if entry.image_icon and not icon_fetcher.ensure(entry.image_icon):
+            logger.warning(f"Icon '{entry.image_icon}' could not be fetched")
         elif not entry.image_icon and request.form.get('force_update_icon') == 'true':
             derived_icon_name = entry.container_name.lower().replace(" ", "-")
-            fetched_icon = fetch_icon_if_missing(derived_icon_name, image_dir, logger, debug=current_app.debug)
+            fetched_icon = fetch_best_icon(entry.image_name, derived_icon_name)
             if fetched_icon:
                 entry.image_icon = fetched_icon
 
@@ -956,6 +1374,9 @@ def edit_entry(id):
         # nothing about URLs changed — it's a no-op when sources are
         # ui_edit / explicit_label.
         synthesizer.synthesize_for_entry(entry)
+        # exposure_summary is keyed by host; re-attribute this entry's
+        # exposure rows if the host was edited.
+        exposure_summary.move_entry(entry.id, old_host, entry.host)
 
         try:
             db.session.commit()
@@ -995,6 +1416,7 @@ def delete_entry_json(id):
             WidgetValue.query.filter_by(widget_id=entry.widget_id).delete()
             Widget.query.filter_by(id=entry.widget_id).delete()
 
+    exposure_summary.remove_entry(entry.id, entry.host)
     db.session.delete(entry)
     db.session.commit()
     return jsonify({'ok': True})
@@ -1027,4 +1449,7 @@ def changelog_api():
             and _parse_version(s['version']) > since_tuple
         ]
 
-    return jsonify({'current': current, 'sections': result})
+    return http_cache.conditional_json(
+        {'current': current, 'sections': result},
+        etag=http_cache.etag_for('changelog', since_raw),
+    )
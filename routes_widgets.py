@@ -1,16 +1,17 @@
 """Widget configuration endpoints.
 
-Owns the `widgets` blueprint. Currently a single read-only endpoint
-that returns the available fields a widget plugin exposes; expected
-to grow as the widget surface develops.
+Owns the `widgets` blueprint: the available fields a widget plugin
+exposes (read by the edit form), the admin action that reloads the
+plugins from disk, and the widget refresh metrics. Plugins themselves
+live in `widget_registry`.
 """
 
-import json
-import os
-
-from flask import Blueprint, current_app, jsonify
+from flask import Blueprint, flash, jsonify, redirect, url_for
 from flask_login import login_required
 
+import http_cache
+import widget_refresh
+import widget_registry
 from routes_auth import is_admin_required
 
 widgets_bp = Blueprint("widgets", __name__)
@@ -20,14 +21,29 @@ widgets_bp = Blueprint("widgets", __name__)
 @login_required
 @is_admin_required
 def widget_config(widget_name):
-    path = os.path.join('/app/widgets', widget_name, 'settings.json')
-    if not os.path.exists(path):
-        return jsonify([])  # Or 404 if you prefer
-
-    with open(path) as f:
-        try:
-            config = json.load(f)
-            return jsonify(config.get("available_fields", []))  # ✅ FIXED
-        except Exception as e:
-            current_app.logger.warning(f"Failed to load widget settings for {widget_name}: {e}")
-            return jsonify([])
+    # Unknown plugins get an empty field list, as the edit form expects.
+    return jsonify(widget_registry.available_fields(widget_name))
+
+
+@widgets_bp.route('/widgets/reload', methods=['POST'])
+@login_required
+@is_admin_required
+def reload_widgets():
+    """Rediscover the widget plugins (new folders, edited
+    settings.json / fetch_data.py) without a restart."""
+    loaded = widget_registry.reload()
+    errors = widget_registry.errors()
+    message = f"🧩 Reloaded widget plugins: {loaded} loaded."
+    if errors:
+        message += f" {len(errors)} failed: {', '.join(errors)}."
+    flash(message, "warning" if errors else "success")
+    return redirect(url_for('dashboard.settings', section='widgets'))
+
+
+@widgets_bp.route('/widgets/metrics')
+@login_required
+@is_admin_required
+def widget_metrics():
+    """Last widget refresh run and each widget's fetch duration and
+    outcome, as JSON."""
+    return http_cache.conditional_json(widget_refresh.metrics())
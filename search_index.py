@@ -0,0 +1,93 @@
+"""Full-text service search.
+
+Backed by the `service_search` FTS5 table (see the f7c3a9e1b54d
+migration): one row per service, rowid = `service_entry.id`, over
+container name, host, stack, group name, image owner/name, URLs and
+exposure hostnames. SQLite triggers keep it current on every write,
+so nothing here has to be called from the write paths.
+
+Queries are split into word tokens and every token must match the
+start of a word in any column (`graf lab` finds `grafana` on
+`lab-01`), ranked by bm25. Input never reaches FTS5 query syntax
+unquoted, so operators and stray quotes are just text.
+
+SQLite builds without FTS5 have no `service_search` table; there
+`match_ids()` falls back to substring LIKE matching on the
+`service_entry` columns (no group name or exposure hostnames), which
+is slower but gives the same kind of answer.
+"""
+
+import logging
+import re
+
+from sqlalchemy import or_, text
+
+from extensions import db
+from models import ServiceEntry
+
+logger = logging.getLogger(__name__)
+
+TABLE = "service_search"
+
+# Longer queries are truncated to this many tokens.
+MAX_TOKENS = 8
+
+_FALLBACK_COLUMNS = (
+    ServiceEntry.container_name,
+    ServiceEntry.host,
+    ServiceEntry.stack_name,
+    ServiceEntry.image_owner,
+    ServiceEntry.image_name,
+    ServiceEntry.internalurl,
+    ServiceEntry.externalurl,
+)
+
+_available = None
+
+
+def tokens(query):
+    return re.findall(r"\w+", (query or "").lower())[:MAX_TOKENS]
+
+
+def _fts_query(words):
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def available():
+    """True when the FTS5 table exists (checked once per process)."""
+    global _available
+    if _available is None:
+        _available = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": TABLE},
+        ).first() is not None
+        if not _available:
+            logger.warning("⚠️ service_search index missing; search falls back to LIKE matching.")
+    return _available
+
+
+def match_ids(query, limit=None, ranked=True):
+    """Service IDs matching `query`, best match first unless `ranked`
+    is False (callers that sort the matches themselves skip the bm25
+    pass). Empty for a query with no word characters."""
+    words = tokens(query)
+    if not words:
+        return []
+    if available():
+        sql = f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH :match"
+        if ranked:
+            sql += f" ORDER BY bm25({TABLE})"
+        params = {"match": _fts_query(words)}
+        if limit is not None:
+            sql += " LIMIT :limit"
+            params["limit"] = int(limit)
+        return [row[0] for row in db.session.execute(text(sql), params)]
+
+    q = db.session.query(ServiceEntry.id)
+    for word in words:
+        q = q.filter(or_(*(col.ilike(f"%{word}%") for col in _FALLBACK_COLUMNS)))
+    if ranked:
+        q = q.order_by(ServiceEntry.container_name)
+    if limit is not None:
+        q = q.limit(int(limit))
+    return [row[0] for row in q]
@@ -18,14 +18,50 @@ VALID_KEYS = {
     "std_dozzle_url": str,
     "url_healthcheck_interval": int,
     "widget_background_reload": int,
-    "user_session_length": int
+    "user_session_length": int,
+    "register_rate_limit_per_host": int,
+    "register_rate_burst_per_host": int,
+    "register_rate_limit_per_ip": int,
+    "register_rate_burst_per_ip": int,
+    "register_rate_limit_max_keys": int,
+    "exposure_recompute_chunk_size": int,
+    "stream_max_subscribers": int,
+    "stream_queue_size": int,
+    "stream_heartbeat_seconds": int,
+    "dashboard_page_size": int,
+    "tile_cache_size": int,
+    "compress_min_bytes": int,
+    "icon_pack_path": str,
+    "icon_fetch_retry_minutes": int,
+    "icon_verify_workers": int,
+    "widget_refresh_workers": int,
+    "widget_fetch_timeout": int,
+    "widget_upstream_concurrency": int,
 }
 DEFAULT_VALUES = {
     "backup_path": "/config/backups",
     "backup_days_to_keep": 7,
     "url_healthcheck_interval": 300,
     "widget_background_reload": 900,
-    "user_session_length": 120
+    "user_session_length": 120,
+    "register_rate_limit_per_host": 120,
+    "register_rate_burst_per_host": 100,
+    "register_rate_limit_per_ip": 300,
+    "register_rate_burst_per_ip": 200,
+    "register_rate_limit_max_keys": 4096,
+    "exposure_recompute_chunk_size": 200,
+    "stream_max_subscribers": 100,
+    "stream_queue_size": 64,
+    "stream_heartbeat_seconds": 15,
+    "dashboard_page_size": 200,
+    "tile_cache_size": 2000,
+    "compress_min_bytes": 1024,
+    "icon_pack_path": "/config/icon-pack",
+    "icon_fetch_retry_minutes": 60,
+    "icon_verify_workers": 4,
+    "widget_refresh_workers": 8,
+    "widget_fetch_timeout": 30,
+    "widget_upstream_concurrency": 2,
 }
 def load_settings():
     file_config = {}
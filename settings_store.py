@@ -22,13 +22,25 @@ Keys currently in use:
                               Per-host overrides any global setting
                               for that layer on that host.
 
-Reads hit the DB directly. Settings are tiny (a couple of rows max),
-the homelab workload is low, and a stale-cache bug here would be
-silently wrong rather than silently slow.
+`get_layer_directions()` / `get_host_layer_overrides()` hit the DB
+directly; the settings page is their only caller. The synthesizer's
+hot path goes through `direction_resolver()` instead: the two rows
+are compiled into a `DirectionResolver` that is cached in process
+and keyed by a version stamp — `(row count, max(updated_at))` over
+the `setting` table. The stamp is read at most once per app context
+(i.e. once per request), which keeps other processes' saves visible
+without re-reading both JSON blobs for every exposure row.
+`save_exposure_settings()` bumps `updated_at` and drops the cached
+resolver, so the saving request itself never sees the old mapping.
 """
 
+import threading
+from datetime import datetime
 from typing import Dict, List
 
+from flask import g, has_app_context
+from sqlalchemy import func
+
 from extensions import db
 from models import Setting
 
@@ -53,10 +65,88 @@ def _set_value(key: str, value) -> None:
         db.session.add(row)
     else:
         row.value = value
+        # Set explicitly: `onupdate` only fires when SQLAlchemy sees a
+        # changed column, and the resolver's version stamp must move on
+        # every save even if the JSON compares equal.
+        row.updated_at = datetime.utcnow()
 
 
-def get_layer_directions() -> Dict[str, str]:
-    raw = _get_value(KEY_EXPOSURE_LAYERS, {}) or {}
+class DirectionResolver:
+    """Compiled `(layer, host) -> direction` lookup.
+
+    Built from one read of both settings rows; immutable afterwards,
+    so it can be shared across threads.
+    """
+
+    __slots__ = ("layer_directions", "host_overrides")
+
+    def __init__(self, layer_directions: Dict[str, str], host_overrides: Dict[str, Dict[str, str]]):
+        self.layer_directions = layer_directions
+        self.host_overrides = host_overrides
+
+    def direction_for(self, layer: str, host: str) -> str:
+        host_map = self.host_overrides.get(host) if host else None
+        if host_map and layer in host_map:
+            return host_map[layer]
+        return self.layer_directions.get(layer, DEFAULT_DIRECTION)
+
+
+_STAMP_G_KEY = "_settings_store_stamp"
+_resolver_lock = threading.Lock()
+_cached_resolver = None  # (stamp, DirectionResolver)
+
+
+def _current_stamp():
+    if has_app_context():
+        stamp = g.get(_STAMP_G_KEY)
+        if stamp is not None:
+            return stamp
+    count, latest = db.session.query(func.count(Setting.key), func.max(Setting.updated_at)).one()
+    stamp = (count, latest)
+    if has_app_context():
+        setattr(g, _STAMP_G_KEY, stamp)
+    return stamp
+
+
+def _invalidate_resolver() -> None:
+    global _cached_resolver
+    with _resolver_lock:
+        _cached_resolver = None
+    if has_app_context():
+        g.pop(_STAMP_G_KEY, None)
+
+
+def direction_resolver() -> DirectionResolver:
+    """Return the cached resolver, rebuilding it when the stamp moved.
+
+    The rebuild derives both the data and the stamp it is cached
+    under from the same single query, so a save committed mid-build
+    can only make the cache look older than it is (forcing another
+    rebuild), never newer.
+    """
+    global _cached_resolver
+    stamp = _current_stamp()
+    cached = _cached_resolver
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    rows = Setting.query.all()
+    values = {row.key: row.value for row in rows}
+    built_stamp = (len(rows), max((row.updated_at for row in rows), default=None))
+    resolver = DirectionResolver(
+        _clean_layer_map(values.get(KEY_EXPOSURE_LAYERS)),
+        _clean_host_overrides(values.get(KEY_EXPOSURE_LAYERS_PER_HOST)),
+    )
+    with _resolver_lock:
+        _cached_resolver = (built_stamp, resolver)
+    if has_app_context():
+        setattr(g, _STAMP_G_KEY, built_stamp)
+    return resolver
+
+
+def _clean_layer_map(raw) -> Dict[str, str]:
+    if not isinstance(raw, dict):
+        return {}
     return {
         str(layer): direction
         for layer, direction in raw.items()
@@ -64,29 +154,31 @@ def get_layer_directions() -> Dict[str, str]:
     }
 
 
-def get_host_layer_overrides() -> Dict[str, Dict[str, str]]:
-    raw = _get_value(KEY_EXPOSURE_LAYERS_PER_HOST, {}) or {}
+def _clean_host_overrides(raw) -> Dict[str, Dict[str, str]]:
+    if not isinstance(raw, dict):
+        return {}
     cleaned: Dict[str, Dict[str, str]] = {}
     for host, layer_map in raw.items():
         if not isinstance(layer_map, dict):
             continue
-        cleaned[str(host)] = {
-            str(layer): direction
-            for layer, direction in layer_map.items()
-            if direction in VALID_DIRECTIONS
-        }
+        cleaned[str(host)] = _clean_layer_map(layer_map)
     return cleaned
 
 
+def get_layer_directions() -> Dict[str, str]:
+    return _clean_layer_map(_get_value(KEY_EXPOSURE_LAYERS, {}) or {})
+
+
+def get_host_layer_overrides() -> Dict[str, Dict[str, str]]:
+    return _clean_host_overrides(_get_value(KEY_EXPOSURE_LAYERS_PER_HOST, {}) or {})
+
+
 def direction_for(layer: str, host: str) -> str:
     """Resolve direction for `(layer, host)` with per-host override
-    precedence over the global setting. Unknown / unset = "neither"."""
-    overrides = get_host_layer_overrides()
-    host_map = overrides.get(host) if host else None
-    if host_map and layer in host_map:
-        return host_map[layer]
-    globals_ = get_layer_directions()
-    return globals_.get(layer, DEFAULT_DIRECTION)
+    precedence over the global setting. Unknown / unset = "neither".
+
+    Served from the cached resolver; see `direction_resolver()`."""
+    return direction_resolver().direction_for(layer, host)
 
 
 def save_exposure_settings(
@@ -119,23 +211,19 @@ def save_exposure_settings(
 
     _set_value(KEY_EXPOSURE_LAYERS, cleaned_globals)
     _set_value(KEY_EXPOSURE_LAYERS_PER_HOST, cleaned_overrides)
+    _invalidate_resolver()
 
 
 def discovered_layers() -> List[str]:
-    """Layers that have ever been seen in service_exposure. Sorted.
+    """Layers that currently have exposure observations. Sorted.
 
     Used by the settings page to populate the layer table — operators
     only get to configure layers that have actually been observed,
     avoiding empty config screens before any interpreter has run.
+    Served from the `exposure_summary` rollup.
     """
-    from models import ServiceExposure
-    rows = (
-        db.session.query(ServiceExposure.layer)
-        .distinct()
-        .order_by(ServiceExposure.layer.asc())
-        .all()
-    )
-    return [r[0] for r in rows]
+    import exposure_summary
+    return exposure_summary.discovered_layers()
 
 
 def discovered_hosts() -> List[str]:
@@ -143,14 +231,8 @@ def discovered_hosts() -> List[str]:
 
     Used by the settings page's per-host overrides section. A host
     with no exposure observations doesn't need an override because
-    the synthesizer has no candidates to direct.
+    the synthesizer has no candidates to direct. Served from the
+    `exposure_summary` rollup.
     """
-    from models import ServiceEntry, ServiceExposure
-    rows = (
-        db.session.query(ServiceEntry.host)
-        .join(ServiceExposure, ServiceExposure.service_entry_id == ServiceEntry.id)
-        .distinct()
-        .order_by(ServiceEntry.host.asc())
-        .all()
-    )
-    return [r[0] for r in rows]
+    import exposure_summary
+    return exposure_summary.discovered_hosts()
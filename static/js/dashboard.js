@@ -1,14 +1,39 @@
 /* ============================================================
    Service Tracker Dashboard — shared JavaScript
-   Covers: auto-refresh, group-collapse, view-controls,
+   Covers: auto-refresh (delta patching), group-collapse, view-controls,
    filter-input, tiled tile-click, tile drawers, tools popover,
    dashboard group-toggle, clipboard copy, delete popover,
-   widget drawer, refresh-pause while interacting.
+   widget drawer, refresh-pause while interacting, relative times.
    ============================================================ */
 
 (function () {
   'use strict';
 
+  /* ── Relative times ("5 minutes ago") ─────────────────── */
+  // Cached tile HTML carries `[[ago:<epoch seconds>]]` tokens (Jinja
+  // `reltime` filter) in title attributes instead of server-rendered
+  // text; they are filled in here and refreshed once a minute.
+  const RELTIME_TOKEN = /\[\[ago:(\d+)\]\]/g;
+
+  function timeAgo(epoch) {
+    const s = Math.max(0, Math.round(Date.now() / 1000 - epoch));
+    const ago = (n, one, unit) => (n === 1 ? one : `${n} ${unit}s`) + ' ago';
+    if (s < 1)        return 'now';
+    if (s < 60)       return ago(s, 'a second', 'second');
+    if (s < 3600)     return ago(Math.floor(s / 60), 'a minute', 'minute');
+    if (s < 86400)    return ago(Math.floor(s / 3600), 'an hour', 'hour');
+    if (s < 86400 * 30)  return ago(Math.floor(s / 86400), 'a day', 'day');
+    if (s < 86400 * 365) return ago(Math.floor(s / (86400 * 30)), 'a month', 'month');
+    return ago(Math.floor(s / (86400 * 365)), 'a year', 'year');
+  }
+
+  function renderRelativeTimes(root) {
+    (root || document).querySelectorAll('[title*="[[ago:"], [data-reltime-title]').forEach(el => {
+      if (!el.dataset.reltimeTitle) el.dataset.reltimeTitle = el.getAttribute('title');
+      el.setAttribute('title', el.dataset.reltimeTitle.replace(RELTIME_TOKEN, (_, t) => timeAgo(+t)));
+    });
+  }
+
   /* ── Auto-refresh ─────────────────────────────────────── */
   let secondsSinceRefresh = 0;
   let refreshInterval = 60;
@@ -34,13 +59,26 @@
       refreshDropdown.addEventListener('change', function () {
         refreshInterval = parseInt(this.value, 10);
         localStorage.setItem('refreshInterval', this.value);
+        syncLiveStream();
       });
     }
+    syncLiveStream();
     setInterval(() => {
       if (isInteracting()) {
         if (refreshLabel) refreshLabel.textContent = 'Refresh paused (drawer open)';
         return;
       }
+      if (liveConnected) {
+        // Pushed changes are applied at most once a second, which also
+        // batches bursts (e.g. a health sweep committing many rows).
+        if (livePending) {
+          livePending = false;
+          refreshFromDelta();
+        }
+        if (refreshLabel) refreshLabel.textContent = 'Live';
+        secondsSinceRefresh = 0;
+        return;
+      }
       secondsSinceRefresh++;
       if (refreshLabel) {
         const m = Math.floor(secondsSinceRefresh / 60);
@@ -48,11 +86,297 @@
         refreshLabel.textContent = `Refreshed ${m > 0 ? m + 'm ' : ''}${s}s ago`;
       }
       if (refreshInterval > 0 && secondsSinceRefresh >= refreshInterval) {
-        window.location.reload();
+        refreshIfChanged();
       }
     }, 1000);
   }
 
+  // Conditional refresh: ask the server whether this page's ETag is
+  // still current and only reload on a real change. The probe is a
+  // HEAD request, which the server answers from the ETag alone, so an
+  // unchanged dashboard costs one bodiless 304 per interval and a
+  // changed one is rendered once, by the reload.
+  let refreshInFlight = false;
+
+  function refreshIfChanged() {
+    if (DELTA_VIEWS[document.body.dataset.view] && document.body.dataset.version && window.fetch) {
+      refreshFromDelta();
+      return;
+    }
+    const etag = document.body.dataset.etag;
+    if (!etag || !window.fetch) {
+      window.location.reload();
+      return;
+    }
+    if (refreshInFlight) return;
+    refreshInFlight = true;
+    fetch(window.location.href, {
+      method: 'HEAD',
+      cache: 'no-store',
+      credentials: 'same-origin',
+      headers: { 'If-None-Match': `"${etag}"` },
+    })
+      .then(resp => {
+        if (resp.status === 304) {
+          secondsSinceRefresh = 0;
+          return;
+        }
+        window.location.reload();
+      })
+      .catch(() => { secondsSinceRefresh = 0; })
+      .finally(() => { refreshInFlight = false; });
+  }
+
+  /* ── Live updates: patch changed entries in place ────── */
+  // Per view: selector for one entry's element, and for the element
+  // that marks a bucket (its data-* attribute carries the label).
+  const DELTA_VIEWS = {
+    tiled:     { entry: '.tile-wrapper',                    bucket: '.tile-container[data-group-container]', label: 'groupContainer' },
+    dashboard: { entry: 'tr.group-entry',                   bucket: 'tbody[data-group-body]',                label: 'groupBody' },
+    compact:   { entry: '.compact-tile:not(.group-header)', bucket: '.compact-tile.group-header[data-group]', label: 'group' },
+  };
+
+  function findEntry(cfg, id) {
+    return document.querySelector(`${cfg.entry}[data-entry-id="${id}"]`);
+  }
+
+  function bucketElements(cfg) {
+    return Array.from(document.querySelectorAll(cfg.bucket));
+  }
+
+  function updateGroupCounts(buckets) {
+    const counts = new Map(buckets);
+    document.querySelectorAll('[data-group]').forEach(header => {
+      const countEl = header.querySelector('.group-count');
+      if (countEl && counts.has(header.dataset.group)) {
+        countEl.textContent = `(${counts.get(header.dataset.group)})`;
+      }
+    });
+  }
+
+  // Returns false when the page can't be patched and needs a reload.
+  function applyDelta(view, data) {
+    const cfg = DELTA_VIEWS[view];
+    if (data.reload) return false;
+
+    const pageLabels = bucketElements(cfg).map(el => el.dataset[cfg.label]);
+    const newLabels  = data.buckets.map(b => b[0]);
+    if (pageLabels.join('\u0000') !== newLabels.join('\u0000')) return false;
+
+    if (view === 'compact') {
+      const grid = document.querySelector('[data-show-host]');
+      if (grid && (grid.dataset.showHost === 'true') !== data.show_host) return false;
+    }
+
+    data.removed.forEach(id => {
+      const el = findEntry(cfg, id);
+      if (el) el.remove();
+    });
+
+    for (const u of data.upserts) {
+      const tmpl = document.createElement('template');
+      tmpl.innerHTML = u.html.trim();
+      const el = tmpl.content.firstElementChild;
+      if (!el) return false;
+
+      const existing = findEntry(cfg, u.id);
+      if (existing) existing.remove();
+      const shell = el.querySelector('.tile-drawer');
+      if (shell) drawerCache.delete(shell.dataset.drawerUrl);
+
+      if (u.after !== null) {
+        const anchor = findEntry(cfg, u.after);
+        if (!anchor) {
+          // Lands in the part of a paged bucket that isn't loaded yet;
+          // the bucket's next page will bring it.
+          if (bucketSentinel(u.bucket)) continue;
+          return false;
+        }
+        anchor.after(el);
+      } else {
+        const bucket = bucketElements(cfg).find(b => b.dataset[cfg.label] === u.bucket);
+        if (!bucket) return false;
+        if (view === 'compact') bucket.after(el);
+        else bucket.prepend(el);
+      }
+      bindEntry(view, el);
+    }
+
+    updateGroupCounts(data.buckets);
+    const total = document.getElementById('totalEntries');
+    if (total) total.textContent = data.total;
+    if (view === 'dashboard') initDashboardGroupCollapse();
+    const filterInput = document.getElementById('filterInput');
+    if (filterInput && filterInput.value) filterInput.dispatchEvent(new Event('input'));
+    return true;
+  }
+
+  function refreshFromDelta() {
+    if (refreshInFlight) return;
+    refreshInFlight = true;
+    const view   = document.body.dataset.view;
+    const params = new URLSearchParams(window.location.search);
+    params.set('view', view);
+    params.set('since', document.body.dataset.version);
+    params.set('ref', window.location.pathname + window.location.search);
+    fetch(`/api/v1/dashboard/changes?${params}`, {
+      credentials: 'same-origin',
+      headers: { 'Accept': 'application/json' },
+    })
+      .then(resp => {
+        const type = resp.headers.get('Content-Type') || '';
+        // Expired session → redirected to the login page.
+        if (!resp.ok || resp.redirected || !type.includes('application/json')) {
+          window.location.reload();
+          return null;
+        }
+        return resp.json();
+      })
+      .then(data => {
+        if (!data) return;
+        if (!applyDelta(view, data)) {
+          window.location.reload();
+          return;
+        }
+        document.body.dataset.version = data.version;
+        secondsSinceRefresh = 0;
+      })
+      .catch(() => { secondsSinceRefresh = 0; })
+      .finally(() => { refreshInFlight = false; });
+  }
+
+  // Wire per-entry handlers on a freshly inserted element.
+  function bindEntry(view, el) {
+    renderRelativeTimes(el);
+    if (view === 'tiled') {
+      initTileClick(el);
+      bindDrawerButtons(el);
+      bindToolsButtons(el);
+      initDrawerDelete(el);
+      initTileTrash(el);
+      initWidgetButtons(el);
+    } else if (view === 'dashboard') {
+      initDashboardTrash(el);
+    }
+  }
+
+  /* ── Live updates: SSE push ─────────────────────────── */
+  // While /api/v1/stream is connected the timer above stops polling;
+  // a `change` or `resync` event marks the page stale and the next
+  // tick pulls the delta. If the stream can't be opened (limit
+  // reached, session expired, no EventSource) polling carries on.
+  let liveSource    = null;
+  let liveConnected = false;
+  let livePending   = false;
+
+  function syncLiveStream() {
+    const wanted = refreshInterval > 0
+      && !!window.EventSource
+      && !!DELTA_VIEWS[document.body.dataset.view]
+      && !!document.body.dataset.version;
+    if (!wanted) {
+      if (liveSource) liveSource.close();
+      liveSource = null;
+      liveConnected = false;
+      return;
+    }
+    if (liveSource) return;
+
+    liveSource = new EventSource('/api/v1/stream');
+    liveSource.addEventListener('open', () => { liveConnected = true; });
+    liveSource.addEventListener('error', () => {
+      // EventSource retries on its own unless the server refused it.
+      liveConnected = false;
+      if (liveSource && liveSource.readyState === EventSource.CLOSED) liveSource = null;
+    });
+    liveSource.addEventListener('change', e => {
+      const data = JSON.parse(e.data);
+      if (data.version !== document.body.dataset.version) livePending = true;
+    });
+    liveSource.addEventListener('resync', () => { livePending = true; });
+  }
+
+  /* ── Paged buckets: load the rest near the viewport ─── */
+  // With `dashboard_page_size` set, a long bucket renders its first
+  // page plus a .page-sentinel carrying a cursor. When the sentinel
+  // comes within a screen or so of the viewport the next page is
+  // fetched and inserted ahead of it, until the bucket is complete.
+  // Group headers and counts are rendered for the whole bucket.
+  let pageObserver = null;
+
+  function bucketSentinel(label) {
+    return document.querySelector(`.page-sentinel[data-bucket="${CSS.escape(label)}"]`);
+  }
+
+  function loadPage(sentinel) {
+    if (sentinel.dataset.loading === 'true') return;
+    sentinel.dataset.loading = 'true';
+    const view   = document.body.dataset.view;
+    const cfg    = DELTA_VIEWS[view];
+    const params = new URLSearchParams(window.location.search);
+    params.set('view', view);
+    params.set('cursor', sentinel.dataset.cursor);
+    params.set('ref', window.location.pathname + window.location.search);
+    fetch(`/api/v1/dashboard/page?${params}`, {
+      credentials: 'same-origin',
+      headers: { 'Accept': 'application/json' },
+    })
+      .then(resp => {
+        const type = resp.headers.get('Content-Type') || '';
+        if (!resp.ok || resp.redirected || !type.includes('application/json')) {
+          window.location.reload();
+          return null;
+        }
+        return resp.json();
+      })
+      .then(data => {
+        if (!data) return;
+        if (data.reload) {
+          window.location.reload();
+          return;
+        }
+        const tmpl = document.createElement('template');
+        tmpl.innerHTML = data.html.trim();
+        Array.from(tmpl.content.children).forEach(el => {
+          // A live update may already have placed this entry.
+          if (findEntry(cfg, el.dataset.entryId)) return;
+          sentinel.before(el);
+          bindEntry(view, el);
+        });
+        if (view === 'dashboard') initDashboardGroupCollapse();
+        const filterInput = document.getElementById('filterInput');
+        if (filterInput && filterInput.value) filterInput.dispatchEvent(new Event('input'));
+
+        if (!data.next_cursor) {
+          if (pageObserver) pageObserver.unobserve(sentinel);
+          sentinel.remove();
+          return;
+        }
+        sentinel.dataset.cursor = data.next_cursor;
+        if (pageObserver) {
+          pageObserver.unobserve(sentinel);
+          pageObserver.observe(sentinel);  // re-checks visibility
+        } else {
+          setTimeout(() => loadPage(sentinel));
+        }
+      })
+      .catch(() => {})
+      .finally(() => { sentinel.dataset.loading = 'false'; });
+  }
+
+  function initPaging() {
+    const sentinels = document.querySelectorAll('.page-sentinel');
+    if (!sentinels.length) return;
+    if (!window.IntersectionObserver || !window.fetch) {
+      sentinels.forEach(loadPage);
+      return;
+    }
+    pageObserver = new IntersectionObserver(entries => {
+      entries.forEach(e => { if (e.isIntersecting) loadPage(e.target); });
+    }, { rootMargin: '800px' });
+    sentinels.forEach(s => pageObserver.observe(s));
+  }
+
   /* ── View-control submit-on-change ───────────────────── */
   function initViewControls() {
     document.querySelectorAll('.view-control').forEach(function (el) {
@@ -105,8 +429,21 @@
 
     const view = document.body.dataset.view;
 
+    // Enter runs a server-side search (?q=) over every indexed field;
+    // typing only narrows what is already on the page. The box starts
+    // out holding the server query, whose matches are all shown.
+    filterInput.addEventListener('keydown', function (e) {
+      if (e.key !== 'Enter') return;
+      e.preventDefault();
+      const params = new URLSearchParams(window.location.search);
+      const q = this.value.trim();
+      if (q) params.set('q', q); else params.delete('q');
+      window.location.search = params.toString();
+    });
+
     filterInput.addEventListener('input', function () {
-      const filter = this.value.toLowerCase();
+      const serverQuery = this.dataset.serverQuery || '';
+      const filter = (serverQuery && this.value === serverQuery) ? '' : this.value.toLowerCase();
 
       if (view === 'dashboard') {
         document.querySelectorAll('table tbody tr[data-entry]').forEach(row => {
@@ -140,8 +477,8 @@
   }
 
   /* ── Tiled: tile-body click → open URL ───────────────── */
-  function initTileClick() {
-    document.querySelectorAll('.tile').forEach(tile => {
+  function initTileClick(root = document) {
+    root.querySelectorAll('.tile').forEach(tile => {
       const internalUrl = tile.dataset.internalurl;
       const externalUrl = tile.dataset.externalurl;
       if (!internalUrl && !externalUrl) return;
@@ -175,7 +512,45 @@
     }
   }
 
+  // Drawer contents are fetched on first open (the page only carries
+  // an empty shell per tile) and cached by URL until the tile is
+  // patched by a live update.
+  const drawerCache = new Map();
+
+  function fillDrawer(drawer, html) {
+    drawer.innerHTML = html;
+    drawer.dataset.loaded = 'true';
+    bindToolsButtons(drawer);
+    initDrawerDelete(drawer);
+  }
+
+  function loadDrawer(drawer) {
+    const url = drawer.dataset.drawerUrl;
+    if (!url || drawer.dataset.loaded === 'true' || drawer.dataset.loading === 'true') return;
+    if (drawerCache.has(url)) {
+      fillDrawer(drawer, drawerCache.get(url));
+      return;
+    }
+    drawer.dataset.loading = 'true';
+    const ref = window.location.pathname + window.location.search;
+    fetch(`${url}?ref=${encodeURIComponent(ref)}`, { credentials: 'same-origin' })
+      .then(r => {
+        if (!r.ok) throw new Error(`HTTP ${r.status}`);
+        return r.text();
+      })
+      .then(html => {
+        drawerCache.set(url, html);
+        fillDrawer(drawer, html);
+      })
+      .catch(() => {
+        const msg = drawer.querySelector('.drawer-loading em');
+        if (msg) msg.textContent = 'Could not load details.';
+      })
+      .finally(() => { delete drawer.dataset.loading; });
+  }
+
   function openDrawer(drawer, tile, mode) {
+    loadDrawer(drawer);
     drawer.classList.add('drawer-open', 'drawer-mode-' + mode);
     tile.classList.add('tile-open');
     const chevron = tile.querySelector('.tile-chevron');
@@ -188,8 +563,8 @@
     currentDrawerMode = mode;
   }
 
-  function initDrawers() {
-    document.querySelectorAll('.tile-chevron').forEach(btn => {
+  function bindDrawerButtons(root) {
+    root.querySelectorAll('.tile-chevron').forEach(btn => {
       btn.addEventListener('click', function (e) {
         e.stopPropagation();
         const wrapper  = this.closest('.tile-wrapper');
@@ -218,6 +593,10 @@
         }
       });
     });
+  }
+
+  function initDrawers() {
+    bindDrawerButtons(document);
 
     // Close on outside click or Esc
     document.addEventListener('click', function (e) {
@@ -230,8 +609,8 @@
   }
 
   /* ── Tiled drawer: tools popover ────────────────────── */
-  function initToolsPopovers() {
-    document.querySelectorAll('.drawer-btn-tools').forEach(btn => {
+  function bindToolsButtons(root) {
+    root.querySelectorAll('.drawer-btn-tools').forEach(btn => {
       btn.addEventListener('click', function (e) {
         e.stopPropagation();
         const wrap    = this.closest('.drawer-tools-wrap');
@@ -243,6 +622,10 @@
         if (!isOpen) dropdown.classList.add('dropdown-open');
       });
     });
+  }
+
+  function initToolsPopovers() {
+    bindToolsButtons(document);
 
     document.addEventListener('click', function (e) {
       if (!e.target.closest('.drawer-tools-wrap')) {
@@ -329,8 +712,8 @@
   }
 
   /* ── Tiled drawer: delete action ────────────────────── */
-  function initDrawerDelete() {
-    document.querySelectorAll('.drawer-btn-delete').forEach(btn => {
+  function initDrawerDelete(root = document) {
+    root.querySelectorAll('.drawer-btn-delete').forEach(btn => {
       btn.addEventListener('click', function (e) {
         e.stopPropagation();
         const entryId       = this.dataset.entryId;
@@ -349,8 +732,8 @@
   }
 
   /* ── Tiled: trash icon on tile ───────────────────────── */
-  function initTileTrash() {
-    document.querySelectorAll('.tile-trash-btn').forEach(btn => {
+  function initTileTrash(root = document) {
+    root.querySelectorAll('.tile-trash-btn').forEach(btn => {
       btn.addEventListener('click', function (e) {
         e.stopPropagation();
         const entryId       = this.dataset.entryId;
@@ -366,8 +749,8 @@
   }
 
   /* ── Dashboard: trash icon on row ────────────────────── */
-  function initDashboardTrash() {
-    document.querySelectorAll('.row-trash-btn').forEach(btn => {
+  function initDashboardTrash(root = document) {
+    root.querySelectorAll('.row-trash-btn').forEach(btn => {
       btn.addEventListener('click', function (e) {
         e.stopPropagation();
         const entryId       = this.dataset.entryId;
@@ -434,8 +817,8 @@
   }
 
   /* ── Widget drawer button ────────────────────────────────── */
-  function initWidgetButtons() {
-    document.querySelectorAll('.tile-widget-btn').forEach(btn => {
+  function initWidgetButtons(root = document) {
+    root.querySelectorAll('.tile-widget-btn').forEach(btn => {
       btn.addEventListener('click', function (e) {
         e.stopPropagation();
         const wrapper  = this.closest('.tile-wrapper');
@@ -539,6 +922,9 @@
     initFilter();
     initFilterBarMobile();
     initChangelogModal();
+    initPaging();
+    renderRelativeTimes();
+    setInterval(() => renderRelativeTimes(), 60000);
 
     const view = document.body.dataset.view;
     if (view === 'tiled') {
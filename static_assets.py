@@ -0,0 +1,174 @@
+"""Fingerprinted, precompressed static assets and response compression.
+
+Static files (`static/`: dashboard.js, dashboard.css, the exposure
+icons, ...) used to go out through Flask's default handler: no content
+hash in the URL, so every auto-refresh reload revalidated them, and no
+compression.
+
+`init_app(app)` runs once at startup:
+
+- Every file under the static folder is read, hashed (SHA-256) and
+  precompressed in memory with gzip and, when the optional `brotli`
+  package is installed, brotli. The whole folder is well under 1 MB.
+- `url_for('static', filename='js/dashboard.js')` now yields
+  `/static/js/dashboard.<hash>.js`, so templates pick up the hashed
+  URL without changes.
+- The `static` endpoint serves hashed names with
+  `Cache-Control: public, max-age=31536000, immutable` and the best
+  encoding the client accepts. Unhashed names still work (plain
+  `no-cache` revalidation) for anything that links to them directly.
+
+An edited file gets a new hash after a restart, which is when static
+files change in a deployment.
+
+`after_request` compresses dynamic `text/html` and `application/json`
+responses of at least `compress_min_bytes` (default 1024; 0 disables)
+on the fly. Compressed responses carry their encoding in the ETag
+(`<etag>-gzip` / `<etag>-br`), which `http_cache.is_fresh` accepts
+back.
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+from collections import namedtuple
+
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_COMPRESS_MIN_BYTES = 1024
+
+COMPRESSIBLE_MIMETYPES = frozenset({"text/html", "application/json"})
+
+Asset = namedtuple("Asset", "path digest mimetype identity gzip br")
+
+# original relative path → hashed relative path
+_manifest = {}
+# hashed relative path → Asset
+_assets = {}
+
+
+def _hashed_name(rel_path, digest):
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest}{ext}"
+
+
+def _compress(body, encoding, static=False):
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if static else 4)
+    return gzip.compress(body, compresslevel=9 if static else 6, mtime=0)
+
+
+def build(static_folder):
+    """Hash and precompress every file under `static_folder`."""
+    manifest, assets = {}, {}
+    for dirpath, _, filenames in os.walk(static_folder):
+        for filename in filenames:
+            full = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(full, static_folder).replace(os.sep, "/")
+            with open(full, "rb") as f:
+                body = f.read()
+            digest = hashlib.sha256(body).hexdigest()[:12]
+            mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            variants = {}
+            for encoding in ("gzip", "br"):
+                if encoding == "br" and brotli is None:
+                    continue
+                compressed = _compress(body, encoding, static=True)
+                if len(compressed) < len(body):
+                    variants[encoding] = compressed
+            hashed = _hashed_name(rel_path, digest)
+            manifest[rel_path] = hashed
+            assets[hashed] = Asset(rel_path, digest, mimetype, body,
+                                   variants.get("gzip"), variants.get("br"))
+    _manifest.clear()
+    _manifest.update(manifest)
+    _assets.clear()
+    _assets.update(assets)
+    logger.info(
+        f"📦 Fingerprinted {len(assets)} static file(s) "
+        f"({'gzip + brotli' if brotli is not None else 'gzip'} precompressed)."
+    )
+
+
+def _accepted_encoding(available):
+    """Best of `available` ("br", "gzip") the client accepts, or None."""
+    accept = request.accept_encodings
+    for encoding in ("br", "gzip"):
+        if encoding in available and accept[encoding]:
+            return encoding
+    return None
+
+
+def serve_static(filename):
+    """Replacement view for the `static` endpoint."""
+    asset = _assets.get(filename)
+    if asset is None:
+        response = send_from_directory(current_app.static_folder, filename)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    available = [e for e in ("br", "gzip") if getattr(asset, e) is not None]
+    encoding = _accepted_encoding(available)
+    body = getattr(asset, encoding) if encoding else asset.identity
+    response = current_app.response_class(body, mimetype=asset.mimetype)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if available:
+        response.vary.add("Accept-Encoding")
+    response.set_etag(f"{asset.digest}-{encoding}" if encoding else asset.digest)
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response.make_conditional(request)
+
+
+def _url_defaults(endpoint, values):
+    if endpoint == "static" and "filename" in values:
+        hashed = _manifest.get(values["filename"])
+        if hashed is not None:
+            values["filename"] = hashed
+
+
+def _compress_response(response):
+    threshold = current_app.config.get("compress_min_bytes", DEFAULT_COMPRESS_MIN_BYTES)
+    if (
+        not threshold
+        or response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < int(threshold):
+        return response
+    encoding = _accepted_encoding(("br", "gzip") if brotli is not None else ("gzip",))
+    if encoding is None:
+        return response
+    response.set_data(_compress(body, encoding))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+    return response
+
+
+def init_app(app):
+    """Fingerprint `app.static_folder` and install the static view,
+    URL rewriting and response compression."""
+    app.after_request(_compress_response)
+    if not app.static_folder or not os.path.isdir(app.static_folder):
+        return
+    build(app.static_folder)
+    app.view_functions["static"] = serve_static
+    app.url_defaults(_url_defaults)
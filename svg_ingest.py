@@ -0,0 +1,120 @@
+"""Sanitize and minify downloaded SVG icons before they're stored.
+
+dashboard-icons SVGs come straight from the CDN: editor metadata
+(`<metadata>`, `sodipodi:namedview`, `inkscape:*` attributes), comments
+and pretty-printing whitespace make some of them several times larger
+than the drawing, and nothing stopped an icon from carrying a
+`<script>` or an `onload=` that would run when `/images/<file>` is
+opened directly.
+
+`clean(content)` parses the document (no DTDs or entities) and
+re-serializes only:
+
+- elements and attributes in the SVG, XLink and XML namespaces —
+  everything an editor added under its own namespace is dropped, along
+  with comments and processing instructions;
+- minus `<script>`, `<foreignObject>`, `<metadata>`, `<desc>`, `on*`
+  event attributes and `javascript:` / `data:text/html` links;
+- with whitespace-only text removed outside `<text>` / `<style>` and
+  runs of whitespace in attribute values collapsed.
+
+A root `<svg>` without `xmlns` is put in the SVG namespace. Anything
+that doesn't parse as an `<svg>` document raises
+`ValueError`; callers treat that icon as unavailable.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+_ALLOWED_NAMESPACES = {SVG_NS, XLINK_NS, XML_NS}
+
+_DROPPED_TAGS = {"script", "foreignObject", "metadata", "desc"}
+
+# Elements whose text is content, not formatting.
+_TEXT_TAGS = {"text", "tspan", "textPath", "style", "title"}
+
+_DOCTYPE_RE = re.compile(rb"<!DOCTYPE|<!ENTITY", re.I)
+_UNSAFE_URL_RE = re.compile(r"^\s*(javascript:|data:text/html)", re.I)
+
+
+def _split(name):
+    """`{ns}local` → (ns, local); unprefixed names have ns None."""
+    if name.startswith("{"):
+        ns, local = name[1:].split("}", 1)
+        return ns, local
+    return None, name
+
+
+def _clean_element(element):
+    for child in list(element):
+        if not isinstance(child.tag, str):  # comment / processing instruction
+            element.remove(child)
+            continue
+        ns, local = _split(child.tag)
+        if ns not in _ALLOWED_NAMESPACES or local in _DROPPED_TAGS:
+            _drop(element, child)
+            continue
+        _clean_element(child)
+
+    for name in list(element.attrib):
+        ns, local = _split(name)
+        value = element.attrib[name]
+        if (
+            (ns is not None and ns not in _ALLOWED_NAMESPACES)
+            or local.lower().startswith("on")
+            or (local == "href" and _UNSAFE_URL_RE.match(value))
+        ):
+            del element.attrib[name]
+        else:
+            element.attrib[name] = " ".join(value.split())
+
+    _, local = _split(element.tag)
+    if local not in _TEXT_TAGS:
+        if element.text and not element.text.strip():
+            element.text = None
+        for child in element:
+            if child.tail and not child.tail.strip():
+                child.tail = None
+
+
+def _drop(parent, child):
+    """Remove `child`, keeping any meaningful text that followed it."""
+    if child.tail and child.tail.strip():
+        index = list(parent).index(child)
+        if index:
+            previous = parent[index - 1]
+            previous.tail = (previous.tail or "") + child.tail
+        else:
+            parent.text = (parent.text or "") + child.tail
+    parent.remove(child)
+
+
+def clean(content):
+    """Sanitized, minified bytes for SVG document `content` (bytes)."""
+    if _DOCTYPE_RE.search(content):
+        raise ValueError("SVG declares a DOCTYPE or entities")
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError as e:
+        raise ValueError(f"Not well-formed XML: {e}") from None
+    if root.tag == "svg":
+        # No xmlns: browsers won't render it as an image; adopt the SVG
+        # namespace for every unqualified element.
+        for element in root.iter():
+            if isinstance(element.tag, str) and not element.tag.startswith("{"):
+                element.tag = f"{{{SVG_NS}}}{element.tag}"
+    if _split(root.tag) != (SVG_NS, "svg"):
+        raise ValueError(f"Root element is {root.tag!r}, not <svg>")
+    _clean_element(root)
+    root.tail = None
+    body = ET.tostring(root, encoding="utf-8", xml_declaration=False, short_empty_elements=True)
+    # ElementTree writes `<path ... />`; `>` is always escaped inside
+    # attribute values and text, so this only touches tag ends.
+    return body.replace(b" />", b"/>")
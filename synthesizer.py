@@ -33,8 +33,9 @@ routes_dashboard.py sets "ui_edit". The synthesizer is downstream of
 both.
 
 Algorithm (per direction, internal vs. external):
-1. Map each `ServiceExposure` row to a direction using
-   `settings_store.direction_for(layer, host)`.
+1. Map each `ServiceExposure` row to a direction using the cached
+   `settings_store.direction_resolver()` (per-host override, then
+   global, then "neither").
 2. Build candidate URLs for the relevant direction:
    `{scheme}://{hostname}{path_prefix}/` where scheme = "https" if
    tls else "http". Rows without a hostname are skipped.
@@ -46,8 +47,12 @@ Algorithm (per direction, internal vs. external):
    the previous source was "synthesized" or NULL).
 """
 
-from typing import Iterable, List, Optional, Tuple
+from typing import Iterable, List, Optional, Sequence, Tuple
 
+from sqlalchemy import tuple_
+from sqlalchemy.orm import selectinload
+
+import exposure_summary
 from extensions import db
 from models import ServiceEntry, ServiceExposure
 import settings_store
@@ -103,13 +108,16 @@ def _winner_for_direction(
     rows: Iterable[ServiceExposure],
     direction: str,
     host: str,
+    resolver: Optional[settings_store.DirectionResolver] = None,
 ) -> Optional[ServiceExposure]:
     """Return the highest-priority exposure row whose layer maps to
     `direction` for this host, or None if no candidate exists or no
     row has a usable hostname."""
+    if resolver is None:
+        resolver = settings_store.direction_resolver()
     candidates: List[ServiceExposure] = []
     for row in rows:
-        if settings_store.direction_for(row.layer, host) != direction:
+        if resolver.direction_for(row.layer, host) != direction:
             continue
         if not row.hostname:
             continue
@@ -154,22 +162,82 @@ def synthesize_for_entry(entry: ServiceEntry) -> None:
     """
     rows = list(entry.exposures or [])
     host = entry.host or ""
-    _apply_direction(entry, "internal", _winner_for_direction(rows, "internal", host))
-    _apply_direction(entry, "external", _winner_for_direction(rows, "external", host))
+    resolver = settings_store.direction_resolver()
+    _apply_direction(entry, "internal", _winner_for_direction(rows, "internal", host, resolver))
+    _apply_direction(entry, "external", _winner_for_direction(rows, "external", host, resolver))
 
 
 def recompute_all() -> int:
     """Recompute synthesized URLs for every service.
 
-    Triggered when the operator changes per-interpreter direction
-    settings (a layer flipping from "neither" to "internal" needs
-    every Traefik-tagged row's URL recomputed). Iterates all services
-    — at homelab scale (~50 services) this runs in milliseconds.
+    Full sweep; the settings page uses `affected_entry_ids()` +
+    `recompute_entries()` instead so only services whose directions
+    actually changed are touched. Kept for ad-hoc repair scripts.
 
     Caller is responsible for committing. Returns the number of
     services touched (i.e. queried — not necessarily mutated).
     """
-    entries = ServiceEntry.query.all()
+    entries = ServiceEntry.query.options(selectinload(ServiceEntry.exposures)).all()
+    for entry in entries:
+        synthesize_for_entry(entry)
+    return len(entries)
+
+
+def affected_entry_ids(
+    old: settings_store.DirectionResolver,
+    new: settings_store.DirectionResolver,
+) -> List[int]:
+    """IDs of services with at least one exposure row whose
+    `(host, layer)` direction differs between `old` and `new`.
+
+    Only layers named somewhere in either resolver can change
+    direction (anything else is "neither" on both sides), so the
+    `(host, layer)` pair lookup (served by the `exposure_summary`
+    rollup) is restricted to those layers before the per-pair
+    comparison.
+    """
+    candidate_layers = set(old.layer_directions) | set(new.layer_directions)
+    for overrides in (old.host_overrides, new.host_overrides):
+        for layer_map in overrides.values():
+            candidate_layers.update(layer_map)
+    if not candidate_layers:
+        return []
+
+    pairs = exposure_summary.host_layer_pairs(candidate_layers)
+    changed = [
+        (host, layer) for host, layer in pairs
+        if old.direction_for(layer, host or "") != new.direction_for(layer, host or "")
+    ]
+    if not changed:
+        return []
+
+    rows = (
+        db.session.query(ServiceEntry.id)
+        .join(ServiceExposure, ServiceExposure.service_entry_id == ServiceEntry.id)
+        .filter(tuple_(ServiceEntry.host, ServiceExposure.layer).in_(changed))
+        .distinct()
+        .order_by(ServiceEntry.id)
+        .all()
+    )
+    return [r[0] for r in rows]
+
+
+def recompute_entries(entry_ids: Sequence[int]) -> int:
+    """Recompute synthesized URLs for the given services, loading
+    their exposure rows in one extra query (no per-entry lazy load).
+
+    Intended to be called with one bounded chunk at a time; see
+    `jobs.run_exposure_recompute`. Caller is responsible for
+    committing. Returns the number of services found.
+    """
+    if not entry_ids:
+        return 0
+    entries = (
+        ServiceEntry.query
+        .options(selectinload(ServiceEntry.exposures))
+        .filter(ServiceEntry.id.in_(list(entry_ids)))
+        .all()
+    )
     for entry in entries:
         synthesize_for_entry(entry)
     return len(entries)
@@ -185,24 +253,30 @@ def replace_exposures(entry: ServiceEntry, observations) -> None:
     previous state alone). Pass `[]` to clear all rows for this
     service.
 
-    Caller is responsible for committing.
+    Keeps the `exposure_summary` rollup in step. Caller is responsible
+    for committing.
     """
     if observations is None:
         return
 
     from datetime import datetime
 
-    ServiceExposure.query.filter_by(service_entry_id=entry.id).delete(synchronize_session=False)
-
-    now = datetime.utcnow()
+    records = []
     for obs in observations:
         if hasattr(obs, "model_dump"):
             data = obs.model_dump()
         else:
             data = dict(obs)
-        layer = data.get("layer")
-        if not layer:
-            continue
+        if data.get("layer"):
+            records.append(data)
+
+    # Rollup first: it diffs against the rows about to be deleted.
+    exposure_summary.apply_replacement(entry.id, entry.host, (d["layer"] for d in records))
+    ServiceExposure.query.filter_by(service_entry_id=entry.id).delete(synchronize_session=False)
+
+    now = datetime.utcnow()
+    for data in records:
+        layer = data["layer"]
         db.session.add(
             ServiceExposure(
                 service_entry_id=entry.id,
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+import pytest
+
+import jobs
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(jobs, "_recompute_state", dict(jobs._recompute_state, status="idle"))
+    monkeypatch.setattr(jobs, "_recompute_pending", set())
+    return SimpleNamespace(config={"exposure_recompute_chunk_size": 10})
+
+
+def test_inline_recompute_reports_done(app, monkeypatch):
+    recomputed = []
+    monkeypatch.setattr(jobs, "_recompute_chunks", lambda app, ids: recomputed.append(set(ids)))
+
+    assert jobs.start_exposure_recompute(app, {1, 2}) == "done"
+    assert recomputed == [{1, 2}]
+
+
+def test_inline_recompute_reports_failure(app, monkeypatch):
+    def fail(app, ids):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(jobs, "_recompute_chunks", fail)
+
+    assert jobs.start_exposure_recompute(app, {1, 2}) == "failed"
+    state = jobs.exposure_recompute_status()
+    assert state["status"] == "failed"
+    assert state["error"] == "database is locked"
@@ -0,0 +1,50 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import icon_registry
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg">\n  <path d="M0 0h1"/>\n</svg>\n'
+
+
+def _blobs(image_dir):
+    store = image_dir / icon_registry.STORE_DIRNAME
+    return sorted(os.listdir(store)) if store.exists() else []
+
+
+@pytest.fixture(params=["hardlink", "copy"])
+def image_dir(request, tmp_path, monkeypatch):
+    if request.param == "copy":
+        def no_links(src, dst):
+            raise OSError("hard links not supported")
+        monkeypatch.setattr(os, "link", no_links)
+    return tmp_path
+
+
+def test_restart_keeps_ingested_icons_and_blobs(image_dir):
+    app = SimpleNamespace(config={"IMAGE_DIR": str(image_dir)})
+    (image_dir / "grafana.svg").write_bytes(SVG)
+
+    icon_registry.init_app(app)
+    blobs = _blobs(image_dir)
+    digest = icon_registry.lookup("grafana.svg").digest
+    assert blobs == [f"{digest}.svg"]
+    mtime = os.stat(image_dir / "grafana.svg").st_mtime_ns
+
+    icon_registry.init_app(app)
+
+    assert _blobs(image_dir) == blobs
+    assert os.stat(image_dir / "grafana.svg").st_mtime_ns == mtime
+    assert icon_registry.read("grafana.svg") == (image_dir / "grafana.svg").read_bytes()
+
+
+def test_unreferenced_blobs_are_removed(image_dir):
+    app = SimpleNamespace(config={"IMAGE_DIR": str(image_dir)})
+    icon_registry.init_app(app)
+    icon_registry.store("sonarr.svg", SVG)
+    os.remove(image_dir / "sonarr.svg")
+
+    icon_registry.init_app(app)
+
+    assert _blobs(image_dir) == []
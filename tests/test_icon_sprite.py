@@ -0,0 +1,31 @@
+import icon_registry
+import icon_sprite
+
+
+RED = ('<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">'
+       '<defs><style>.cls-1{fill:red}#dot{stroke:red}</style></defs>'
+       '<path class="cls-1" d="M0 0h10v10z"/><circle id="dot" r="2"/></svg>')
+BLUE = ('<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">'
+        '<style>.cls-1{fill:blue}</style><path class="cls-1 cls-2" d="M0 0h10v10z"/></svg>')
+
+
+def test_shared_class_names_are_scoped_per_icon():
+    red = icon_sprite.to_symbol("red.svg", RED)
+    blue = icon_sprite.to_symbol("blue.svg", BLUE)
+
+    assert "<style>.icon-red-cls-1{fill:red}#icon-red-dot{stroke:red}</style>" in red
+    assert 'class="icon-red-cls-1"' in red
+    assert 'id="icon-red-dot"' in red
+    assert "<style>.icon-blue-cls-1{fill:blue}</style>" in blue
+    assert 'class="icon-blue-cls-1 icon-blue-cls-2"' in blue
+    assert ".cls-1" not in red + blue
+
+
+def test_unscopable_style_is_left_out(monkeypatch):
+    element_rule = BLUE.replace(".cls-1{fill:blue}", "path{fill:blue}")
+    sources = {"red.svg": RED, "element.svg": element_rule}
+    monkeypatch.setattr(icon_registry, "read", lambda name: sources[name].encode())
+
+    assert icon_sprite.to_symbol("element.svg", element_rule) is None
+    _, covered = icon_sprite.build(sources)
+    assert covered == ["red.svg"]
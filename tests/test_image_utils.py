@@ -0,0 +1,52 @@
+import pytest
+
+import icon_fetcher
+import icon_matcher
+import icon_pack
+import icon_registry
+import image_utils
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    """Cached icons are just `sonarr.svg`; `upstream` is what the CDNs
+    have. Returns the list of names fetched."""
+    upstream = {"sonarr.svg", "sonar.svg"}
+    fetched = []
+
+    def ensure(filename, source_hint=None):
+        fetched.append(filename)
+        return filename if filename in upstream else None
+
+    key = object()
+    monkeypatch.setattr(icon_pack, "names", lambda: [])
+    monkeypatch.setattr(icon_pack, "generation", lambda: key)
+    monkeypatch.setattr(icon_registry, "names", lambda: ["sonarr.svg"])
+    monkeypatch.setattr(icon_registry, "generation", lambda: key)
+    monkeypatch.setattr(icon_matcher, "_catalog_key", None)
+    monkeypatch.setattr(icon_fetcher, "ensure", ensure)
+    return fetched
+
+
+def test_exact_name_wins_over_close_match(catalog):
+    assert icon_matcher.best_icon("sonar").icon == "sonarr.svg"
+
+    meta = image_utils.resolve_image_metadata("sonar:latest", fallback_name="sonar")
+
+    assert meta["image_icon"] == "sonar.svg"
+    assert catalog == ["sonar.svg"]
+
+
+def test_close_match_when_exact_name_missing(catalog):
+    meta = image_utils.resolve_image_metadata(
+        "linuxserver/sonarr-develop:latest", fallback_name="tv"
+    )
+
+    assert meta["image_icon"] == "sonarr.svg"
+    assert catalog == ["sonarr-develop.svg", "sonarr.svg"]
+
+
+def test_no_icon_when_nothing_matches(catalog):
+    meta = image_utils.resolve_image_metadata("acme/zzqx:1", fallback_name="zzqx")
+
+    assert meta["image_icon"] is None
@@ -0,0 +1,19 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import jobs
+
+
+@pytest.mark.parametrize("retention, expected", [
+    (None, timedelta(days=1)),
+    (30, timedelta(days=1)),
+    (1, timedelta(hours=6)),
+    (0, timedelta(0)),
+    ("bogus", timedelta(days=1)),
+])
+def test_unchanged_widget_values_are_touched_within_retention(retention, expected):
+    config = {} if retention is None else {"widget_value_retention_days": retention}
+
+    assert jobs._widget_value_touch_after(SimpleNamespace(config=config)) == expected
@@ -0,0 +1,33 @@
+import base64
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from view_helpers import decode_cursor, encode_cursor
+
+
+def _token(*parts):
+    raw = json.dumps(list(parts)).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def test_round_trip():
+    entry = SimpleNamespace(id=7, container_name="Sonarr", sort_priority=3)
+    token = encode_cursor(2, "Media", entry, "priority")
+
+    assert decode_cursor(token) == (2, "Media", 7, (3, "sonarr"))
+
+
+@pytest.mark.parametrize("parts", [
+    (-1, "Media", 7, 3, "sonarr"),
+    (0, "Media", 7, "3", "sonarr"),
+    (0, "Media", 7, 3, None),
+    (0, "Media", 7, [3], "sonarr"),
+    (0, None, 7, 3, "sonarr"),
+    (True, "Media", 7, 3, "sonarr"),
+    (0, "Media", 7, 3),
+])
+def test_rejects_malformed_cursor(parts):
+    with pytest.raises(ValueError):
+        decode_cursor(_token(*parts))
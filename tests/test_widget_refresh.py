@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+
+import widget_refresh
+import widget_registry
+
+
+@pytest.fixture
+def plugin(monkeypatch):
+    """A plugin whose fetch takes `delay[url]` seconds; records the
+    peak number of concurrent fetches per URL."""
+    delay, active, peak = {}, {}, {}
+    lock = threading.Lock()
+
+    def fetch(url, api_key, fields, available_fields):
+        with lock:
+            active[url] = active.get(url, 0) + 1
+            peak[url] = max(peak.get(url, 0), active[url])
+        try:
+            time.sleep(delay.get(url, 0))
+            return {"value": url}
+        finally:
+            with lock:
+                active[url] -= 1
+
+    registered = widget_registry.WidgetPlugin("test", "Test", [], fetch, None)
+    monkeypatch.setattr(widget_registry, "get", lambda name: registered)
+    monkeypatch.setattr(widget_refresh, "POLL_SECONDS", 0.02)
+    return delay, peak
+
+
+def _task(widget_id, url):
+    return widget_refresh.WidgetTask(widget_id, "test", url, "key", ["value"])
+
+
+def test_queued_widgets_on_one_upstream_are_not_timed_out(plugin, monkeypatch):
+    delay, peak = plugin
+    delay["http://nas:8989"] = 0.3
+    monkeypatch.setattr(widget_refresh, "_upstream_limit", 1)
+    monkeypatch.setattr(widget_refresh, "_timeout", 0.5)
+
+    results = widget_refresh.fetch_all([_task(1, "http://nas:8989"), _task(2, "http://nas:8989")])
+
+    assert [r.status for r in results] == ["ok", "ok"]
+    assert peak["http://nas:8989"] == 1
+    second = results[1]
+    assert second.duration_ms < 450  # the fetch alone, not the queue wait
+    assert second.wait_ms >= 250
+
+
+def test_slow_widget_times_out_without_delaying_others(plugin, monkeypatch):
+    delay, _ = plugin
+    delay["http://dead"] = 2
+    monkeypatch.setattr(widget_refresh, "_timeout", 0.3)
+
+    started = time.monotonic()
+    results = widget_refresh.fetch_all([_task(1, "http://dead"), _task(2, "http://alive")])
+
+    assert time.monotonic() - started < 1
+    assert {r.task.widget_id: r.status for r in results} == {1: "timeout", 2: "ok"}
+
+
+def test_timed_out_fetch_keeps_its_upstream_slot(plugin, monkeypatch):
+    delay, peak = plugin
+    delay["http://hung"] = 0.8
+    monkeypatch.setattr(widget_refresh, "_upstream_limit", 1)
+    monkeypatch.setattr(widget_refresh, "_timeout", 0.2)
+    tasks = [_task(1, "http://hung"), _task(2, "http://hung")]
+
+    first = widget_refresh.fetch_all(tasks)
+    second = widget_refresh.fetch_all(tasks)
+
+    assert [r.status for r in first + second] == ["timeout"] * 4
+    assert peak["http://hung"] == 1
+    assert widget_refresh._in_flight["hung"] == 1
+    assert "earlier fetches" in second[0].error
+
+    deadline = time.monotonic() + 2
+    while widget_refresh._in_flight and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not widget_refresh._in_flight
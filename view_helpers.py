@@ -9,9 +9,16 @@ The helper is also where the v0.5.x view controls
 (`group_by` axis selector, `show_urlless` filter) are interpreted,
 so each route handler only has to read the query params and hand them
 off.
+
+Large views are paged per bucket: `first_pages()` cuts each bucket to
+its first `page_size` entries (counts stay exact) and hands back an
+opaque cursor for the rest; `next_page()` resumes a bucket from one.
 """
 
-from collections import defaultdict
+import base64
+import bisect
+import json
+from collections import defaultdict, namedtuple
 
 from models import Group
 
@@ -67,6 +74,10 @@ def group_and_sort_services(
     `bucket_label` is the string the template displays; `entries` are
     the services in that bucket, sorted per `sort_in_group`.
 
+    `services` may be `ServiceEntry` objects or `view_rows` projections;
+    only `group_id`, `stack_name`, `host`, `container_name`,
+    `sort_priority` and the two URL columns are read.
+
     For `axis='group'` the keying is `group_id` (canonical), so two
     distinct Group rows that happen to share a display name yield two
     distinct buckets. For `axis='stack'` and `axis='host'` the bucket
@@ -126,3 +137,73 @@ def _order_string_buckets(buckets, null_label):
     if None in buckets:
         result.append((null_label, buckets[None]))
     return result
+
+
+# --- Per-bucket paging -----------------------------------------------
+
+BucketPage = namedtuple("BucketPage", "label entries total next_cursor")
+
+
+def encode_cursor(bucket_index, label, entry, sort_in_group):
+    """Opaque cursor resuming bucket `bucket_index` after `entry`."""
+    priority, name = _within_bucket_sort_key(entry, sort_in_group)
+    raw = json.dumps([bucket_index, label, entry.id, priority, name], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """`(bucket_index, label, after_id, after_key)`; ValueError if
+    `token` isn't a cursor from `encode_cursor`."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        bucket_index, label, after_id, priority, name = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception as e:
+        raise ValueError(f"Malformed cursor: {e}") from None
+    # bool is an int subclass; `after_key` must compare with the
+    # (int, str) keys `next_page` bisects.
+    ints = (bucket_index, after_id, priority)
+    if (
+        any(not isinstance(v, int) or isinstance(v, bool) for v in ints)
+        or bucket_index < 0
+        or not isinstance(label, str)
+        or not isinstance(name, str)
+    ):
+        raise ValueError("Malformed cursor")
+    return bucket_index, label, after_id, (priority, name)
+
+
+def next_page(entries, bucket_index, label, after_id, after_key, page_size, sort_in_group):
+    """The `page_size` entries of a sorted bucket after `after_id`,
+    plus the cursor for the page after that (None at the end).
+
+    Resumes right after `after_id` while it is still in the bucket;
+    if it has since left, resumes after its old sort position.
+    """
+    start = None
+    for index, entry in enumerate(entries):
+        if entry.id == after_id:
+            start = index + 1
+            break
+    if start is None:
+        keys = [_within_bucket_sort_key(e, sort_in_group) for e in entries]
+        start = bisect.bisect_right(keys, tuple(after_key))
+    return _slice(entries, start, bucket_index, label, page_size, sort_in_group)
+
+
+def first_pages(grouped, page_size, sort_in_group):
+    """`BucketPage`s for `group_and_sort_services` output. A
+    `page_size` of 0 (or less) keeps every entry."""
+    pages = []
+    for index, (label, entries) in enumerate(grouped):
+        page, cursor = _slice(entries, 0, index, label, page_size, sort_in_group)
+        pages.append(BucketPage(label, page, len(entries), cursor))
+    return pages
+
+
+def _slice(entries, start, bucket_index, label, page_size, sort_in_group):
+    if page_size <= 0:
+        return entries[start:], None
+    page = entries[start:start + page_size]
+    if page and start + page_size < len(entries):
+        return page, encode_cursor(bucket_index, label, page[-1], sort_in_group)
+    return page, None
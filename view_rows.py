@@ -0,0 +1,113 @@
+"""Column-projected rows for the dashboard views.
+
+The dashboards render a fixed handful of `ServiceEntry` columns. Loading
+full ORM objects for them costs an identity-map entry per row, JSON
+decoding of `networks` / `exposed_ports` / `published_ports`, and the
+memory to keep all of that in `dashboard_snapshot` until the next write.
+
+Each projection here selects only the columns its templates read into
+a plain `__slots__` object:
+
+- `compact` (`CompactRow`) — `/compact_dash`: name, host, URLs, icon,
+  plus the grouping/sort keys.
+- `list` (`ListRow`) — `/` and `/tiled_dash` (tile faces and table
+  rows): adds status, health, image tag and widget columns, the group
+  name (outer join) and the exposures as `ExposureRow` tuples from one
+  extra query. `version` hashes all of that; it changes whenever
+  anything the row shows does (`fragment_cache` keys on it).
+
+Both carry every attribute `view_helpers.group_and_sort_services`
+reads, so rows go straight into it. Anything that needs the rest of
+the entry (the tile drawer, edit pages) loads the ORM object instead.
+"""
+
+from collections import namedtuple
+
+from extensions import db
+from models import Group, ServiceEntry, ServiceExposure
+
+ExposureRow = namedtuple("ExposureRow", "layer hostname tls path_prefix auth")
+
+
+class CompactRow:
+    COLUMNS = (
+        "id",
+        "container_name",
+        "host",
+        "stack_name",
+        "group_id",
+        "sort_priority",
+        "internalurl",
+        "externalurl",
+        "image_icon",
+    )
+    __slots__ = COLUMNS
+
+    def __init__(self, values):
+        for name, value in zip(self.COLUMNS, values):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.container_name} ({self.id})>"
+
+
+class ListRow(CompactRow):
+    COLUMNS = CompactRow.COLUMNS + (
+        "container_id",
+        "image_tag",
+        "docker_status",
+        "last_api_update",
+        "is_static",
+        "internal_health_check_enabled",
+        "internal_health_check_status",
+        "internal_health_check_update",
+        "external_health_check_enabled",
+        "external_health_check_status",
+        "external_health_check_update",
+        "widget_id",
+    )
+    __slots__ = COLUMNS[len(CompactRow.COLUMNS):] + ("group_name", "exposures", "version")
+
+    # Same rule as the model, read off the projected columns.
+    is_docker_status_stale = ServiceEntry.is_docker_status_stale
+
+
+def _columns(row_class):
+    return [getattr(ServiceEntry, name) for name in row_class.COLUMNS]
+
+
+def load_compact():
+    return [CompactRow(r) for r in db.session.query(*_columns(CompactRow)).all()]
+
+
+def load_list():
+    query = (
+        db.session.query(*_columns(ListRow), Group.group_name)
+        .outerjoin(Group, ServiceEntry.group_id == Group.id)
+    )
+    exposures = {}
+    for r in db.session.query(
+        ServiceExposure.service_entry_id,
+        ServiceExposure.layer,
+        ServiceExposure.hostname,
+        ServiceExposure.tls,
+        ServiceExposure.path_prefix,
+        ServiceExposure.auth,
+    ).order_by(ServiceExposure.id):
+        exposures.setdefault(r[0], []).append(ExposureRow(*r[1:]))
+
+    rows = []
+    for r in query.all():
+        row = ListRow(r)
+        row.group_name = r[-1]
+        row.exposures = exposures.get(row.id, [])
+        row.version = hash((tuple(r), tuple(row.exposures)))
+        rows.append(row)
+    return rows
+
+
+# Projection name → loader.
+PROJECTIONS = {
+    "compact": load_compact,
+    "list": load_list,
+}
@@ -0,0 +1,254 @@
+"""Concurrent widget fetches for the widget refresh job.
+
+`jobs.update_widget_data_periodically` used to call the widget
+plugins one after another, committing after each. A plugin makes one
+or more requests with a 10-second timeout, so one unreachable Radarr
+delayed every widget behind it, and a slow run could overrun
+`widget_background_reload` and stack up in the scheduler.
+
+`fetch_all(tasks)` runs one run's fetches instead:
+
+- at most `widget_refresh_workers` (default 8) at a time;
+- at most `widget_upstream_concurrency` (default 2) at a time against
+  the same upstream (`host:port` of the widget URL), so ten widgets on
+  one server don't hit it all at once. Each upstream has its own queue
+  and a fetch is only started when its upstream has a free slot, so
+  waiting in that queue doesn't tie up a worker or count as fetch
+  time;
+- with a hard deadline of `widget_fetch_timeout` seconds (default 30)
+  per widget, counted from when its fetch starts. A widget past its
+  deadline is reported as `timeout` right away and its late result is
+  dropped, but its thread (a daemon, which finishes when the plugin's
+  own request timeout fires) keeps its slot until it actually returns.
+
+Slots are counted per process, not per run (`_in_flight`), so threads
+left behind by a hung upstream count against both limits in the next
+run too, and the number of live `widget-fetch` threads never exceeds
+`widget_refresh_workers`. A widget that can't get a slot because
+they're all held by such threads (and none of this run's fetches that
+could free one is still going) is reported as `timeout` once it has
+waited out the deadline, so the run doesn't wait on them either.
+
+It returns one `Result` per task and doesn't touch the database: the
+caller writes every result in one batch after the fetches finish.
+
+Each widget's last fetch duration, queue wait and outcome, plus run
+and failure counts, are kept for `metrics()` (the Widgets settings
+section and `/widgets/metrics`). Like `widget_registry`, state is per
+process.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import Counter, deque, namedtuple
+from datetime import datetime
+from urllib.parse import urlparse
+
+import widget_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT_SECONDS = 30
+DEFAULT_UPSTREAM_CONCURRENCY = 2
+
+# How often the run checks running fetches against their deadline.
+POLL_SECONDS = 0.25
+
+WidgetTask = namedtuple("WidgetTask", "widget_id name url api_key fields")
+# status: ok | error | timeout. `wait_ms` is the time spent queued for
+# a slot, `duration_ms` the fetch itself.
+Result = namedtuple("Result", "task status values duration_ms wait_ms error")
+
+_workers = DEFAULT_WORKERS
+_timeout = DEFAULT_TIMEOUT_SECONDS
+_upstream_limit = DEFAULT_UPSTREAM_CONCURRENCY
+
+# Live fetch threads per upstream, across runs; released by the thread
+# itself when the plugin returns.
+_slots_lock = threading.Lock()
+_in_flight = Counter()
+
+_metrics_lock = threading.Lock()
+_widget_metrics = {}  # widget_id -> dict
+_last_run = None
+
+
+class _Attempt:
+    """One task's progress through a run."""
+
+    __slots__ = ("task", "upstream", "queued", "started")
+
+    def __init__(self, task, queued):
+        self.task = task
+        self.upstream = upstream(task.url)
+        self.queued = queued
+        self.started = None
+
+
+def _positive_int(config, key, default):
+    value = config.get(key)
+    return value if isinstance(value, int) and value > 0 else default
+
+
+def configure(config):
+    """Apply `widget_refresh_workers`, `widget_fetch_timeout` and
+    `widget_upstream_concurrency`. Called once from create_app()."""
+    global _workers, _timeout, _upstream_limit
+    _workers = _positive_int(config, "widget_refresh_workers", DEFAULT_WORKERS)
+    _timeout = _positive_int(config, "widget_fetch_timeout", DEFAULT_TIMEOUT_SECONDS)
+    _upstream_limit = _positive_int(config, "widget_upstream_concurrency", DEFAULT_UPSTREAM_CONCURRENCY)
+
+
+def upstream(url):
+    """The concurrency key for a widget URL: its `host:port`."""
+    try:
+        return urlparse(url or "").netloc.lower() or (url or "")
+    except ValueError:
+        return url or ""
+
+
+def _fetch(task):
+    """Call the plugin for `task`. Returns its values; raises on any
+    failure."""
+    plugin = widget_registry.get(task.name)
+    if plugin is None:
+        raise LookupError(f"no widget plugin loaded for '{task.name}'")
+    data = plugin.fetch(task.url, task.api_key, task.fields, plugin.available_fields)
+    if not isinstance(data, dict):
+        raise ValueError(f"plugin returned {type(data).__name__}, not a dict")
+    if "error" in data:
+        raise RuntimeError(data["error"])
+    return data
+
+
+def _worker(attempt, finished):
+    try:
+        outcome = ("ok", _fetch(attempt.task), None)
+    except Exception as e:
+        outcome = ("error", None, str(e))
+    end = time.monotonic()
+    with _slots_lock:
+        _in_flight[attempt.upstream] -= 1
+        if not _in_flight[attempt.upstream]:
+            del _in_flight[attempt.upstream]
+    finished.put((attempt, end, outcome))
+
+
+def _result(attempt, end, status, values=None, error=None):
+    return Result(
+        attempt.task, status, values,
+        round((end - attempt.started) * 1000),
+        round((attempt.started - attempt.queued) * 1000),
+        error,
+    )
+
+
+def fetch_all(tasks):
+    """Fetch every `WidgetTask` concurrently; one `Result` per task, in
+    completion order."""
+    if not tasks:
+        return []
+    run_started = time.monotonic()
+    waiting = {}  # upstream -> deque of attempts, in task order
+    for task in tasks:
+        attempt = _Attempt(task, run_started)
+        waiting.setdefault(attempt.upstream, deque()).append(attempt)
+    running = set()
+    finished = queue.Queue()
+    results = []
+
+    def start_ready():
+        with _slots_lock:
+            for key, attempts in waiting.items():
+                while (attempts and sum(_in_flight.values()) < _workers
+                       and _in_flight[key] < _upstream_limit):
+                    attempt = attempts.popleft()
+                    attempt.started = time.monotonic()
+                    running.add(attempt)
+                    _in_flight[key] += 1
+                    threading.Thread(
+                        target=_worker, args=(attempt, finished), name="widget-fetch", daemon=True
+                    ).start()
+
+    def finish(attempt, result):
+        running.discard(attempt)
+        results.append(result)
+
+    while running or any(waiting.values()):
+        start_ready()
+        try:
+            item = finished.get(timeout=POLL_SECONDS)
+            while True:
+                attempt, end, (status, values, error) = item
+                if attempt in running:  # else it already timed out
+                    finish(attempt, _result(attempt, end, status, values, error))
+                item = finished.get_nowait()
+        except queue.Empty:
+            pass
+        now = time.monotonic()
+        for attempt in list(running):
+            if now - attempt.started > _timeout:
+                finish(attempt, _result(attempt, now, "timeout", error=f"no answer within {_timeout}s"))
+        busy = {attempt.upstream for attempt in running}
+        with _slots_lock:
+            stalled = {
+                key for key in waiting
+                if key not in busy and (not running or _in_flight[key] >= _upstream_limit)
+            }
+        for key in stalled:
+            attempts = waiting[key]
+            while attempts and now - attempts[0].queued > _timeout:
+                attempt = attempts.popleft()
+                attempt.started = now
+                results.append(_result(
+                    attempt, now, "timeout",
+                    error=f"{key} still busy with earlier fetches after {_timeout}s",
+                ))
+
+    _record(results, time.monotonic() - run_started)
+    return results
+
+
+def _record(results, run_seconds):
+    global _last_run
+    finished_at = datetime.utcnow().isoformat()
+    counts = {"ok": 0, "error": 0, "timeout": 0}
+    with _metrics_lock:
+        live = {result.task.widget_id for result in results}
+        for widget_id in set(_widget_metrics) - live:
+            del _widget_metrics[widget_id]
+        for result in results:
+            counts[result.status] += 1
+            entry = _widget_metrics.setdefault(
+                result.task.widget_id, {"runs": 0, "failures": 0, "timeouts": 0}
+            )
+            entry["runs"] += 1
+            entry["failures"] += result.status == "error"
+            entry["timeouts"] += result.status == "timeout"
+            entry.update({
+                "widget_name": result.task.name,
+                "upstream": upstream(result.task.url),
+                "status": result.status,
+                "duration_ms": result.duration_ms,
+                "wait_ms": result.wait_ms,
+                "error": result.error,
+                "finished_at": finished_at,
+            })
+        _last_run = {
+            "widgets": len(results),
+            "duration_ms": round(run_seconds * 1000),
+            "finished_at": finished_at,
+            **counts,
+        }
+
+
+def metrics():
+    """`{"last_run": {...} or None, "widgets": {widget_id: {...}}}`."""
+    with _metrics_lock:
+        return {
+            "last_run": dict(_last_run) if _last_run else None,
+            "widgets": {widget_id: dict(entry) for widget_id, entry in _widget_metrics.items()},
+        }
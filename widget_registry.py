@@ -0,0 +1,193 @@
+"""Registry of the widget plugins under `widgets/`.
+
+Each plugin is a package `widgets/<name>/` with a `settings.json`
+(`widget_name`, `description`, `available_fields`) and a
+`fetch_data.py` exposing `fetch_widget_data(api_url, api_key,
+requested_fields, available_fields)`. They used to be rediscovered
+wherever they were needed: every widget refresh re-read `settings.json`
+and called `importlib.import_module` per widget row, the edit form
+listed `/app/widgets` on every page load, and `/widget_config/<name>`
+re-read the JSON per request.
+
+Plugins are now discovered once, on first use: `settings.json` is
+validated (an object whose `available_fields` is a list of objects
+with a unique string `key`), `fetch_data` is imported, and both are
+kept as a `WidgetPlugin`. A plugin that fails either step is left out
+and its error is kept for the Widgets settings section (`errors()`).
+
+After that:
+
+- `names()` / `get(name)` / `available_fields(name)` are dict lookups.
+- The folder is stat'ed at most every `RESCAN_INTERVAL_SECONDS`; a
+  plugin whose `settings.json` or `fetch_data.py` modification time
+  changed (or that was added or removed) is reloaded on its own —
+  `importlib.reload` for a module that was already imported.
+- `reload()` rediscovers everything; the admin "Reload Widget Plugins"
+  action on the settings page calls it.
+
+Like `icon_registry`, the registry is per process.
+"""
+
+import importlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+WIDGETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "widgets")
+SETTINGS_FILENAME = "settings.json"
+MODULE_FILENAME = "fetch_data.py"
+
+RESCAN_INTERVAL_SECONDS = 10
+
+WidgetPlugin = namedtuple("WidgetPlugin", "name description available_fields fetch stamp")
+
+_lock = threading.Lock()
+_plugins = {}  # name -> WidgetPlugin
+_errors = {}  # name -> (stamp, message) for plugins that failed to load
+_loaded = False
+_last_check = 0.0
+
+
+def _plugin_dirs():
+    try:
+        entries = list(os.scandir(WIDGETS_DIR))
+    except OSError as e:
+        logger.warning(f"⚠️ Widgets directory not readable: {WIDGETS_DIR} ({e})")
+        return {}
+    return {
+        entry.name: entry.path
+        for entry in entries
+        if entry.is_dir() and not entry.name.startswith((".", "_"))
+    }
+
+
+def _stamp(path):
+    """(settings.json mtime, fetch_data.py mtime); None for a missing file."""
+    stamps = []
+    for filename in (SETTINGS_FILENAME, MODULE_FILENAME):
+        try:
+            stamps.append(os.stat(os.path.join(path, filename)).st_mtime_ns)
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def _validate(name, settings):
+    """`(description, available_fields)` from a parsed `settings.json`.
+    Raises ValueError when it isn't usable."""
+    if not isinstance(settings, dict):
+        raise ValueError(f"{SETTINGS_FILENAME} is not a JSON object")
+    fields = settings.get("available_fields")
+    if not isinstance(fields, list):
+        raise ValueError("`available_fields` must be a list")
+    seen = set()
+    for index, field in enumerate(fields):
+        if not isinstance(field, dict) or not isinstance(field.get("key"), str) or not field["key"]:
+            raise ValueError(f"`available_fields[{index}]` needs a string `key`")
+        if field["key"] in seen:
+            raise ValueError(f"duplicate field key {field['key']!r}")
+        seen.add(field["key"])
+    declared = settings.get("widget_name")
+    if declared and declared != name:
+        logger.warning(f"⚠️ Widget '{name}' declares widget_name {declared!r}; using the folder name.")
+    return settings.get("description") or name, fields
+
+
+def _load_plugin(name, path, stamp):
+    with open(os.path.join(path, SETTINGS_FILENAME), "r", encoding="utf-8") as f:
+        settings = json.load(f)
+    description, fields = _validate(name, settings)
+
+    module_name = f"widgets.{name}.fetch_data"
+    module = sys.modules.get(module_name)
+    module = importlib.reload(module) if module is not None else importlib.import_module(module_name)
+    fetch = getattr(module, "fetch_widget_data", None)
+    if not callable(fetch):
+        raise ValueError(f"{MODULE_FILENAME} has no fetch_widget_data()")
+    return WidgetPlugin(name, description, fields, fetch, stamp)
+
+
+def _refresh_locked(force=False):
+    """Bring `_plugins` in line with the folder, (re)loading plugins
+    whose files changed, or all of them with `force`. Caller holds
+    `_lock`."""
+    global _loaded, _last_check
+    dirs = _plugin_dirs()
+    for name in set(_plugins) - set(dirs):
+        del _plugins[name]
+        logger.info(f"🧩 Widget plugin '{name}' removed.")
+    for name in set(_errors) - set(dirs):
+        del _errors[name]
+
+    for name, path in sorted(dirs.items()):
+        stamp = _stamp(path)
+        known = _plugins.get(name)
+        if not force:
+            if known is not None and known.stamp == stamp:
+                continue
+            if name in _errors and _errors[name][0] == stamp:
+                continue
+        try:
+            plugin = _load_plugin(name, path, stamp)
+        except Exception as e:
+            _plugins.pop(name, None)
+            _errors[name] = (stamp, str(e))
+            logger.warning(f"⚠️ Widget plugin '{name}' not loaded: {e}")
+            continue
+        _plugins[name] = plugin
+        _errors.pop(name, None)
+        if _loaded:
+            logger.info(f"🧩 Widget plugin '{name}' (re)loaded.")
+
+    if not _loaded or force:
+        logger.info(f"🧩 Loaded {len(_plugins)} widget plugin(s): {', '.join(sorted(_plugins)) or 'none'}.")
+    _loaded = True
+    _last_check = time.monotonic()
+
+
+def _ensure_current():
+    if _loaded and time.monotonic() - _last_check < RESCAN_INTERVAL_SECONDS:
+        return
+    with _lock:
+        if not _loaded or time.monotonic() - _last_check >= RESCAN_INTERVAL_SECONDS:
+            _refresh_locked()
+
+
+def reload():
+    """Rediscover and reload every plugin. Returns the number loaded."""
+    with _lock:
+        _refresh_locked(force=True)
+        return len(_plugins)
+
+
+def names():
+    """Names of the loaded plugins, sorted."""
+    _ensure_current()
+    return sorted(_plugins)
+
+
+def get(name):
+    """The `WidgetPlugin` called `name`, or None."""
+    if not name:
+        return None
+    _ensure_current()
+    return _plugins.get(name)
+
+
+def available_fields(name):
+    """The `available_fields` plugin `name` declares (empty for an
+    unknown plugin)."""
+    plugin = get(name)
+    return plugin.available_fields if plugin else []
+
+
+def errors():
+    """`{name: message}` for plugins that failed to load."""
+    _ensure_current()
+    return {name: message for name, (_, message) in sorted(_errors.items())}
@@ -0,0 +1,117 @@
+"""In-memory widget values for the dashboard renders.
+
+The dashboards used to read every `widget_value` and `widget` row on
+each snapshot rebuild — and the widget refresh job alone commits once
+per widget per minute — only to show the few widgets attached to
+visible services, minus keys no longer in their `widget_fields`.
+
+This store keeps `{widget_id: (fields, values)}` in process memory:
+
+- It is filled from the DB once, on first use.
+- The refresh job calls `put()` with what it just committed.
+- Any other committed write that touches a widget or its values
+  (edit page, widget config, deletes, the retention prune) reaches
+  `_on_change()` through `change_tracker`; those widget IDs are
+  reloaded — just those rows — on next read. A change that can't be
+  attributed to widgets invalidates everything.
+
+`values_for(widget_ids)` answers with only the requested widgets and
+only their allowed fields, in the `widget_values` / `widget_fields`
+shape the templates take.
+
+Like `change_tracker`, state is per process.
+"""
+
+import threading
+
+import change_tracker
+from extensions import db
+from models import Widget, WidgetValue
+
+_lock = threading.Lock()
+# widget_id → {"fields": [field], "values": {key: value}}
+_widgets = {}
+_loaded = False
+_stale = set()
+
+
+def _load(widget_ids=None):
+    """Read widgets (all, or just `widget_ids`) into `_widgets`.
+    Caller holds `_lock`."""
+    widget_query = db.session.query(Widget.id, Widget.widget_fields)
+    value_query = db.session.query(
+        WidgetValue.widget_id, WidgetValue.widget_value_key, WidgetValue.widget_value
+    ).order_by(WidgetValue.id)
+    if widget_ids is not None:
+        widget_query = widget_query.filter(Widget.id.in_(widget_ids))
+        value_query = value_query.filter(WidgetValue.widget_id.in_(widget_ids))
+        for widget_id in widget_ids:
+            _widgets.pop(widget_id, None)
+    else:
+        _widgets.clear()
+    for widget_id, fields in widget_query:
+        _widgets[widget_id] = {"fields": list(fields or []), "values": {}}
+    for widget_id, key, value in value_query:
+        widget = _widgets.get(widget_id)
+        if widget is not None:
+            widget["values"][key] = value
+
+
+def _ensure_fresh():
+    global _loaded
+    if _loaded and not _stale:
+        return
+    with _lock:
+        if not _loaded:
+            _stale.clear()
+            _load()
+            _loaded = True
+        elif _stale:
+            stale = list(_stale)
+            _stale.clear()
+            _load(stale)
+
+
+def values_for(widget_ids):
+    """`(widget_values, widget_fields)` for `widget_ids`, values limited
+    to each widget's allowed fields. Unknown IDs are left out."""
+    widget_ids = {i for i in widget_ids if i is not None}
+    if not widget_ids:
+        return {}, {}
+    _ensure_fresh()
+    widget_values, widget_fields = {}, {}
+    with _lock:
+        for widget_id in widget_ids:
+            widget = _widgets.get(widget_id)
+            if widget is None:
+                continue
+            allowed = set(widget["fields"])
+            widget_fields[widget_id] = widget["fields"]
+            widget_values[widget_id] = {
+                k: v for k, v in widget["values"].items() if k in allowed
+            }
+    return widget_values, widget_fields
+
+
+def put(widget_id, values):
+    """Record values the refresh job just committed for `widget_id`."""
+    with _lock:
+        if not _loaded:
+            return
+        widget = _widgets.get(widget_id)
+        if widget is None:
+            return  # not loaded yet; picked up from the DB on next read
+        widget["values"].update(values)
+        _stale.discard(widget_id)
+
+
+def _on_change(change):
+    global _loaded
+    with _lock:
+        if change.structural:
+            _loaded = False
+        else:
+            _stale.update(change.widget_ids)
+
+
+change_tracker.add_listener(_on_change)